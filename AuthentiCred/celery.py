@@ -2,12 +2,40 @@
 from __future__ import absolute_import
 import os
 from celery import Celery
+from celery.schedules import crontab
+from kombu import Queue
 
 # Set the default Django settings module
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'AuthentiCred.settings')
 
 app = Celery('AuthentiCred')
 
+# Queues, so a backlog in one kind of work never delays another:
+#   chain_writes  - user-facing DID registration, anchoring and revocation (and their batch flush)
+#   confirmations - transaction monitoring, stuck transaction replacement, DID trust follow-up
+#   housekeeping  - outbox relay, archival, admin statistics and anything not routed explicitly
+# Each queue gets its own worker (see Procfile); tasks not listed below go to the default queue.
+CHAIN_WRITE_TASKS = (
+    'blockchain.tasks.register_did_task',
+    'blockchain.tasks.anchor_credential_task',
+    'blockchain.tasks.revoke_credential_task',
+    'blockchain.tasks.flush_queued_chain_writes',
+)
+CONFIRMATION_TASKS = (
+    'blockchain.tasks.monitor_transactions',
+    'blockchain.tasks.bump_stuck_transactions',
+    'blockchain.tasks.process_did_registration_confirmation',
+)
+
+# Rate limits apply per worker process; empty disables the limit
+CHAIN_WRITE_RATE_LIMIT = os.environ.get('CELERY_CHAIN_WRITE_RATE_LIMIT', '120/m') or None
+CONFIRMATION_RATE_LIMIT = os.environ.get('CELERY_CONFIRMATION_RATE_LIMIT', '') or None
+
+# Same variable as settings.ADMIN_SNAPSHOT_REFRESH_SECONDS, which decides when the snapshot is stale
+ADMIN_SNAPSHOT_REFRESH_SECONDS = float(os.environ.get('ADMIN_SNAPSHOT_REFRESH_SECONDS', '60'))
+# Same variable as settings.METRICS_REFRESH_SECONDS
+METRICS_REFRESH_SECONDS = float(os.environ.get('METRICS_REFRESH_SECONDS', '15'))
+
 # Explicitly set Redis as the broker and result backend BEFORE loading settings
 app.conf.update(
     broker_url='redis://localhost:6379/0',
@@ -20,20 +48,79 @@ app.conf.update(
     timezone='UTC',
     enable_utc=True,
     task_always_eager=False,
+    # Fail fast when Redis is unreachable so dispatches fall back to the task outbox
+    broker_transport_options={
+        'socket_connect_timeout': float(os.environ.get('CELERY_BROKER_CONNECT_TIMEOUT', '2')),
+    },
+    task_default_queue='housekeeping',
+    task_queues=(
+        Queue('chain_writes'),
+        Queue('confirmations'),
+        Queue('housekeeping'),
+    ),
+    task_routes={
+        **{name: {'queue': 'chain_writes'} for name in CHAIN_WRITE_TASKS},
+        **{name: {'queue': 'confirmations'} for name in CONFIRMATION_TASKS},
+    },
+    task_annotations={
+        **{name: {'rate_limit': CHAIN_WRITE_RATE_LIMIT} for name in CHAIN_WRITE_TASKS},
+        **{name: {'rate_limit': CONFIRMATION_RATE_LIMIT} for name in CONFIRMATION_TASKS},
+    },
+    # Acknowledge after the task finishes, so a worker crash redelivers it instead of losing
+    # it. Safe because chain writes are deduplicated (blockchain/utils/chain_operations.py)
+    # and the periodic tasks only reconcile state.
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    # Reserve one message per process: chain tasks are long and uneven, so prefetching
+    # would leave queued work stuck behind a slow RPC call in a busy process
+    worker_prefetch_multiplier=int(os.environ.get('CELERY_PREFETCH_MULTIPLIER', '1')),
 )
 
 # Load task modules from all registered Django apps
 app.autodiscover_tasks()
 
 # Add the beat schedule here
+# Ticks expire after one interval, so a stalled confirmations worker does not come back
+# to a pile of identical monitoring runs.
 app.conf.beat_schedule = {
     'monitor-blockchain-transactions': {
         'task': 'blockchain.tasks.monitor_transactions',
         'schedule': 10.0,
+        'options': {'expires': 10.0},
+    },
+    'flush-queued-chain-writes': {
+        'task': 'blockchain.tasks.flush_queued_chain_writes',
+        'schedule': 15.0,
+        'options': {'expires': 15.0},
+    },
+    'relay-task-outbox': {
+        'task': 'blockchain.tasks.relay_task_outbox',
+        'schedule': 30.0,
+        'options': {'expires': 30.0},
+    },
+    'bump-stuck-transactions': {
+        'task': 'blockchain.tasks.bump_stuck_transactions',
+        'schedule': 60.0,
+        'options': {'expires': 60.0},
+    },
+    'refresh-admin-snapshot': {
+        'task': 'users.tasks.refresh_admin_snapshot',
+        'schedule': ADMIN_SNAPSHOT_REFRESH_SECONDS,
+        'options': {'expires': ADMIN_SNAPSHOT_REFRESH_SECONDS},
+    },
+    'refresh-chain-state-metrics': {
+        'task': 'blockchain.tasks.refresh_chain_state_metrics',
+        'schedule': METRICS_REFRESH_SECONDS,
+        'options': {'expires': METRICS_REFRESH_SECONDS},
+    },
+    'archive-settled-transactions': {
+        'task': 'blockchain.tasks.archive_settled_transactions',
+        'schedule': crontab(hour=3, minute=30),
     },
     'check-did-confirmations': {
         'task': 'blockchain.tasks.process_did_registration_confirmation',
         'schedule': 300.0,  # 5 minutes
+        'options': {'expires': 300.0},
     },
 }
 
@@ -0,0 +1,94 @@
+# AuthentiCred/db_pool.py
+# Connection pool sizing for web and Celery worker processes, and connection metrics
+import logging
+from celery import signals as celery_signals
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from blockchain.metrics import (
+    DB_CONNECTIONS_OPENED, DB_POOL_CONNECTIONS, DB_POOL_CONNECTIONS_LOST, DB_POOL_REQUESTS,
+    DB_POOL_WAIT_SECONDS, DB_POOL_WAITING,
+)
+
+logger = logging.getLogger(__name__)
+
+# Celery pools whose tasks run in threads (or greenlets) sharing one process
+THREADED_CELERY_POOLS = ('threads', 'gevent', 'eventlet')
+
+
+def pooled_aliases():
+    """Aliases of the databases configured with a psycopg pool (DATABASE_POOL_MODE=pool)"""
+    return [alias for alias in connections if connections.settings[alias].get('OPTIONS', {}).get('pool')]
+
+
+def pool_max_size(concurrency):
+    """Connections a process running `concurrency` threads may hold per database"""
+    return max(
+        settings.DATABASE_POOL_MAX_SIZE or concurrency + settings.DATABASE_POOL_HEADROOM,
+        settings.DATABASE_POOL_MIN_SIZE,
+    )
+
+
+def size_pools(concurrency):
+    """
+    Size the pools of this process for `concurrency` threads, unless
+    DATABASE_POOL_MAX_SIZE fixes the size.
+
+    Pools already created are closed, so the next connection opens a pool of
+    the new size.
+    """
+    for alias in pooled_aliases():
+        options = connections.settings[alias]['OPTIONS']
+        if not settings.DATABASE_POOL_MAX_SIZE:
+            options['pool'] = {**options['pool'], 'max_size': pool_max_size(concurrency)}
+        connections[alias].close_pool()
+        logger.info(f"Database pool for {alias}: up to {options['pool']['max_size']} connections")
+
+
+def observe_pools():
+    """Copy the psycopg pool statistics of this process into the metrics"""
+    for alias in pooled_aliases():
+        stats = connections[alias].pool.pop_stats()
+        DB_POOL_CONNECTIONS.labels(alias=alias, state='open').set(stats.get('pool_size', 0))
+        DB_POOL_CONNECTIONS.labels(alias=alias, state='idle').set(stats.get('pool_available', 0))
+        DB_POOL_CONNECTIONS.labels(alias=alias, state='max').set(stats.get('pool_max', 0))
+        DB_POOL_WAITING.labels(alias=alias).set(stats.get('requests_waiting', 0))
+
+        errors = stats.get('requests_errors', 0)
+        queued = stats.get('requests_queued', 0)
+        DB_POOL_REQUESTS.labels(alias=alias, outcome='served').inc(stats.get('requests_num', 0) - errors)
+        DB_POOL_REQUESTS.labels(alias=alias, outcome='queued').inc(queued)
+        DB_POOL_REQUESTS.labels(alias=alias, outcome='timeout').inc(errors)
+        DB_POOL_WAIT_SECONDS.labels(alias=alias).inc(stats.get('requests_wait_ms', 0) / 1000)
+        DB_POOL_CONNECTIONS_LOST.labels(alias=alias).inc(
+            stats.get('connections_lost', 0) + stats.get('returns_bad', 0)
+        )
+        DB_CONNECTIONS_OPENED.labels(alias=alias).inc(stats.get('connections_num', 0))
+
+
+@receiver(connection_created)
+def _connection_created(sender, connection, **kwargs):
+    # Pooled connections are counted from the pool statistics; Django signals every checkout
+    if not connection.settings_dict.get('OPTIONS', {}).get('pool'):
+        DB_CONNECTIONS_OPENED.labels(alias=connection.alias).inc()
+
+
+@receiver(request_finished)
+def _request_finished(sender, **kwargs):
+    observe_pools()
+
+
+@celery_signals.task_postrun.connect
+def _task_postrun(**kwargs):
+    observe_pools()
+
+
+@celery_signals.worker_init.connect
+def _worker_init(sender=None, **kwargs):
+    # Runs in the main worker process before the pool children start, which then
+    # open their own pools instead of inheriting this process's connections
+    pool = str(getattr(sender.pool_cls, '__module__', sender.pool_cls))
+    threaded = any(name in pool for name in THREADED_CELERY_POOLS)
+    size_pools(sender.concurrency if threaded else 1)
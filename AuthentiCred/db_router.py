@@ -0,0 +1,185 @@
+# AuthentiCred/db_router.py
+# Sends read-only traffic to streaming replicas of the primary, avoiding lagging replicas
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+# Set by unsafe requests and by writes during a request; while present, reads use the primary
+PRIMARY_COOKIE = 'db_primary'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Replication delay in seconds: zero on a primary, or when a streaming replica has replayed
+# everything received. Equal LSNs alone would also hold for a replica whose WAL stream has
+# disconnected, so without a streaming WAL receiver the age of the last replayed transaction
+# is reported. The receiver status is only visible to pg_read_all_stats; other roles see
+# NULL, and then the presence of the receiver process is what counts.
+LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()
+            AND EXISTS (
+                SELECT 1 FROM pg_stat_wal_receiver
+                WHERE pid IS NOT NULL AND (status = 'streaming' OR status IS NULL)
+            ) THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+_replica_reads = ContextVar('replica_reads', default=False)
+_primary_pinned = ContextVar('primary_pinned', default=False)
+
+# Replica alias -> (monotonic time of the check, lag in seconds or None if unreachable)
+_lag_checks = {}
+_lag_lock = threading.Lock()
+
+
+@contextmanager
+def replica_reads():
+    """
+    Let reads inside the block use a replica.
+
+    Reads still go to the primary inside a transaction, once the block has
+    written, or when the caller is pinned to the primary.
+    """
+    token = _replica_reads.set(True)
+    pinned = _primary_pinned.set(_primary_pinned.get())
+    try:
+        yield
+    finally:
+        _primary_pinned.reset(pinned)
+        _replica_reads.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """Read from the primary inside the block, even within replica_reads"""
+    token = _primary_pinned.set(True)
+    try:
+        yield
+    finally:
+        _primary_pinned.reset(token)
+
+
+def wrote_to_primary():
+    """Whether the current replica_reads scope has written (and so reads from the primary)"""
+    return _primary_pinned.get()
+
+
+def replica_lag(alias):
+    """
+    Replication lag of `alias` in seconds, or None if it cannot be queried or
+    has not replayed anything yet.
+    """
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(LAG_QUERY)
+            lag = cursor.fetchone()[0]
+    except DatabaseError as e:
+        logger.warning(f"Replica {alias} lag check failed: {e}")
+        connections[alias].close()
+        return None
+    return float(lag) if lag is not None else None
+
+
+def healthy_replicas():
+    """Replicas whose lag is within DATABASE_REPLICA_MAX_LAG_SECONDS, rechecked every DATABASE_REPLICA_CHECK_SECONDS"""
+    now = time.monotonic()
+    healthy = []
+    for alias in settings.DATABASE_REPLICAS:
+        with _lag_lock:
+            checked = _lag_checks.get(alias)
+        if checked is None or now - checked[0] >= settings.DATABASE_REPLICA_CHECK_SECONDS:
+            lag = replica_lag(alias)
+            if lag is not None and lag > settings.DATABASE_REPLICA_MAX_LAG_SECONDS:
+                logger.warning(f"Replica {alias} is {lag:.1f}s behind; reading from the primary")
+            checked = (now, lag)
+            with _lag_lock:
+                _lag_checks[alias] = checked
+        lag = checked[1]
+        if lag is not None and lag <= settings.DATABASE_REPLICA_MAX_LAG_SECONDS:
+            healthy.append(alias)
+    return healthy
+
+
+def clear_lag_checks():
+    with _lag_lock:
+        _lag_checks.clear()
+
+
+class ReplicaRouter:
+    """
+    Database router for DATABASE_REPLICAS.
+
+    Reads use a healthy replica only inside replica_reads() (read-only requests,
+    see ReplicaRoutingMiddleware, and reporting); everything else, including
+    every write and migration, uses the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get() or _primary_pinned.get() or not settings.DATABASE_REPLICAS:
+            return DEFAULT_DB_ALIAS
+        # Reads inside a transaction on the primary must see its uncommitted writes
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        replicas = healthy_replicas()
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Later reads in the same scope read the write back from the primary
+        if _replica_reads.get():
+            _primary_pinned.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas follow the primary through replication
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Serve read-only requests from replicas.
+
+    GET, HEAD and OPTIONS requests run inside replica_reads() unless the
+    browser wrote recently: unsafe requests, and safe ones that wrote anyway,
+    set the PRIMARY_COOKIE for DATABASE_REPLICA_STICKY_SECONDS so the user
+    reads their own writes back from the primary.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        if request.method not in SAFE_METHODS or PRIMARY_COOKIE in request.COOKIES:
+            response = self.get_response(request)
+            wrote = request.method not in SAFE_METHODS
+        else:
+            with replica_reads():
+                response = self.get_response(request)
+                wrote = wrote_to_primary()
+
+        if wrote:
+            response.set_cookie(
+                PRIMARY_COOKIE, '1',
+                max_age=settings.DATABASE_REPLICA_STICKY_SECONDS,
+                httponly=True, samesite='Lax', secure=request.is_secure(),
+            )
+        return response
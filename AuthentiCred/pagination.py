@@ -0,0 +1,192 @@
+# AuthentiCred/pagination.py
+# Keyset (seek) pagination: pages are found by the sort key of their edge row instead
+# of an OFFSET, so every page costs one index range scan regardless of its depth
+import base64
+import datetime
+import json
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+
+
+class KeysetPage:
+    """One page of results with opaque cursors for the neighbouring pages"""
+
+    def __init__(self, items, next_cursor=None, previous_cursor=None, per_page=None):
+        self.object_list = items
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.per_page = per_page
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def _split(ordering):
+    return [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    # DjangoJSONEncoder rounds datetimes to milliseconds; cursors need the exact value
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(obj, ordering):
+    values = [getattr(obj, name) for name, _ in _split(ordering)]
+    data = json.dumps(values, cls=_CursorEncoder).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+
+def decode_cursor(cursor, model, ordering):
+    """Cursor values converted to the ordering fields' types, or None for a malformed cursor"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        return None
+    fields = _split(ordering)
+    if not isinstance(values, list) or len(values) != len(fields):
+        return None
+    try:
+        return [model._meta.get_field(name).to_python(value) for (name, _), value in zip(fields, values)]
+    except (FieldDoesNotExist, ValidationError):
+        return None
+
+
+def _seek(ordering, values, forward):
+    """
+    Rows after (forward) or before the cursor row in `ordering`:
+    (a > x) OR (a = x AND b > y) OR ..., with < for descending fields
+    """
+    condition = Q()
+    equal = Q()
+    for (name, descending), value in zip(_split(ordering), values):
+        lookup = 'lt' if descending == forward else 'gt'
+        condition |= equal & Q(**{f'{name}__{lookup}': value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+def keyset_paginate(queryset, ordering, per_page=20, after=None, before=None):
+    """
+    Page through `queryset` in `ordering` using cursors instead of page numbers.
+
+    `ordering` lists non-null model fields (optionally prefixed with '-') and must
+    end in a unique one, usually the primary key, so every row has a distinct
+    position. It should match an index on the filtered columns.
+    `after` returns the page following that cursor, `before` the page preceding it,
+    neither the first page. Malformed cursors are ignored.
+
+    Fetches one extra row to detect further pages; no COUNT query is run.
+
+    Returns:
+        KeysetPage
+    """
+    ordering = tuple(ordering)
+    model = queryset.model
+    cursor = after or before
+    values = decode_cursor(cursor, model, ordering) if cursor else None
+    forward = values is None or after is not None
+
+    if forward:
+        rows = queryset.order_by(*ordering)
+    else:
+        rows = queryset.order_by(*[name[1:] if name.startswith('-') else f'-{name}' for name in ordering])
+    if values is not None:
+        rows = rows.filter(_seek(ordering, values, forward))
+
+    items = list(rows[:per_page + 1])
+    more = len(items) > per_page
+    items = items[:per_page]
+    if not forward:
+        items.reverse()
+
+    next_cursor = previous_cursor = None
+    if items:
+        if more or not forward:
+            next_cursor = encode_cursor(items[-1], ordering)
+        if (more and not forward) or (forward and values is not None):
+            previous_cursor = encode_cursor(items[0], ordering)
+    elif values is not None:
+        # Cursor past the last row: offer a way back
+        if forward:
+            previous_cursor = cursor
+        else:
+            next_cursor = cursor
+    return KeysetPage(items, next_cursor, previous_cursor, per_page)
+
+
+def _page_query(request, prefix, direction, cursor):
+    params = request.GET.copy()
+    params.pop(f'{prefix}after', None)
+    params.pop(f'{prefix}before', None)
+    params[f'{prefix}{direction}'] = cursor
+    return f'?{params.urlencode()}'
+
+
+def paginate_request(request, queryset, ordering, per_page=20, prefix=''):
+    """
+    keyset_paginate with cursors from the `<prefix>after`/`<prefix>before` query parameters.
+
+    The page also gets next_query/previous_query: links to the neighbouring pages
+    that keep the request's other parameters (e.g. another list's cursor).
+    """
+    page = keyset_paginate(
+        queryset, ordering, per_page=per_page,
+        after=request.GET.get(f'{prefix}after') or None,
+        before=request.GET.get(f'{prefix}before') or None,
+    )
+    page.next_query = _page_query(request, prefix, 'after', page.next_cursor) if page.has_next() else None
+    page.previous_query = _page_query(request, prefix, 'before', page.previous_cursor) if page.has_previous() else None
+    return page
+
+
+def approximate_count(queryset, exact_limit=None):
+    """
+    Row count for list headers that stays cheap for large sets.
+
+    Rows are counted exactly up to `exact_limit` (PAGINATION_EXACT_COUNT_LIMIT) with
+    a LIMITed subquery, so the count never scans more than that many index entries.
+    Beyond it, PostgreSQL's planner estimate for the query is used instead.
+
+    Returns:
+        tuple: (count, is_exact)
+    """
+    if exact_limit is None:
+        exact_limit = settings.PAGINATION_EXACT_COUNT_LIMIT
+    count = queryset.order_by()[:exact_limit + 1].count()
+    if count <= exact_limit:
+        return count, True
+
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        # A JSON array with one plan; drivers return it decoded or as text
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        if isinstance(plan, list):
+            plan = plan[0]
+        return max(int(plan['Plan']['Plan Rows']), count), False
+    return count, False
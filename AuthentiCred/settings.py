@@ -58,15 +58,18 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'encrypted_model_fields',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'AuthentiCred.db_router.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'blockchain.middleware.ChainCallMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'wallets.middleware.WalletCheckMiddleware',
@@ -142,6 +145,64 @@ else:
         }
     }
 
+# Read replicas (AuthentiCred/db_router.py)
+# DATABASE_REPLICA_URLS is a comma-separated list of connection URLs of streaming replicas of
+# the primary. GET/HEAD requests and reporting read from a replica whose replay lag is within
+# DATABASE_REPLICA_MAX_LAG_SECONDS, checked at most every DATABASE_REPLICA_CHECK_SECONDS per
+# process. After a write, the browser reads from the primary for DATABASE_REPLICA_STICKY_SECONDS.
+DATABASE_REPLICAS = []
+for index, replica_url in enumerate(filter(None, os.environ.get('DATABASE_REPLICA_URLS', '').split(',')), 1):
+    alias = f'replica_{index}'
+    DATABASES[alias] = dj_database_url.parse(replica_url.strip())
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['AuthentiCred.db_router.ReplicaRouter']
+DATABASE_REPLICA_MAX_LAG_SECONDS = float(os.environ.get('DATABASE_REPLICA_MAX_LAG_SECONDS', '5'))
+DATABASE_REPLICA_CHECK_SECONDS = float(os.environ.get('DATABASE_REPLICA_CHECK_SECONDS', '5'))
+DATABASE_REPLICA_STICKY_SECONDS = int(os.environ.get('DATABASE_REPLICA_STICKY_SECONDS', '15'))
+
+# Database connections (AuthentiCred/db_pool.py)
+# DATABASE_POOL_MODE selects how web and Celery worker processes connect to every database above:
+#   persistent - (default) each thread keeps its connection for DATABASE_CONN_MAX_AGE seconds,
+#                checked before reuse, instead of connecting per request or task
+#   pool       - a psycopg connection pool per process, of DATABASE_POOL_MIN_SIZE up to
+#                DATABASE_POOL_MAX_SIZE connections; when that is 0 the maximum is the process's
+#                concurrency (gunicorn threads, Celery thread/gevent pool size, otherwise 1) plus
+#                DATABASE_POOL_HEADROOM. Waits longer than DATABASE_POOL_TIMEOUT seconds fail.
+#                Connections are checked each time they are taken from the pool.
+#   pgbouncer  - persistent connections to PgBouncer in transaction pooling mode, without
+#                server-side cursors (prepared statements are already off)
+DATABASE_POOL_MODE = os.environ.get('DATABASE_POOL_MODE', 'persistent')
+DATABASE_CONN_MAX_AGE = int(os.environ.get('DATABASE_CONN_MAX_AGE', '600'))
+DATABASE_POOL_MIN_SIZE = int(os.environ.get('DATABASE_POOL_MIN_SIZE', '1'))
+DATABASE_POOL_MAX_SIZE = int(os.environ.get('DATABASE_POOL_MAX_SIZE', '0'))
+DATABASE_POOL_HEADROOM = int(os.environ.get('DATABASE_POOL_HEADROOM', '1'))
+DATABASE_POOL_TIMEOUT = float(os.environ.get('DATABASE_POOL_TIMEOUT', '10'))
+# Set by gunicorn.conf.py for web workers; Celery workers resize their pools at startup
+DATABASE_POOL_CONCURRENCY = int(os.environ.get('DATABASE_POOL_CONCURRENCY', '1'))
+
+if DATABASE_POOL_MODE not in ('persistent', 'pool', 'pgbouncer'):
+    raise Exception(f"Unknown DATABASE_POOL_MODE '{DATABASE_POOL_MODE}'; use persistent, pool or pgbouncer")
+for database in DATABASES.values():
+    # Persistent connections are checked before reuse; in pool mode Django passes
+    # psycopg_pool's ConnectionPool.check_connection as the pool's `check`, so pooled
+    # connections broken by a Postgres restart or failover are replaced on checkout
+    database['CONN_HEALTH_CHECKS'] = True
+    if DATABASE_POOL_MODE == 'pool':
+        # Django returns connections to the pool instead of closing them
+        database['CONN_MAX_AGE'] = 0
+        database.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': DATABASE_POOL_MIN_SIZE,
+            'max_size': max(
+                DATABASE_POOL_MAX_SIZE or DATABASE_POOL_CONCURRENCY + DATABASE_POOL_HEADROOM,
+                DATABASE_POOL_MIN_SIZE,
+            ),
+            'timeout': DATABASE_POOL_TIMEOUT,
+        }
+    else:
+        database['CONN_MAX_AGE'] = DATABASE_CONN_MAX_AGE
+        database['DISABLE_SERVER_SIDE_CURSORS'] = DATABASE_POOL_MODE == 'pgbouncer'
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -216,13 +277,127 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # Blockchain Configuration
 BLOCKCHAIN_NETWORK = os.environ.get('BLOCKCHAIN_NETWORK', 'ganache')
 BLOCKCHAIN_RPC_URL = os.environ.get('BLOCKCHAIN_RPC_URL', 'http://127.0.0.1:7545')
+# Comma-separated list of nodes; the first one is the primary that receives all writes.
+# With more than one URL, reads are routed to the fastest healthy node (see blockchain/clients/failover.py).
+BLOCKCHAIN_RPC_URLS = [
+    url.strip() for url in os.environ.get('BLOCKCHAIN_RPC_URLS', BLOCKCHAIN_RPC_URL).split(',') if url.strip()
+]
 GANACHE_CHAIN_ID = int(os.environ.get('GANACHE_CHAIN_ID', '5777'))
+POLYGON_CHAIN_ID = int(os.environ.get('POLYGON_CHAIN_ID', '137'))
+BESU_CHAIN_ID = int(os.environ.get('BESU_CHAIN_ID', '1337'))
+
+# RPC transport: 'auto' picks WebSocket for ws:// and wss:// URLs, IPC for ipc:// or *.ipc
+# paths and HTTP otherwise. Persistent WebSocket/IPC connections avoid per-call HTTP overhead
+# for local nodes; HTTP uses a pooled keep-alive session.
+BLOCKCHAIN_TRANSPORT = os.environ.get('BLOCKCHAIN_TRANSPORT', 'auto')
+BLOCKCHAIN_RPC_TIMEOUT = int(os.environ.get('BLOCKCHAIN_RPC_TIMEOUT', '10'))
+BLOCKCHAIN_HTTP_POOL_SIZE = int(os.environ.get('BLOCKCHAIN_HTTP_POOL_SIZE', '20'))
+
+# Multi-node failover
+# Reads not answered within BLOCKCHAIN_RPC_HEDGE_DELAY seconds are also sent to the next best node.
+# A node failing BLOCKCHAIN_RPC_FAILURE_THRESHOLD times in a row is ejected for BLOCKCHAIN_RPC_COOLDOWN
+# seconds, then readmitted after a successful probe.
+BLOCKCHAIN_RPC_HEDGE_DELAY = float(os.environ.get('BLOCKCHAIN_RPC_HEDGE_DELAY', '0.25'))
+BLOCKCHAIN_RPC_FAILURE_THRESHOLD = int(os.environ.get('BLOCKCHAIN_RPC_FAILURE_THRESHOLD', '3'))
+BLOCKCHAIN_RPC_COOLDOWN = int(os.environ.get('BLOCKCHAIN_RPC_COOLDOWN', '30'))
+BLOCKCHAIN_RPC_EWMA_ALPHA = float(os.environ.get('BLOCKCHAIN_RPC_EWMA_ALPHA', '0.3'))
+
+# In-memory chain (BLOCKCHAIN_NETWORK=memory, see blockchain/clients/memory.py)
+# Runs the registries as Python models in-process, for tests, benchmarks and offline development.
+# BLOCKCHAIN_MEMORY_BLOCK_TIME=0 mines every transaction immediately; a positive value keeps
+# transactions pending until the next block. BLOCKCHAIN_MEMORY_LATENCY adds a delay per simulated RPC call.
+BLOCKCHAIN_MEMORY_BLOCK_TIME = float(os.environ.get('BLOCKCHAIN_MEMORY_BLOCK_TIME', '0'))
+BLOCKCHAIN_MEMORY_LATENCY = float(os.environ.get('BLOCKCHAIN_MEMORY_LATENCY', '0'))
+
+# Chain call instrumentation (blockchain/utils/instrumentation.py)
+# Calls slower than BLOCKCHAIN_SLOW_CALL_MS are logged with their contract.function label.
+# BLOCKCHAIN_SERVER_TIMING adds per-request chain totals as a Server-Timing response header.
+BLOCKCHAIN_SLOW_CALL_MS = int(os.environ.get('BLOCKCHAIN_SLOW_CALL_MS', '500'))
+BLOCKCHAIN_SERVER_TIMING = os.environ.get('BLOCKCHAIN_SERVER_TIMING', 'False').lower() == 'true'
+
+# Prometheus metrics at /metrics (blockchain/metrics.py)
+# Set PROMETHEUS_MULTIPROC_DIR in the environment of web and worker processes to aggregate
+# metrics across gunicorn and Celery worker processes. Scrapers must send METRICS_TOKEN as a
+# bearer token; without a token the endpoint is only open when DEBUG is on. Backlog gauges are
+# refreshed by Celery beat every METRICS_REFRESH_SECONDS rather than queried on each scrape.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_BROKER_TIMEOUT = float(os.environ.get('METRICS_BROKER_TIMEOUT', '2'))
+METRICS_REFRESH_SECONDS = int(os.environ.get('METRICS_REFRESH_SECONDS', '15'))
 
 # Contract addresses (from environment or defaults)
 DIDREGISTRY_ADDRESS = os.environ.get('DIDREGISTRY_ADDRESS', '')
 TRUSTREGISTRY_ADDRESS = os.environ.get('TRUSTREGISTRY_ADDRESS', '')
 CREDENTIALANCHOR_ADDRESS = os.environ.get('CREDENTIALANCHOR_ADDRESS', '')
 REVOCATIONREGISTRY_ADDRESS = os.environ.get('REVOCATIONREGISTRY_ADDRESS', '')
+MULTICALL_ADDRESS = os.environ.get('MULTICALL_ADDRESS', '')
+
+# bytes32-keyed registries (DIDRegistryV2 / TrustRegistryV2 / RevocationRegistryV2)
+# Set BLOCKCHAIN_REGISTRY_VERSION=2 once `python manage.py migrate_registries` has copied the v1 state.
+DIDREGISTRYV2_ADDRESS = os.environ.get('DIDREGISTRYV2_ADDRESS', '')
+TRUSTREGISTRYV2_ADDRESS = os.environ.get('TRUSTREGISTRYV2_ADDRESS', '')
+REVOCATIONREGISTRYV2_ADDRESS = os.environ.get('REVOCATIONREGISTRYV2_ADDRESS', '')
+BLOCKCHAIN_REGISTRY_VERSION = int(os.environ.get('BLOCKCHAIN_REGISTRY_VERSION', '1'))
+
+# Batched reads through the Multicall contract
+# Each eth_call is capped at MULTICALL_CALL_GAS_LIMIT; the number of calls packed
+# into one request is derived from the per-call gas estimate below.
+MULTICALL_CALL_GAS_LIMIT = int(os.environ.get('MULTICALL_CALL_GAS_LIMIT', '6000000'))
+MULTICALL_GAS_PER_CALL = int(os.environ.get('MULTICALL_GAS_PER_CALL', '15000'))
+
+# Batched writes (storeProofs / revokeCredentials / setIssuerTrustStatuses)
+# When enabled, anchoring and revocation tasks queue their items and a flush task
+# coalesces everything queued within BLOCKCHAIN_BATCH_WINDOW seconds into batch transactions.
+BLOCKCHAIN_BATCH_WRITES = os.environ.get('BLOCKCHAIN_BATCH_WRITES', 'False').lower() == 'true'
+BLOCKCHAIN_BATCH_WINDOW = int(os.environ.get('BLOCKCHAIN_BATCH_WINDOW', '5'))
+BLOCKCHAIN_BATCH_MAX_ATTEMPTS = int(os.environ.get('BLOCKCHAIN_BATCH_MAX_ATTEMPTS', '3'))
+# Gas budget for a single batch transaction; keep it below the block gas limit
+BLOCKCHAIN_BATCH_GAS_LIMIT = int(os.environ.get('BLOCKCHAIN_BATCH_GAS_LIMIT', '5000000'))
+
+# Gas and fee strategy (blockchain/utils/fees.py)
+# Gas limits come from eth_estimateGas plus a safety margin, cached per function signature
+# and argument shape. Fees use EIP-1559 values from eth_feeHistory when the chain has a
+# base fee and fall back to eth_gasPrice otherwise.
+BLOCKCHAIN_GAS_MARGIN = float(os.environ.get('BLOCKCHAIN_GAS_MARGIN', '0.2'))
+BLOCKCHAIN_GAS_CACHE_TTL = int(os.environ.get('BLOCKCHAIN_GAS_CACHE_TTL', '300'))
+BLOCKCHAIN_MAX_GAS = int(os.environ.get('BLOCKCHAIN_MAX_GAS', '8000000'))
+BLOCKCHAIN_FEE_CACHE_TTL = int(os.environ.get('BLOCKCHAIN_FEE_CACHE_TTL', '10'))
+BLOCKCHAIN_FEE_HISTORY_BLOCKS = int(os.environ.get('BLOCKCHAIN_FEE_HISTORY_BLOCKS', '10'))
+BLOCKCHAIN_PRIORITY_FEE_PERCENTILE = int(os.environ.get('BLOCKCHAIN_PRIORITY_FEE_PERCENTILE', '50'))
+# Polygon PoS rejects tips below 30 gwei
+BLOCKCHAIN_MIN_PRIORITY_FEE_GWEI = float(os.environ.get(
+    'BLOCKCHAIN_MIN_PRIORITY_FEE_GWEI', '30' if BLOCKCHAIN_NETWORK == 'polygon' else '1'
+))
+BLOCKCHAIN_MAX_FEE_GWEI = float(os.environ.get('BLOCKCHAIN_MAX_FEE_GWEI', '500'))
+
+# Stuck transaction replacement
+# Transactions pending longer than BLOCKCHAIN_STUCK_TX_SECONDS are resent with the same
+# nonce and fees raised by BLOCKCHAIN_FEE_BUMP_PERCENT (nodes require at least 10%).
+BLOCKCHAIN_STUCK_TX_SECONDS = int(os.environ.get('BLOCKCHAIN_STUCK_TX_SECONDS', '180'))
+BLOCKCHAIN_FEE_BUMP_PERCENT = int(os.environ.get('BLOCKCHAIN_FEE_BUMP_PERCENT', '15'))
+BLOCKCHAIN_MAX_FEE_BUMPS = int(os.environ.get('BLOCKCHAIN_MAX_FEE_BUMPS', '5'))
+
+# Transaction archival (blockchain/utils/archive.py)
+# Confirmed and failed transactions not updated for BLOCKCHAIN_ARCHIVE_AFTER_DAYS are moved
+# to the archive table daily, BLOCKCHAIN_ARCHIVE_BATCH_SIZE rows per database transaction.
+BLOCKCHAIN_ARCHIVE_AFTER_DAYS = int(os.environ.get('BLOCKCHAIN_ARCHIVE_AFTER_DAYS', '90'))
+BLOCKCHAIN_ARCHIVE_BATCH_SIZE = int(os.environ.get('BLOCKCHAIN_ARCHIVE_BATCH_SIZE', '1000'))
+
+# Deduplicated chain writes (blockchain/utils/chain_operations.py)
+# An anchoring or revocation claimed by a worker that never finished sending is
+# considered abandoned, and may be claimed again, after BLOCKCHAIN_OPERATION_LEASE_SECONDS.
+BLOCKCHAIN_OPERATION_LEASE_SECONDS = int(os.environ.get('BLOCKCHAIN_OPERATION_LEASE_SECONDS', '300'))
+
+# Admin dashboard (users/snapshot.py)
+# Platform statistics are recomputed by Celery beat every ADMIN_SNAPSHOT_REFRESH_SECONDS;
+# the dashboard flags them as stale once older than three intervals. Institution lists
+# show ADMIN_DASHBOARD_PAGE_SIZE rows per page.
+ADMIN_SNAPSHOT_REFRESH_SECONDS = int(os.environ.get('ADMIN_SNAPSHOT_REFRESH_SECONDS', '60'))
+ADMIN_DASHBOARD_PAGE_SIZE = int(os.environ.get('ADMIN_DASHBOARD_PAGE_SIZE', '25'))
+
+# List pagination (AuthentiCred/pagination.py)
+# Result counts above PAGINATION_EXACT_COUNT_LIMIT rows are shown as the planner's estimate
+# instead of running an exact COUNT(*) over the whole set.
+PAGINATION_EXACT_COUNT_LIMIT = int(os.environ.get('PAGINATION_EXACT_COUNT_LIMIT', '10000'))
 
 # Blockchain operator account (from environment or defaults)
 BLOCKCHAIN_OPERATOR_KEY = os.environ.get('BLOCKCHAIN_OPERATOR_KEY', '')
@@ -237,6 +412,18 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TIMEZONE = 'UTC'
 CELERY_ENABLE_UTC = True
 
+# Task outbox (blockchain/utils/outbox.py)
+# Tasks that cannot be published are stored in TaskOutbox instead of running inside the request.
+# After a publish failure the broker is skipped for TASK_BROKER_RETRY_SECONDS; a relay thread in the
+# web process (TASK_OUTBOX_RELAY_THREAD), the relay_task_outbox beat task and the relay_outbox
+# command publish stored tasks once the broker is back. Relays claim entries before publishing;
+# a claim left by a process that died is released after TASK_OUTBOX_CLAIM_SECONDS.
+TASK_BROKER_RETRY_SECONDS = int(os.environ.get('TASK_BROKER_RETRY_SECONDS', '30'))
+TASK_OUTBOX_RELAY_INTERVAL = float(os.environ.get('TASK_OUTBOX_RELAY_INTERVAL', '5'))
+TASK_OUTBOX_BATCH_SIZE = int(os.environ.get('TASK_OUTBOX_BATCH_SIZE', '100'))
+TASK_OUTBOX_RELAY_THREAD = os.environ.get('TASK_OUTBOX_RELAY_THREAD', 'True').lower() == 'true'
+TASK_OUTBOX_CLAIM_SECONDS = int(os.environ.get('TASK_OUTBOX_CLAIM_SECONDS', '60'))
+
 # Tailwind CSS Configuration
 TAILWIND_APP_NAME = 'theme'
 NPM_BIN_PATH = "npm"
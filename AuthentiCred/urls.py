@@ -34,6 +34,7 @@ def health_check(request):
 urlpatterns = [
     path('health/', health_check, name='health'),
     path('admin/', admin.site.urls),
+    path('', include('blockchain.urls')),
     path('', include('users.urls')),
     path('wallets/', include('wallets.urls')),
     path('credentials/', include('credentials.urls')),
@@ -10,6 +10,13 @@ contract CredentialAnchor {
         emit ProofAnchored(proofHash);
     }
 
+    function storeProofs(bytes32[] memory proofHashes) public {
+        for (uint256 i = 0; i < proofHashes.length; i++) {
+            anchoredProofs[proofHashes[i]] = true;
+            emit ProofAnchored(proofHashes[i]);
+        }
+    }
+
     function verifyProof(bytes32 proofHash) public view returns (bool) {
         return anchoredProofs[proofHash];
     }
@@ -0,0 +1,24 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.9;
+
+contract DIDRegistryV2 {
+    mapping(bytes32 => string) public didToPublicKey;
+    event DIDRegistered(bytes32 indexed didHash, string did, string publicKey);
+
+    function registerDID(string calldata did, string calldata publicKey) public {
+        require(bytes(did).length > 0, "DID cannot be empty");
+        require(bytes(publicKey).length > 0, "Public key cannot be empty");
+        bytes32 didHash = keccak256(bytes(did));
+        require(bytes(didToPublicKey[didHash]).length == 0, "DID already registered");
+
+        didToPublicKey[didHash] = publicKey;
+        emit DIDRegistered(didHash, did, publicKey);
+    }
+
+    function resolveDID(bytes32 didHash) public view returns (string memory) {
+        return didToPublicKey[didHash];
+    }
+}
+// Same behaviour as DIDRegistry, keyed by keccak256(did) instead of the DID string.
+// registerDID still takes the DID string so the hash is computed on-chain and cannot disagree
+// with the DID; the plain DID is kept in the (non-indexed) event data so it can be recovered from logs.
@@ -0,0 +1,44 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.9;
+
+contract Multicall {
+    struct Call {
+        address target;
+        bytes callData;
+    }
+
+    struct Result {
+        bool success;
+        bytes returnData;
+    }
+
+    function aggregate(Call[] memory calls) public view returns (uint256 blockNumber, bytes[] memory returnData) {
+        blockNumber = block.number;
+        returnData = new bytes[](calls.length);
+        for (uint256 i = 0; i < calls.length; i++) {
+            (bool success, bytes memory ret) = calls[i].target.staticcall(calls[i].callData);
+            require(success, "Multicall: call failed");
+            returnData[i] = ret;
+        }
+    }
+
+    function tryAggregate(bool requireSuccess, Call[] memory calls) public view returns (Result[] memory returnData) {
+        returnData = new Result[](calls.length);
+        for (uint256 i = 0; i < calls.length; i++) {
+            (bool success, bytes memory ret) = calls[i].target.staticcall(calls[i].callData);
+            if (requireSuccess) {
+                require(success, "Multicall: call failed");
+            }
+            returnData[i] = Result(success, ret);
+        }
+    }
+
+    function getBlockNumber() public view returns (uint256 blockNumber) {
+        blockNumber = block.number;
+    }
+}
+// This contract aggregates several read-only contract calls into a single eth_call.
+// The `aggregate` function executes every call with staticcall and reverts if any of them fails,
+// while `tryAggregate` returns a success flag alongside the raw return data of each call.
+// It lets the application read the state of many credentials, DIDs or issuers from the registries
+// in one round trip instead of one RPC request per value.
@@ -10,6 +10,13 @@ contract RevocationRegistry {
         emit CredentialRevoked(credentialId);
     }
 
+    function revokeCredentials(string[] memory credentialIds) public {
+        for (uint256 i = 0; i < credentialIds.length; i++) {
+            revokedCredentials[credentialIds[i]] = true;
+            emit CredentialRevoked(credentialIds[i]);
+        }
+    }
+
     function isRevoked(string memory credentialId) public view returns (bool) {
         return revokedCredentials[credentialId];
     }
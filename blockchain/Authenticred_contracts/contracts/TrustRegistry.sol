@@ -10,6 +10,14 @@ contract TrustRegistry {
         emit TrustStatusUpdated(did, trusted);
     }
 
+    function setIssuerTrustStatuses(string[] memory dids, bool[] memory trusted) public {
+        require(dids.length == trusted.length, "Length mismatch");
+        for (uint256 i = 0; i < dids.length; i++) {
+            trustedIssuers[dids[i]] = trusted[i];
+            emit TrustStatusUpdated(dids[i], trusted[i]);
+        }
+    }
+
     function isIssuerTrusted(string memory did) public view returns (bool) {
         return trustedIssuers[did];
     }
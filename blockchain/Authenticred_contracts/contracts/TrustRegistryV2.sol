@@ -0,0 +1,25 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.9;
+
+contract TrustRegistryV2 {
+    mapping(bytes32 => bool) public trustedIssuers;
+    event TrustStatusUpdated(bytes32 indexed didHash, bool trusted);
+
+    function setIssuerTrustStatus(bytes32 didHash, bool trusted) public {
+        trustedIssuers[didHash] = trusted;
+        emit TrustStatusUpdated(didHash, trusted);
+    }
+
+    function setIssuerTrustStatuses(bytes32[] calldata didHashes, bool[] calldata trusted) public {
+        require(didHashes.length == trusted.length, "Length mismatch");
+        for (uint256 i = 0; i < didHashes.length; i++) {
+            trustedIssuers[didHashes[i]] = trusted[i];
+            emit TrustStatusUpdated(didHashes[i], trusted[i]);
+        }
+    }
+
+    function isIssuerTrusted(bytes32 didHash) public view returns (bool) {
+        return trustedIssuers[didHash];
+    }
+}
+// Same behaviour as TrustRegistry, keyed by keccak256(did) instead of the DID string.
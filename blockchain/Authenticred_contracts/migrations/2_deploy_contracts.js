@@ -2,11 +2,20 @@ const DIDRegistry = artifacts.require("DIDRegistry");
 const TrustRegistry = artifacts.require("TrustRegistry");
 const CredentialAnchor = artifacts.require("CredentialAnchor");
 const RevocationRegistry = artifacts.require("RevocationRegistry");
+const Multicall = artifacts.require("Multicall");
+const DIDRegistryV2 = artifacts.require("DIDRegistryV2");
+const TrustRegistryV2 = artifacts.require("TrustRegistryV2");
+const RevocationRegistryV2 = artifacts.require("RevocationRegistryV2");
 
 module.exports = function(deployer) {
   deployer.deploy(DIDRegistry);
   deployer.deploy(TrustRegistry);
   deployer.deploy(CredentialAnchor);
   deployer.deploy(RevocationRegistry);
+  deployer.deploy(Multicall);
+  deployer.deploy(DIDRegistryV2);
+  deployer.deploy(TrustRegistryV2);
+  deployer.deploy(RevocationRegistryV2);
 };
-// This migration script deploys the four smart contracts: DIDRegistry, TrustRegistry, CredentialAnchor, and RevocationRegistry.
+// This migration script deploys the smart contracts: DIDRegistry, TrustRegistry, CredentialAnchor, RevocationRegistry and Multicall,
+// plus the bytes32-keyed DIDRegistryV2, TrustRegistryV2 and RevocationRegistryV2.
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import OnChainTransaction, DIDRegistration
+from .models import OnChainTransaction, ArchivedTransaction, DIDRegistration, QueuedChainWrite, ChainOperation, TaskOutbox
 
 @admin.register(OnChainTransaction)
 class OnChainTransactionAdmin(admin.ModelAdmin):
@@ -25,12 +25,26 @@ class OnChainTransactionAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         return super().get_queryset(request)
 
+@admin.register(ArchivedTransaction)
+class ArchivedTransactionAdmin(admin.ModelAdmin):
+    list_display = ('tx_hash', 'transaction_type', 'status', 'block_number', 'created_at', 'archived_at')
+    list_filter = ('transaction_type', 'status', 'archived_at')
+    search_fields = ('tx_hash', 'did', 'vc_hash')
+    ordering = ('-created_at',)
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
 @admin.register(DIDRegistration)
 class DIDRegistrationAdmin(admin.ModelAdmin):
     list_display = ('did', 'institution', 'registered_at', 'trust_updated')
     list_filter = ('trust_updated', 'registered_at')
     search_fields = ('did', 'institution__name', 'institution__user__username')
-    readonly_fields = ('did', 'registered_at')
+    # Transactions may be archived, and a select widget only offers the hot table
+    readonly_fields = ('did', 'registered_at', 'transaction')
     ordering = ('-registered_at',)
     
     fieldsets = (
@@ -54,3 +68,33 @@ class DIDRegistrationAdmin(admin.ModelAdmin):
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('institution__user', 'transaction')
+
+@admin.register(QueuedChainWrite)
+class QueuedChainWriteAdmin(admin.ModelAdmin):
+    list_display = ('operation', 'subject', 'status', 'attempts', 'transaction', 'created_at')
+    list_filter = ('operation', 'status', 'created_at')
+    search_fields = ('subject', 'transaction__tx_hash')
+    readonly_fields = ('transaction', 'created_at', 'updated_at')
+    ordering = ('-created_at',)
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('transaction')
+
+@admin.register(ChainOperation)
+class ChainOperationAdmin(admin.ModelAdmin):
+    list_display = ('operation', 'subject', 'status', 'attempts', 'transaction', 'updated_at')
+    list_filter = ('operation', 'status', 'created_at')
+    search_fields = ('subject', 'transaction__tx_hash', 'last_error')
+    readonly_fields = ('transaction', 'created_at', 'updated_at')
+    ordering = ('-created_at',)
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('transaction')
+
+@admin.register(TaskOutbox)
+class TaskOutboxAdmin(admin.ModelAdmin):
+    list_display = ('task_name', 'status', 'attempts', 'task_id', 'created_at', 'dispatched_at')
+    list_filter = ('task_name', 'status', 'created_at')
+    search_fields = ('task_name', 'task_id', 'last_error')
+    readonly_fields = ('created_at', 'updated_at', 'dispatched_at')
+    ordering = ('-created_at',)
@@ -5,6 +5,12 @@ class BlockchainConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blockchain'
     
+    def ready(self):
+        # Connect the Celery task signal handlers that feed the task metrics
+        from . import metrics  # noqa: F401
+        # Size database pools for Celery workers and feed the connection metrics
+        from AuthentiCred import db_pool  # noqa: F401
+    
     # def ready(self):
     #     # Start Celery beat when app is ready
     #     if not hasattr(self, 'celery_beat_started'):
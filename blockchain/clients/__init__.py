@@ -0,0 +1,25 @@
+# blockchain/clients/__init__.py
+from django.conf import settings
+from ..exceptions import BlockchainError
+from .base import BaseChainClient
+from .besu import BesuClient
+from .ganache import GanacheClient
+from .memory import InMemoryChainClient
+from .polygon import PolygonClient
+
+CLIENTS = {
+    'ganache': GanacheClient,
+    'polygon': PolygonClient,
+    'besu': BesuClient,
+    'memory': InMemoryChainClient,
+}
+
+
+def get_client(network=None, **kwargs):
+    """Create the chain client for BLOCKCHAIN_NETWORK (or the given network name)"""
+    network = (network or settings.BLOCKCHAIN_NETWORK).lower()
+    try:
+        client_class = CLIENTS[network]
+    except KeyError:
+        raise BlockchainError(f"Unsupported blockchain network: {network}")
+    return client_class(**kwargs)
@@ -0,0 +1,339 @@
+# blockchain/clients/base.py
+# Shared connector logic for all EVM networks
+import json
+import os
+import threading
+from functools import lru_cache
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import Web3
+from web3.exceptions import (
+    ContractLogicError, ProviderConnectionError, RequestTimedOut, TimeExhausted, TransactionNotFound,
+)
+from eth_account import Account
+from eth_utils.abi import get_abi_output_types
+from django.conf import settings
+from ..exceptions import BlockchainError, ChainConnectionError, ContractCallError, TransactionFailedError
+from ..utils.fees import FeeStrategy
+from ..utils.instrumentation import instrumented
+from .failover import FailoverProvider
+
+# Providers are shared per (transport, endpoint) so keep-alive sessions and
+# WebSocket/IPC connections survive across client instances in one process
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def load_abi(contract_name):
+    """Load a contract ABI from blockchain/abis (Truffle artifact or bare ABI list)"""
+    abi_path = os.path.join(settings.BASE_DIR, 'blockchain', 'abis', f'{contract_name}.json')
+    with open(abi_path) as f:
+        contract_data = json.load(f)
+    if isinstance(contract_data, dict) and 'abi' in contract_data:
+        return contract_data['abi']
+    return contract_data
+
+
+def resolve_transport(endpoint, transport=None):
+    """
+    Pick the transport for an endpoint.
+
+    'auto' (the default) infers it from the endpoint: ws:// and wss:// use WebSocket,
+    ipc:// or a filesystem path ending in .ipc uses IPC, anything else HTTP.
+    """
+    transport = (transport or settings.BLOCKCHAIN_TRANSPORT).lower()
+    if transport != 'auto':
+        return transport
+    if endpoint.startswith(('ws://', 'wss://')):
+        return 'ws'
+    if endpoint.startswith('ipc://') or endpoint.endswith('.ipc'):
+        return 'ipc'
+    return 'http'
+
+
+def build_provider(endpoint, transport=None):
+    """Create (or reuse) a web3 provider for the endpoint and transport"""
+    transport = resolve_transport(endpoint, transport)
+    key = (transport, endpoint)
+    with _providers_lock:
+        provider = _providers.get(key)
+        if provider is not None:
+            return provider
+
+        timeout = settings.BLOCKCHAIN_RPC_TIMEOUT
+        if transport == 'http':
+            # One pooled keep-alive session per endpoint instead of a new TCP/TLS handshake per call
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=settings.BLOCKCHAIN_HTTP_POOL_SIZE,
+                pool_maxsize=settings.BLOCKCHAIN_HTTP_POOL_SIZE
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            provider = Web3.HTTPProvider(endpoint, request_kwargs={'timeout': timeout}, session=session)
+        elif transport == 'ws':
+            provider = Web3.LegacyWebSocketProvider(endpoint, websocket_timeout=timeout)
+        elif transport == 'ipc':
+            path = endpoint[len('ipc://'):] if endpoint.startswith('ipc://') else endpoint
+            provider = Web3.IPCProvider(path, timeout=timeout)
+        else:
+            raise BlockchainError(f"Unsupported blockchain transport: {transport}")
+
+        # Let web3 cache eth_chainId and similar constant requests instead of
+        # re-sending them around every call
+        provider.cache_allowed_requests = True
+        _providers[key] = provider
+        return provider
+
+
+def build_chain_provider(rpc_url=None, transport=None):
+    """
+    Provider for a client: the given URL, or BLOCKCHAIN_RPC_URLS with failover and
+    hedged reads across the nodes when more than one is configured.
+    """
+    urls = [rpc_url] if rpc_url else settings.BLOCKCHAIN_RPC_URLS
+    if len(urls) == 1:
+        return build_provider(urls[0], transport)
+
+    endpoints = [(url, build_provider(url, transport)) for url in urls]
+    key = ('failover', tuple(urls))
+    with _providers_lock:
+        if key not in _providers:
+            _providers[key] = FailoverProvider(endpoints)
+        return _providers[key]
+
+
+class BaseChainClient:
+    """
+    Common implementation of the chain client interface used by BlockchainService.
+
+    Subclasses set `network_name` and override `get_chain_id` / `setup_account` for
+    network-specific behaviour. Errors are mapped onto the blockchain exceptions:
+    reverts on reads raise ContractCallError, failed sends TransactionFailedError and
+    unreachable nodes ChainConnectionError.
+    """
+    network_name = 'EVM'
+    # Chains with extraData longer than 32 bytes (Polygon PoS, Besu IBFT/QBFT)
+    poa = False
+
+    def __init__(self, rpc_url=None, transport=None):
+        self.rpc_url = rpc_url or settings.BLOCKCHAIN_RPC_URLS[0]
+        self.w3 = Web3(build_chain_provider(rpc_url, transport))
+        if self.poa:
+            from web3.middleware import ExtraDataToPOAMiddleware
+            self.w3.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0)
+        if not self.w3.is_connected():
+            raise ChainConnectionError(f"Failed to connect to {self.network_name} node")
+
+        self.chain_id = self.get_chain_id()
+        self.fees = FeeStrategy(self.w3, self.chain_id)
+        self._contracts = {}
+        self.setup_account()
+
+    def get_chain_id(self):
+        return self.w3.eth.chain_id
+
+    def setup_account(self):
+        """Use the configured operator key, or the node's first unlocked account without one"""
+        private_key = settings.BLOCKCHAIN_OPERATOR_KEY
+        if not private_key:
+            accounts = self.w3.eth.accounts
+            if not accounts:
+                raise BlockchainError(f"No operator key configured and no unlocked accounts on the {self.network_name} node")
+            self.sender_address = accounts[0]
+            self.private_key = None
+            return
+
+        if private_key.startswith('0x'):
+            private_key = private_key[2:]
+        # Ensure private key is exactly 64 characters (32 bytes)
+        if len(private_key) != 64:
+            raise BlockchainError(f"Invalid private key length: {len(private_key)} (expected 64)")
+        self.private_key = f"0x{private_key}"
+        self.sender_address = settings.BLOCKCHAIN_OPERATOR_ADDRESS or Account.from_key(self.private_key).address
+
+    def has_contract(self, contract_name):
+        """Whether an address is configured for the contract on this network"""
+        return bool(getattr(settings, f"{contract_name.upper()}_ADDRESS", ''))
+
+    def _load_contract(self, contract_name):
+        """Load contract ABI and address from settings"""
+        if contract_name in self._contracts:
+            return self._contracts[contract_name]
+
+        address = getattr(settings, f"{contract_name.upper()}_ADDRESS", '')
+        if not address:
+            raise BlockchainError(f"Contract address not set for {contract_name}")
+
+        # Validate address format
+        if not self.w3.is_address(address):
+            raise BlockchainError(f"Invalid contract address for {contract_name}: {address}")
+
+        contract = self.w3.eth.contract(address=self.w3.to_checksum_address(address), abi=load_abi(contract_name))
+        self._contracts[contract_name] = contract
+        return contract
+
+    def _format_args(self, args):
+        """Convert 64-character hex strings (also inside arrays) to bytes32 values"""
+        formatted_args = []
+        for arg in args:
+            if isinstance(arg, str) and len(arg) == 64 and all(c in '0123456789abcdefABCDEF' for c in arg):
+                # Convert hex string to bytes32
+                formatted_args.append(bytes.fromhex(arg))
+            elif isinstance(arg, (list, tuple)):
+                formatted_args.append(self._format_args(arg))
+            else:
+                formatted_args.append(arg)
+        return formatted_args
+
+    def _map_error(self, e, message, default=BlockchainError):
+        """Wrap a provider/contract exception in the matching blockchain exception"""
+        if isinstance(e, BlockchainError):
+            error_class = type(e)
+        elif isinstance(e, (ProviderConnectionError, RequestTimedOut, TimeExhausted, ConnectionError, TimeoutError,
+                            requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            error_class = ChainConnectionError
+        elif isinstance(e, ContractLogicError):
+            error_class = ContractCallError
+        else:
+            error_class = default
+        return error_class(f"{message}: {str(e)}")
+
+    @instrumented('send')
+    def execute_contract_function(self, contract_name, function_name, *args, gas=None, on_signed=None):
+        """
+        Execute a write function on a smart contract.
+
+        `on_signed` is called with the transaction hash once it is signed, before
+        it is broadcast (not called when the node signs with an unlocked account).
+        """
+        try:
+            contract = self._load_contract(contract_name)
+            # Count pending transactions too, so back-to-back sends never reuse a nonce
+            nonce = self.w3.eth.get_transaction_count(self.sender_address, 'pending')
+            function = contract.functions[function_name](*self._format_args(args))
+
+            # Build transaction with an estimated gas limit and current fees
+            tx = function.build_transaction({
+                'chainId': self.chain_id,
+                'nonce': nonce,
+                'from': self.sender_address,
+                **self.fees.transaction_params(function, self.sender_address, gas),
+            })
+            return self._send_transaction(tx, on_signed)
+        except Exception as e:
+            raise self._map_error(
+                e, f"Contract execution failed for {contract_name}.{function_name}", TransactionFailedError
+            ) from e
+
+    def _send_transaction(self, tx, on_signed=None):
+        """Sign with the operator key, or send from the node's unlocked account"""
+        if self.private_key is None:
+            tx_hash = self.w3.eth.send_transaction(tx)
+        else:
+            signed_tx = self.w3.eth.account.sign_transaction(tx, self.private_key)
+            if on_signed:
+                on_signed(Web3.to_hex(signed_tx.hash))
+            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        return Web3.to_hex(tx_hash)
+
+    @instrumented('replace', label='replace_transaction')
+    def replace_transaction(self, tx_hash):
+        """
+        Resend a pending transaction with the same nonce and bumped fees.
+
+        Returns:
+            str: hash of the replacement, or None if the original is already mined or
+            its fees cannot be bumped under BLOCKCHAIN_MAX_FEE_GWEI
+        """
+        try:
+            tx = self.w3.eth.get_transaction(tx_hash)
+            if tx.get('blockNumber') is not None:
+                return None
+            fees = self.fees.replacement_params(tx)
+            if fees is None:
+                return None
+
+            replacement = {
+                'chainId': self.chain_id,
+                'nonce': tx['nonce'],
+                'from': tx['from'],
+                'to': tx['to'],
+                'data': tx['input'],
+                'value': tx['value'],
+                'gas': tx['gas'],
+                **fees,
+            }
+            return self._send_transaction(replacement)
+        except Exception as e:
+            raise self._map_error(e, f"Transaction replacement failed for {tx_hash}", TransactionFailedError) from e
+
+    @instrumented('call')
+    def call_contract_function(self, contract_name, function_name, *args):
+        """Call a read function on a smart contract"""
+        try:
+            contract = self._load_contract(contract_name)
+            return contract.functions[function_name](*self._format_args(args)).call()
+        except Exception as e:
+            raise self._map_error(
+                e, f"Contract call failed for {contract_name}.{function_name}", ContractCallError
+            ) from e
+
+    @instrumented('multicall', label='Multicall.tryAggregate')
+    def aggregate_calls(self, calls, gas=None):
+        """
+        Execute several read functions in a single eth_call through the Multicall contract.
+
+        Args:
+            calls: list of (contract_name, function_name, args) tuples
+            gas: optional gas limit for the eth_call
+
+        Returns:
+            list: decoded result for each call, or None where the call reverted
+        """
+        try:
+            multicall = self._load_contract('Multicall')
+            functions = []
+            encoded_calls = []
+            for contract_name, function_name, args in calls:
+                contract = self._load_contract(contract_name)
+                functions.append(contract.get_function_by_name(function_name))
+                encoded_calls.append((
+                    contract.address,
+                    contract.encode_abi(function_name, args=self._format_args(args))
+                ))
+
+            call_params = {'gas': gas} if gas else {}
+            raw_results = multicall.functions.tryAggregate(False, encoded_calls).call(call_params)
+
+            results = []
+            for function, (success, return_data) in zip(functions, raw_results):
+                if not success:
+                    results.append(None)
+                    continue
+                output_types = get_abi_output_types(function.abi)
+                decoded = self.w3.codec.decode(output_types, return_data)
+                results.append(decoded[0] if len(decoded) == 1 else decoded)
+            return results
+        except Exception as e:
+            raise self._map_error(e, "Multicall failed", ContractCallError) from e
+
+    @instrumented('lookup', label='eth_getTransactionByHash')
+    def transaction_exists(self, tx_hash):
+        """Whether the node knows the transaction, pending or mined"""
+        try:
+            self.w3.eth.get_transaction(tx_hash)
+            return True
+        except TransactionNotFound:
+            return False
+        except Exception as e:
+            raise self._map_error(e, "Failed to look up transaction") from e
+
+    @instrumented('receipt', label='eth_getTransactionReceipt')
+    def get_transaction_receipt(self, tx_hash):
+        """Get transaction receipt from blockchain"""
+        try:
+            return self.w3.eth.get_transaction_receipt(tx_hash)
+        except Exception as e:
+            raise self._map_error(e, "Failed to get transaction receipt") from e
@@ -1,53 +1,11 @@
 # blockchain/clients/besu.py
-# Similar structure to polygon.py but for Hyperledger Besu
-import json
-import os
-from web3 import Web3
+# Hyperledger Besu (IBFT/QBFT networks put validator data in extraData)
 from django.conf import settings
-from ..exceptions import BlockchainError
+from .base import BaseChainClient
 
-class BesuClient:
-    def __init__(self):
-        self.w3 = Web3(Web3.HTTPProvider(settings.BLOCKCHAIN_RPC_URL))
-        if not self.w3.is_connected():
-            raise BlockchainError("Failed to connect to Besu node")
-        
-        self.chain_id = settings.BESU_CHAIN_ID
-        self.private_key = settings.BLOCKCHAIN_OPERATOR_KEY
-        self.sender_address = settings.BLOCKCHAIN_OPERATOR_ADDRESS
+class BesuClient(BaseChainClient):
+    network_name = 'Besu'
+    poa = True
     
-    def _load_contract(self, contract_name):
-        abi_path = os.path.join(settings.BASE_DIR, 'blockchain', 'abis', f'{contract_name}.json')
-        with open(abi_path) as f:
-            abi = json.load(f)
-        
-        address = getattr(settings, f"{contract_name.upper()}_ADDRESS")
-        return self.w3.eth.contract(address=address, abi=abi)
-    
-    def execute_contract_function(self, contract_name, function_name, *args):
-        contract = self._load_contract(contract_name)
-        nonce = self.w3.eth.get_transaction_count(self.sender_address)
-        
-        tx = contract.functions[function_name](*args).build_transaction({
-            'chainId': self.chain_id,
-            'gas': 500000,
-            'nonce': nonce,
-            'from': self.sender_address,
-        })
-        
-        signed_tx = self.w3.eth.account.sign_transaction(tx, self.private_key)
-        tx_hash = self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        return tx_hash.hex()
-    
-    def call_contract_function(self, contract_name, function_name, *args):
-        contract = self._load_contract(contract_name)
-        return contract.functions[function_name](*args).call()
-    
-    def get_transaction_receipt(self, tx_hash):
-        """Get transaction receipt from blockchain"""
-        try:
-            receipt = self.w3.eth.get_transaction_receipt(tx_hash)
-            return receipt
-        except Exception as e:
-            raise BlockchainError(f"Failed to get transaction receipt: {str(e)}")
-    
\ No newline at end of file
+    def get_chain_id(self):
+        return settings.BESU_CHAIN_ID
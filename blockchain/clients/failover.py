@@ -0,0 +1,213 @@
+# blockchain/clients/failover.py
+# Multi-endpoint provider: latency-aware reads with hedging, writes pinned to a primary
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from django.conf import settings
+from web3.exceptions import ProviderConnectionError
+from web3.providers.base import JSONBaseProvider
+
+logger = logging.getLogger(__name__)
+
+# Methods that must reach the primary node: sends, nonces, lookups of transactions
+# the primary just accepted (a lagging node would report them as missing and they
+# would be sent again), and anything tied to accounts unlocked on a specific node
+PRIMARY_METHODS = frozenset({
+    'eth_sendRawTransaction',
+    'eth_sendTransaction',
+    'eth_getTransactionCount',
+    'eth_getTransactionByHash',
+    'eth_getTransactionReceipt',
+    'eth_accounts',
+    'eth_sign',
+    'eth_signTransaction',
+    'eth_signTypedData_v4',
+})
+
+
+class RPCEndpoint:
+    """Latency/error tracking and circuit breaker state for one node"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, url, provider):
+        self.url = url
+        self.provider = provider
+        self.latency = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.state = self.CLOSED
+        self.opened_at = 0
+        self.requests = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def is_available(self):
+        """Closed circuits take traffic; open (or half-open) ones take a probe once the cooldown has passed"""
+        with self._lock:
+            return self._can_take_request()
+
+    def acquire(self):
+        """
+        Claim this endpoint for a request about to be sent.
+
+        An open endpoint past its cooldown becomes half-open and the caller's
+        request is its probe. If the probe never reports back, another probe
+        is allowed after a further cooldown.
+        """
+        with self._lock:
+            if not self._can_take_request():
+                return False
+            if self.state != self.CLOSED:
+                self.state = self.HALF_OPEN
+                self.opened_at = time.monotonic()
+            return True
+
+    def _can_take_request(self):
+        if self.state == self.CLOSED:
+            return True
+        return time.monotonic() - self.opened_at >= settings.BLOCKCHAIN_RPC_COOLDOWN
+
+    def score(self):
+        """Lower is better: smoothed latency, penalised by the recent error rate"""
+        return (self.latency or 0.0) * (1 + 4 * self.error_rate)
+
+    def record_success(self, latency):
+        alpha = settings.BLOCKCHAIN_RPC_EWMA_ALPHA
+        with self._lock:
+            self.requests += 1
+            self.latency = latency if self.latency is None else alpha * latency + (1 - alpha) * self.latency
+            self.error_rate = (1 - alpha) * self.error_rate
+            self.consecutive_failures = 0
+            if self.state != self.CLOSED:
+                logger.info(f"RPC endpoint {self.url} readmitted")
+            self.state = self.CLOSED
+
+    def record_failure(self):
+        alpha = settings.BLOCKCHAIN_RPC_EWMA_ALPHA
+        with self._lock:
+            self.requests += 1
+            self.failures += 1
+            self.error_rate = alpha + (1 - alpha) * self.error_rate
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= settings.BLOCKCHAIN_RPC_FAILURE_THRESHOLD:
+                if self.state != self.OPEN:
+                    logger.warning(f"RPC endpoint {self.url} ejected after {self.consecutive_failures} failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def stats(self):
+        return {
+            'url': self.url,
+            'state': self.state,
+            'latency_ms': round(self.latency * 1000, 1) if self.latency is not None else None,
+            'error_rate': round(self.error_rate, 3),
+            'requests': self.requests,
+            'failures': self.failures,
+        }
+
+
+class FailoverProvider(JSONBaseProvider):
+    """
+    web3 provider spreading requests over several nodes.
+
+    - Reads go to the healthy endpoint with the best latency score. If it has not
+      answered within BLOCKCHAIN_RPC_HEDGE_DELAY seconds, the next endpoint is asked
+      as well and the first answer wins.
+    - Writes, nonces and account methods always go to the first (primary) endpoint,
+      so nonces and pending transactions stay consistent.
+    - Endpoints failing BLOCKCHAIN_RPC_FAILURE_THRESHOLD times in a row are ejected
+      and readmitted through a probe request after BLOCKCHAIN_RPC_COOLDOWN seconds.
+
+    JSON-RPC error responses (e.g. reverts) are answers, not endpoint failures; only
+    transport exceptions count against an endpoint.
+    """
+
+    def __init__(self, endpoints, **kwargs):
+        super().__init__(**kwargs)
+        self.endpoints = [RPCEndpoint(url, provider) for url, provider in endpoints]
+        self.primary = self.endpoints[0]
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(4, 2 * len(self.endpoints)),
+            thread_name_prefix='rpc-hedge'
+        )
+
+    def make_request(self, method, params):
+        if method in PRIMARY_METHODS:
+            if not self.primary.acquire():
+                raise ProviderConnectionError(f"Primary RPC endpoint {self.primary.url} is unavailable")
+            return self._call(self.primary, method, params)
+        return self._read(method, params)
+
+    def _call(self, endpoint, method, params):
+        start = time.monotonic()
+        try:
+            response = endpoint.provider.make_request(method, params)
+        except Exception:
+            endpoint.record_failure()
+            raise
+        endpoint.record_success(time.monotonic() - start)
+        return response
+
+    def _read_candidates(self):
+        # Ejected endpoints due a probe go first, so reads readmit them once they recover;
+        # hedging bounds the delay if the probe is slow
+        available = [endpoint for endpoint in self.endpoints if endpoint.is_available()]
+        return sorted(available, key=lambda endpoint: (endpoint.state == endpoint.CLOSED, endpoint.score()))
+
+    def _read(self, method, params):
+        candidates = self._read_candidates()
+        if not candidates:
+            raise ProviderConnectionError("No healthy RPC endpoints available")
+
+        pending = {}
+        errors = []
+        next_index = 0
+
+        def launch():
+            # Only the endpoints actually asked leave the open state (as probes)
+            nonlocal next_index
+            while next_index < len(candidates):
+                endpoint = candidates[next_index]
+                next_index += 1
+                if endpoint.acquire():
+                    pending[self._executor.submit(self._call, endpoint, method, params)] = endpoint
+                    return
+
+        launch()
+        while pending:
+            hedge_delay = settings.BLOCKCHAIN_RPC_HEDGE_DELAY if next_index < len(candidates) else None
+            done, _ = wait(pending, timeout=hedge_delay, return_when=FIRST_COMPLETED)
+            if not done:
+                # Slowest path: hedge with the next best endpoint
+                launch()
+                continue
+            for future in done:
+                endpoint = pending.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    logger.warning(f"RPC {method} failed on {endpoint.url}: {str(e)}")
+                    errors.append(e)
+            if not pending and next_index < len(candidates):
+                launch()
+
+        if not errors:
+            raise ProviderConnectionError("No healthy RPC endpoints available")
+        raise ProviderConnectionError(f"All RPC endpoints failed for {method}: {errors[-1]}")
+
+    def is_connected(self, show_traceback=False):
+        try:
+            response = self.make_request('web3_clientVersion', [])
+        except Exception as e:
+            if show_traceback:
+                raise ProviderConnectionError(f"Problem connecting to RPC endpoints: {e}")
+            return False
+        return 'error' not in response
+
+    def endpoint_stats(self):
+        """Per-endpoint health for diagnostics"""
+        return [endpoint.stats() for endpoint in self.endpoints]
@@ -0,0 +1,400 @@
+# blockchain/clients/memory.py
+# In-process chain stand-in for tests, benchmarks and offline development
+import random
+import threading
+import time
+from collections import Counter
+from web3 import Web3
+from web3.datastructures import AttributeDict
+from django.conf import settings
+from ..exceptions import BlockchainError, ContractCallError, TransactionFailedError
+from ..utils.instrumentation import instrumented
+from .base import BaseChainClient, load_abi
+
+
+class SimulatedRevert(Exception):
+    """A require() failure inside a simulated contract"""
+    pass
+
+
+def require(condition, message):
+    if not condition:
+        raise SimulatedRevert(message)
+
+
+class SimulatedContract:
+    """
+    Python model of a deployed contract.
+
+    Subclasses implement the Solidity functions as methods with the same names;
+    arguments are checked against the bundled ABI in blockchain/abis before every
+    call, so a type mismatch fails here just as it would against a real node.
+    """
+    storage_writes = 0
+
+    def __init__(self, contract_name, address):
+        self.contract_name = contract_name
+        self.address = address
+        self.functions = {
+            item['name']: item for item in load_abi(contract_name) if item.get('type') == 'function'
+        }
+
+    def _set(self, mapping, key, value):
+        mapping[key] = value
+        self.storage_writes += 1
+
+    def invoke(self, function_name, args, codec, view):
+        abi = self.functions.get(function_name)
+        if abi is None:
+            raise BlockchainError(f"Function {function_name} not found in {self.contract_name} ABI")
+        if (abi['stateMutability'] in ('view', 'pure')) != view:
+            kind = 'read' if view else 'write'
+            raise BlockchainError(f"{self.contract_name}.{function_name} cannot be used as a {kind} function")
+
+        input_types = [item['type'] for item in abi['inputs']]
+        if len(args) != len(input_types):
+            raise BlockchainError(
+                f"{self.contract_name}.{function_name} expects {len(input_types)} arguments, got {len(args)}"
+            )
+        try:
+            codec.encode(input_types, args)
+        except Exception as e:
+            raise BlockchainError(f"Invalid arguments for {self.contract_name}.{function_name}: {str(e)}") from e
+
+        return getattr(self, function_name)(*args)
+
+
+class DIDRegistrySim(SimulatedContract):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.public_keys = {}
+
+    def _key(self, did):
+        return did
+
+    def registerDID(self, did, public_key):
+        require(len(did) > 0, "DID cannot be empty")
+        require(len(public_key) > 0, "Public key cannot be empty")
+        key = self._key(did)
+        require(not self.public_keys.get(key), "DID already registered")
+        self._set(self.public_keys, key, public_key)
+
+    def resolveDID(self, did_key):
+        return self.public_keys.get(did_key, '')
+
+    def didToPublicKey(self, did_key):
+        return self.resolveDID(did_key)
+
+
+class DIDRegistryV2Sim(DIDRegistrySim):
+    def _key(self, did):
+        return bytes(Web3.keccak(text=did))
+
+
+class TrustRegistrySim(SimulatedContract):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.trusted = {}
+
+    def setIssuerTrustStatus(self, did, trusted):
+        self._set(self.trusted, did, trusted)
+
+    def setIssuerTrustStatuses(self, dids, trusted):
+        require(len(dids) == len(trusted), "Length mismatch")
+        for did, status in zip(dids, trusted):
+            self._set(self.trusted, did, status)
+
+    def isIssuerTrusted(self, did):
+        return self.trusted.get(did, False)
+
+    def trustedIssuers(self, did):
+        return self.isIssuerTrusted(did)
+
+
+class CredentialAnchorSim(SimulatedContract):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.proofs = {}
+
+    def storeProof(self, proof_hash):
+        self._set(self.proofs, proof_hash, True)
+
+    def storeProofs(self, proof_hashes):
+        for proof_hash in proof_hashes:
+            self._set(self.proofs, proof_hash, True)
+
+    def verifyProof(self, proof_hash):
+        return self.proofs.get(proof_hash, False)
+
+    def anchoredProofs(self, proof_hash):
+        return self.verifyProof(proof_hash)
+
+
+class RevocationRegistrySim(SimulatedContract):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.revoked = {}
+
+    def revokeCredential(self, credential_id):
+        self._set(self.revoked, credential_id, True)
+
+    def revokeCredentials(self, credential_ids):
+        for credential_id in credential_ids:
+            self._set(self.revoked, credential_id, True)
+
+    def isRevoked(self, credential_id):
+        return self.revoked.get(credential_id, False)
+
+    def revokedCredentials(self, credential_id):
+        return self.isRevoked(credential_id)
+
+
+SIMULATORS = {
+    'DIDRegistry': DIDRegistrySim,
+    'TrustRegistry': TrustRegistrySim,
+    'CredentialAnchor': CredentialAnchorSim,
+    'RevocationRegistry': RevocationRegistrySim,
+    'DIDRegistryV2': DIDRegistryV2Sim,
+    'TrustRegistryV2': TrustRegistrySim,
+    'RevocationRegistryV2': RevocationRegistrySim,
+}
+
+
+class InMemoryChain:
+    """
+    Deterministic chain state shared by all InMemoryChainClient instances.
+
+    With block_time=0 every transaction is mined as soon as it is sent (like Ganache's
+    automine). With block_time > 0, transactions stay pending until the next block
+    boundary, so code waiting for confirmations behaves as it does on a real network.
+    """
+    chain_id = 1337
+    # Rough per-transaction gas accounting for benchmarks: base cost plus a fresh SSTORE per write
+    BASE_GAS = 21000
+    STORAGE_WRITE_GAS = 22100
+
+    def __init__(self, block_time=0.0):
+        self.block_time = block_time
+        self.block_number = 0
+        self.last_block_at = time.monotonic()
+        self.accounts = [Web3.to_checksum_address(f'0x{index + 1:040x}') for index in range(10)]
+        self.contracts = {}
+        self.pending = []
+        self.transactions = {}
+        self.receipts = {}
+        self.nonce = 0
+        # Simulated round trips made by all clients of this chain
+        self.rpc_calls = Counter()
+        self.codec = Web3().codec
+        self._lock = threading.RLock()
+
+    def contract(self, contract_name):
+        with self._lock:
+            if contract_name not in self.contracts:
+                if contract_name not in SIMULATORS:
+                    raise BlockchainError(f"No in-memory simulator for {contract_name}")
+                address = Web3.to_checksum_address(bytes(Web3.keccak(text=contract_name))[-20:])
+                self.contracts[contract_name] = SIMULATORS[contract_name](contract_name, address)
+            return self.contracts[contract_name]
+
+    def call(self, contract_name, function_name, args):
+        with self._lock:
+            self.mine_due_blocks()
+            try:
+                return self.contract(contract_name).invoke(function_name, args, self.codec, view=True)
+            except SimulatedRevert as e:
+                raise ContractCallError(f"execution reverted: {str(e)}") from e
+
+    def send(self, contract_name, function_name, args, sender, on_signed=None):
+        with self._lock:
+            self.mine_due_blocks()
+            contract = self.contract(contract_name)
+            tx_hash = Web3.to_hex(Web3.keccak(text=f"{self.chain_id}:{self.nonce}:{contract_name}.{function_name}:{args!r}"))
+            if on_signed:
+                on_signed(tx_hash)
+            self.transactions[tx_hash] = AttributeDict({
+                'hash': tx_hash,
+                'nonce': self.nonce,
+                'from': sender,
+                'to': contract.address,
+                'call': (contract_name, function_name, args),
+                'blockNumber': None,
+            })
+            self.nonce += 1
+            self.pending.append(tx_hash)
+            if not self.block_time:
+                # Automine: revert synchronously, as gas estimation would on a live node
+                self.mine_block(raise_on_revert=True)
+            return tx_hash
+
+    def replace(self, tx_hash):
+        """Re-key a pending transaction as a fee-bumped replacement"""
+        with self._lock:
+            self.mine_due_blocks()
+            tx = self.transactions.get(tx_hash)
+            if tx is None:
+                raise BlockchainError(f"Transaction {tx_hash} not found")
+            if tx['blockNumber'] is not None:
+                return None
+            new_hash = Web3.to_hex(Web3.keccak(text=f"replacement:{tx_hash}"))
+            self.transactions[new_hash] = AttributeDict({**tx, 'hash': new_hash})
+            del self.transactions[tx_hash]
+            self.pending[self.pending.index(tx_hash)] = new_hash
+            return new_hash
+
+    def receipt(self, tx_hash):
+        with self._lock:
+            self.mine_due_blocks()
+            return self.receipts.get(tx_hash)
+
+    def mine_due_blocks(self):
+        if not self.block_time:
+            return
+        elapsed_blocks = int((time.monotonic() - self.last_block_at) / self.block_time)
+        if elapsed_blocks <= 0:
+            return
+        self.block_number += elapsed_blocks - 1
+        self.last_block_at += elapsed_blocks * self.block_time
+        self.mine_block()
+
+    def mine_block(self, raise_on_revert=False):
+        """Apply all pending transactions in a new block"""
+        with self._lock:
+            self.block_number += 1
+            pending, self.pending = self.pending, []
+            for tx_hash in pending:
+                tx = self.transactions[tx_hash]
+                contract_name, function_name, args = tx['call']
+                contract = self.contract(contract_name)
+                writes_before = contract.storage_writes
+                status = 1
+                error = None
+                try:
+                    contract.invoke(function_name, args, self.codec, view=False)
+                except SimulatedRevert as e:
+                    status = 0
+                    error = e
+                self.transactions[tx_hash] = AttributeDict({**tx, 'blockNumber': self.block_number})
+                self.receipts[tx_hash] = AttributeDict({
+                    'transactionHash': tx_hash,
+                    'blockNumber': self.block_number,
+                    'status': status,
+                    'gasUsed': self.BASE_GAS + self.STORAGE_WRITE_GAS * (contract.storage_writes - writes_before),
+                })
+                if error is not None and raise_on_revert:
+                    raise TransactionFailedError(f"execution reverted: {str(error)}") from error
+
+
+_default_chain = None
+_default_chain_lock = threading.Lock()
+
+
+def get_memory_chain():
+    """The process-wide chain used by clients created without an explicit chain"""
+    global _default_chain
+    with _default_chain_lock:
+        if _default_chain is None:
+            _default_chain = InMemoryChain(block_time=settings.BLOCKCHAIN_MEMORY_BLOCK_TIME)
+        return _default_chain
+
+
+def reset_memory_chain(block_time=None):
+    """Discard the process-wide chain state (e.g. between tests)"""
+    global _default_chain
+    with _default_chain_lock:
+        _default_chain = InMemoryChain(
+            block_time=settings.BLOCKCHAIN_MEMORY_BLOCK_TIME if block_time is None else block_time
+        )
+        return _default_chain
+
+
+class InMemoryChainClient(BaseChainClient):
+    """
+    Chain client backed by InMemoryChain instead of a node.
+
+    Selected with BLOCKCHAIN_NETWORK=memory, or passed to BlockchainService(client=...).
+    Every method that would be one JSON-RPC round trip sleeps for the injected
+    latency and is counted in `rpc_calls`, so benchmarks can report RPC usage.
+
+    Args:
+        chain: InMemoryChain to use (default: the process-wide chain)
+        latency: seconds per round trip, or a (min, max) range sampled from a seeded RNG
+        seed: RNG seed for latency sampling
+    """
+    network_name = 'in-memory'
+
+    def __init__(self, chain=None, latency=None, seed=0, **kwargs):
+        self.chain = chain or get_memory_chain()
+        self.latency = settings.BLOCKCHAIN_MEMORY_LATENCY if latency is None else latency
+        self._random = random.Random(seed)
+        self.rpc_calls = Counter()
+        self.rpc_url = 'memory://'
+        self.w3 = Web3()
+        self.chain_id = self.chain.chain_id
+        self.sender_address = self.chain.accounts[0]
+        self.private_key = None
+
+    def _round_trip(self, method):
+        self.rpc_calls[method] += 1
+        self.chain.rpc_calls[method] += 1
+        latency = self.latency
+        if isinstance(latency, (list, tuple)):
+            latency = self._random.uniform(*latency)
+        if latency:
+            time.sleep(latency)
+
+    def has_contract(self, contract_name):
+        return contract_name == 'Multicall' or contract_name in SIMULATORS
+
+    @instrumented('send')
+    def execute_contract_function(self, contract_name, function_name, *args, gas=None, on_signed=None):
+        """Execute a write function on a simulated contract"""
+        self._round_trip('eth_sendTransaction')
+        try:
+            return self.chain.send(
+                contract_name, function_name, self._format_args(args), self.sender_address, on_signed=on_signed
+            )
+        except Exception as e:
+            raise self._map_error(
+                e, f"Contract execution failed for {contract_name}.{function_name}", TransactionFailedError
+            ) from e
+
+    @instrumented('call')
+    def call_contract_function(self, contract_name, function_name, *args):
+        """Call a read function on a simulated contract"""
+        self._round_trip('eth_call')
+        try:
+            return self.chain.call(contract_name, function_name, self._format_args(args))
+        except Exception as e:
+            raise self._map_error(
+                e, f"Contract call failed for {contract_name}.{function_name}", ContractCallError
+            ) from e
+
+    @instrumented('multicall', label='Multicall.tryAggregate')
+    def aggregate_calls(self, calls, gas=None):
+        """Execute several reads in one simulated round trip; failed calls yield None"""
+        self._round_trip('eth_call')
+        results = []
+        for contract_name, function_name, args in calls:
+            try:
+                results.append(self.chain.call(contract_name, function_name, self._format_args(args)))
+            except BlockchainError:
+                results.append(None)
+        return results
+
+    @instrumented('replace', label='replace_transaction')
+    def replace_transaction(self, tx_hash):
+        self._round_trip('eth_sendTransaction')
+        return self.chain.replace(tx_hash)
+
+    @instrumented('lookup', label='eth_getTransactionByHash')
+    def transaction_exists(self, tx_hash):
+        """Whether the simulated node knows the transaction, pending or mined"""
+        self._round_trip('eth_getTransactionByHash')
+        return tx_hash in self.chain.transactions
+
+    @instrumented('receipt', label='eth_getTransactionReceipt')
+    def get_transaction_receipt(self, tx_hash):
+        """Get transaction receipt, or None while the transaction is pending"""
+        self._round_trip('eth_getTransactionReceipt')
+        return self.chain.receipt(tx_hash)
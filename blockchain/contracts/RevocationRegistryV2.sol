@@ -0,0 +1,27 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.9;
+
+contract RevocationRegistryV2 {
+    mapping(bytes32 => bool) public revokedCredentials;
+    event CredentialRevoked(bytes32 indexed credentialKey);
+
+    function revokeCredential(bytes32 credentialKey) public {
+        revokedCredentials[credentialKey] = true;
+        emit CredentialRevoked(credentialKey);
+    }
+
+    function revokeCredentials(bytes32[] calldata credentialKeys) public {
+        for (uint256 i = 0; i < credentialKeys.length; i++) {
+            revokedCredentials[credentialKeys[i]] = true;
+            emit CredentialRevoked(credentialKeys[i]);
+        }
+    }
+
+    function isRevoked(bytes32 credentialKey) public view returns (bool) {
+        return revokedCredentials[credentialKey];
+    }
+}
+// Same behaviour as RevocationRegistry, keyed by a fixed-size bytes32 instead of a string.
+// The key is the 16 bytes of the credential UUID, right-padded with zeros (see blockchain/utils/keys.py).
+// Fixed-size keys skip the keccak of a dynamic string on every access, keep calldata to one word per
+// credential, and the indexed event topic is the key itself, so revocations can be filtered by credential.
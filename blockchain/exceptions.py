@@ -10,3 +10,21 @@ class TransactionFailedError(BlockchainError):
 class ContractCallError(BlockchainError):
     """Raised when a smart contract call fails"""
     pass
+
+class ChainConnectionError(BlockchainError):
+    """Raised when the blockchain node cannot be reached or times out"""
+    pass
+
+class OperationInProgress(BlockchainError):
+    """Raised when another worker holds the claim on a chain write; retry after `retry_after` seconds"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class PartialBatchError(BlockchainError):
+    """Raised when a batch write fails after some chunks went out; `sent` maps each sent subject to its tx hash"""
+
+    def __init__(self, message, sent):
+        super().__init__(message)
+        self.sent = sent
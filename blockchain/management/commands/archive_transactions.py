@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Django management command for archiving settled blockchain transactions
+=======================================================================
+
+Moves CONFIRMED and FAILED OnChainTransaction rows that have not been updated
+for a number of days to the ArchivedTransaction table, in batches. The same
+archival runs daily from Celery beat; use this command for the first large
+run or to archive with a different retention.
+
+Usage:
+    python manage.py archive_transactions [options]
+
+Options:
+    --days N         Archive transactions not updated for N days (default: BLOCKCHAIN_ARCHIVE_AFTER_DAYS)
+    --batch-size N   Rows per database transaction (default: BLOCKCHAIN_ARCHIVE_BATCH_SIZE)
+    --dry-run        Count archivable transactions without moving them
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blockchain.models import ArchivedTransaction, OnChainTransaction
+from blockchain.utils.archive import archivable_transactions, archive_transactions
+
+
+class Command(BaseCommand):
+    help = 'Move confirmed and failed transactions older than the retention period to the archive table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.BLOCKCHAIN_ARCHIVE_AFTER_DAYS,
+            help=f'Archive transactions not updated for N days (default: {settings.BLOCKCHAIN_ARCHIVE_AFTER_DAYS})',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.BLOCKCHAIN_ARCHIVE_BATCH_SIZE,
+            help=f'Rows per database transaction (default: {settings.BLOCKCHAIN_ARCHIVE_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Count archivable transactions without moving them',
+        )
+
+    def handle(self, *args, **options):
+        days = options['days']
+
+        self.stdout.write("🗄️  AuthentiCred Transaction Archival")
+        self.stdout.write("=" * 50)
+        self.stdout.write(f"📋 Hot transactions: {OnChainTransaction.objects.count()}")
+        self.stdout.write(f"📋 Archived transactions: {ArchivedTransaction.objects.count()}")
+
+        if options['dry_run']:
+            count = archivable_transactions(days).count()
+            self.stdout.write(self.style.WARNING(f"Dry run - {count} transactions older than {days} days would be archived"))
+            return
+
+        archived = archive_transactions(days=days, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"✅ Archived {archived} transactions older than {days} days"))
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Django management command for end-to-end performance benchmarks
+===============================================================
+
+Runs the credential flows through the real views against a throwaway test
+database and the in-memory chain (BLOCKCHAIN_NETWORK=memory), and reports per
+scenario:
+
+- p50/p95/p99/mean/max latency in milliseconds
+- database queries and chain RPC calls per request
+- credentials processed per second
+
+Scenarios: issuance (issue_credential, including anchor_credential_task run
+inline), verification_internal and verification_external (verify_credential),
+wallet_listing (wallet_home), pdf_download (download_credential), revocation
+(revoke_credential) and merkle (MerkleTree over credential hashes).
+
+The report is JSON and includes the git commit, so runs can be compared
+between commits.
+
+Usage:
+    python manage.py benchmark [options]
+
+Options:
+    --iterations N        Measured requests per scenario (default: 50)
+    --warmup N            Unmeasured requests per scenario (default: 5)
+    --wallet-size N       Credentials in the holder's wallet (default: 50)
+    --merkle-leaves N     Leaves per Merkle tree (default: 1024)
+    --latency SECONDS     Simulated latency per chain RPC call (default: 0)
+    --block-time SECONDS  Simulated block time (default: 0, mine immediately)
+    --scenario NAME       Run only this scenario (repeatable)
+    --output FILE         Write the JSON report to FILE instead of stdout
+    --keepdb              Reuse the test database between runs
+"""
+
+import contextlib
+import json
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+
+from AuthentiCred.celery import app as celery_app
+from blockchain.clients.memory import reset_memory_chain
+from blockchain.services import BlockchainService
+from blockchain.utils.crypto import generate_key_pair, sign_data
+from blockchain.utils.merkle_tree import MerkleTree
+from credentials.models import Credential
+from users.models import User, InstitutionProfile
+from wallets.models import Wallet, WalletCredential
+
+SCENARIOS = [
+    'issuance',
+    'verification_internal',
+    'verification_external',
+    'wallet_listing',
+    'pdf_download',
+    'merkle',
+    # Last: consumes issued credentials
+    'revocation',
+]
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class Recorder:
+    """Collects latency, query and RPC counts for one scenario"""
+
+    def __init__(self, chain):
+        self.chain = chain
+        self.latencies = []
+        self.queries = []
+        self.rpc_calls = []
+        self.items = 0
+        self.elapsed = 0.0
+
+    def run(self, action, items=1, record=True):
+        rpc_before = sum(self.chain.rpc_calls.values())
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            result = action()
+            elapsed = time.perf_counter() - start
+        if record:
+            self.latencies.append(elapsed)
+            self.queries.append(len(queries))
+            self.rpc_calls.append(sum(self.chain.rpc_calls.values()) - rpc_before)
+            self.items += items
+            self.elapsed += elapsed
+        return result
+
+    def summary(self):
+        latencies = sorted(self.latencies)
+        to_ms = lambda seconds: round(seconds * 1000, 3) if seconds is not None else None
+        return {
+            'iterations': len(latencies),
+            'p50_ms': to_ms(percentile(latencies, 0.50)),
+            'p95_ms': to_ms(percentile(latencies, 0.95)),
+            'p99_ms': to_ms(percentile(latencies, 0.99)),
+            'mean_ms': to_ms(statistics.mean(latencies)) if latencies else None,
+            'max_ms': to_ms(latencies[-1]) if latencies else None,
+            'queries_per_request': round(statistics.mean(self.queries), 2) if self.queries else None,
+            'max_queries': max(self.queries) if self.queries else None,
+            'rpc_calls_per_request': round(statistics.mean(self.rpc_calls), 2) if self.rpc_calls else None,
+            'credentials_per_second': round(self.items / self.elapsed, 2) if self.elapsed else None,
+        }
+
+
+class Command(BaseCommand):
+    help = 'Benchmark issuance, verification, wallet, PDF, Merkle and revocation flows and emit JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help='Measured requests per scenario')
+        parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per scenario')
+        parser.add_argument('--wallet-size', type=int, default=50, help="Credentials in the holder's wallet")
+        parser.add_argument('--merkle-leaves', type=int, default=1024, help='Leaves per Merkle tree')
+        parser.add_argument('--latency', type=float, default=0.0, help='Simulated latency per chain RPC call (seconds)')
+        parser.add_argument('--block-time', type=float, default=0.0, help='Simulated block time (seconds)')
+        parser.add_argument('--scenario', action='append', choices=SCENARIOS, help='Run only this scenario (repeatable)')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+        parser.add_argument('--keepdb', action='store_true', help='Reuse the test database between runs')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1')
+        scenarios = [name for name in SCENARIOS if name in (options['scenario'] or SCENARIOS)]
+
+        setup_test_environment()
+        # create_test_db() returns the test database's name; the original is needed to switch back
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        always_eager = celery_app.conf.task_always_eager
+        # Run anchoring/revocation tasks inline so they are part of the measured request
+        celery_app.conf.task_always_eager = True
+        try:
+            with override_settings(
+                BLOCKCHAIN_NETWORK='memory',
+                BLOCKCHAIN_MEMORY_LATENCY=options['latency'],
+                BLOCKCHAIN_MEMORY_BLOCK_TIME=options['block_time'],
+            ), contextlib.redirect_stdout(sys.stderr):
+                # Views print diagnostics; keep stdout clean for the JSON report
+                results = self.run_scenarios(scenarios, options)
+        finally:
+            celery_app.conf.task_always_eager = always_eager
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        report = {
+            'meta': {
+                'commit': self.git_commit(),
+                'timestamp': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'blockchain_batch_writes': settings.BLOCKCHAIN_BATCH_WRITES,
+                'registry_version': settings.BLOCKCHAIN_REGISTRY_VERSION,
+                **{key: options[key] for key in ('iterations', 'warmup', 'wallet_size', 'merkle_leaves', 'latency', 'block_time')},
+            },
+            'scenarios': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stderr.write(self.style.SUCCESS(f"📊 Benchmark report written to {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except Exception:
+            return None
+
+    def run_scenarios(self, scenarios, options):
+        chain = reset_memory_chain(block_time=options['block_time'])
+        iterations, warmup = options['iterations'], options['warmup']
+        fixtures = self.create_fixtures(max(options['wallet_size'], iterations + warmup))
+
+        results = {}
+        for name in scenarios:
+            self.stderr.write(f"⏱️  {name}...")
+            recorder = Recorder(chain)
+            getattr(self, f'bench_{name}')(recorder, fixtures, iterations, warmup, options)
+            results[name] = recorder.summary()
+            self.stderr.write(self.style.SUCCESS(
+                f"  p50 {results[name]['p50_ms']} ms, p99 {results[name]['p99_ms']} ms, "
+                f"{results[name]['queries_per_request']} queries, {results[name]['rpc_calls_per_request']} RPC calls"
+            ))
+        return results
+
+    def create_user(self, username, user_type):
+        private_key, public_key = generate_key_pair()
+        user = User.objects.create_user(
+            username=username,
+            email=f'{username}@benchmark.example',
+            password='benchmark',
+            user_type=user_type,
+            public_key=public_key,
+        )
+        Wallet.objects.create(user=user, private_key=private_key)
+        return user, private_key
+
+    def create_fixtures(self, credential_count):
+        """An institution trusted on chain, a student wallet with anchored credentials and a verifier"""
+        issuer, issuer_key = self.create_user('benchmark-university', 'INSTITUTION')
+        InstitutionProfile.objects.create(user=issuer, name='Benchmark University', is_trusted=True)
+        holder, _ = self.create_user('benchmark-student', 'STUDENT')
+        verifier, _ = self.create_user('benchmark-employer', 'EMPLOYER')
+
+        credentials = []
+        for index in range(credential_count):
+            vc = {
+                '@context': ['https://www.w3.org/2018/credentials/v1'],
+                'type': ['VerifiableCredential', 'CustomCredential'],
+                'issuer': issuer.did,
+                'issuanceDate': timezone.now().isoformat(),
+                'credentialSubject': {'id': holder.did, 'index': index},
+            }
+            signature = sign_data(json.dumps(vc, separators=(',', ':'), sort_keys=True).encode('utf-8'), issuer_key)
+            credential = Credential.objects.create(
+                vc_json={**vc, 'proof': {'type': 'EcdsaSecp256k1Signature2019', 'jws': f'v={signature}'}},
+                issuer=issuer,
+                holder=holder,
+                title=f'Benchmark Credential {index}',
+                credential_type='CustomCredential',
+                status='ISSUED',
+                issued_at=timezone.now(),
+            )
+            credentials.append(credential)
+        wallet_credentials = WalletCredential.objects.bulk_create([
+            WalletCredential(wallet=holder.wallet, credential=credential) for credential in credentials
+        ])
+
+        service = BlockchainService()
+        service.update_issuer_trust_status(issuer.did, True)
+        service.anchor_credentials([credential.vc_hash for credential in credentials])
+
+        return {
+            'issuer': issuer,
+            'holder': holder,
+            'verifier': verifier,
+            'credentials': credentials,
+            'wallet_credentials': wallet_credentials,
+        }
+
+    def client_for(self, user):
+        client = Client()
+        client.force_login(user)
+        return client
+
+    def check_response(self, response, expected_status, scenario):
+        if response.status_code != expected_status:
+            raise CommandError(f"{scenario}: expected HTTP {expected_status}, got {response.status_code}")
+        return response
+
+    def bench_issuance(self, recorder, fixtures, iterations, warmup, options):
+        client = self.client_for(fixtures['issuer'])
+        url = reverse('issue_credential')
+        expiration = (timezone.now() + timedelta(days=365)).date().isoformat()
+        for index in range(warmup + iterations):
+            data = {
+                'title': f'Issued Credential {index}',
+                'description': 'Benchmark',
+                'expiration_date': expiration,
+                'holder_email': fixtures['holder'].email,
+                'action': 'issue',
+            }
+            response = recorder.run(lambda: client.post(url, data), record=index >= warmup)
+            self.check_response(response, 302, 'issuance')
+
+    def bench_verification_internal(self, recorder, fixtures, iterations, warmup, options):
+        client = self.client_for(fixtures['verifier'])
+        url = reverse('verify_credential')
+        credentials = fixtures['credentials']
+        for index in range(warmup + iterations):
+            data = {'credential_hash': credentials[index % len(credentials)].vc_hash}
+            response = recorder.run(lambda: client.post(url, data), record=index >= warmup)
+            self.check_response(response, 200, 'verification_internal')
+
+    def bench_verification_external(self, recorder, fixtures, iterations, warmup, options):
+        client = self.client_for(fixtures['verifier'])
+        url = reverse('verify_credential')
+        for index in range(warmup + iterations):
+            data = {'credential_hash': uuid.uuid4().hex * 2}
+            response = recorder.run(lambda: client.post(url, data), record=index >= warmup)
+            self.check_response(response, 200, 'verification_external')
+
+    def bench_wallet_listing(self, recorder, fixtures, iterations, warmup, options):
+        client = self.client_for(fixtures['holder'])
+        url = reverse('wallet_home')
+        listed = WalletCredential.objects.filter(wallet=fixtures['holder'].wallet, is_archived=False).count()
+        for index in range(warmup + iterations):
+            response = recorder.run(lambda: client.get(url), items=listed, record=index >= warmup)
+            self.check_response(response, 200, 'wallet_listing')
+
+    def bench_pdf_download(self, recorder, fixtures, iterations, warmup, options):
+        client = self.client_for(fixtures['holder'])
+        wallet_credentials = fixtures['wallet_credentials']
+        for index in range(warmup + iterations):
+            url = reverse('download_credential', args=[wallet_credentials[index % len(wallet_credentials)].id])
+            response = recorder.run(lambda: client.get(url), record=index >= warmup)
+            self.check_response(response, 200, 'pdf_download')
+
+    def bench_merkle(self, recorder, fixtures, iterations, warmup, options):
+        leaves = [uuid.uuid5(uuid.NAMESPACE_OID, str(index)).hex * 2 for index in range(options['merkle_leaves'])]
+        for index in range(warmup + iterations):
+            recorder.run(lambda: MerkleTree(leaves).get_root(), items=len(leaves), record=index >= warmup)
+
+    def bench_revocation(self, recorder, fixtures, iterations, warmup, options):
+        client = self.client_for(fixtures['issuer'])
+        credentials = fixtures['credentials']
+        for index in range(warmup + iterations):
+            url = reverse('revoke_credential', args=[credentials[-1 - index].id])
+            response = recorder.run(lambda: client.post(url, {'reason': 'Benchmark'}), record=index >= warmup)
+            self.check_response(response, 302, 'revocation')
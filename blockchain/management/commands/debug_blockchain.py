@@ -27,11 +27,13 @@ class Command(BaseCommand):
         self.stdout.write('\n📋 Settings Check:')
         self.stdout.write(f'  Network: {settings.BLOCKCHAIN_NETWORK}')
         self.stdout.write(f'  RPC URL: {settings.BLOCKCHAIN_RPC_URL}')
+        if len(settings.BLOCKCHAIN_RPC_URLS) > 1:
+            self.stdout.write(f'  RPC URLs: {", ".join(settings.BLOCKCHAIN_RPC_URLS)} (primary: {settings.BLOCKCHAIN_RPC_URLS[0]})')
         self.stdout.write(f'  Chain ID: {getattr(settings, "GANACHE_CHAIN_ID", "Not set")}')
         
         # Check contract addresses
         self.stdout.write('\n📄 Contract Addresses:')
-        for contract_name in ['DIDRegistry', 'TrustRegistry', 'CredentialAnchor', 'RevocationRegistry']:
+        for contract_name in ['DIDRegistry', 'TrustRegistry', 'CredentialAnchor', 'RevocationRegistry', 'Multicall']:
             address = getattr(settings, f'{contract_name.upper()}_ADDRESS', 'Not set')
             self.stdout.write(f'  {contract_name}: {address}')
         
@@ -51,6 +53,13 @@ class Command(BaseCommand):
             if verbose:
                 self.stdout.write(f'  Chain ID: {blockchain_service.client.chain_id}')
                 self.stdout.write(f'  Sender Address: {blockchain_service.client.sender_address}')
+                provider = blockchain_service.client.w3.provider
+                if hasattr(provider, 'endpoint_stats'):
+                    for stats in provider.endpoint_stats():
+                        self.stdout.write(
+                            f"  Endpoint {stats['url']}: {stats['state']}, {stats['latency_ms']} ms, "
+                            f"error rate {stats['error_rate']}, {stats['failures']}/{stats['requests']} failed"
+                        )
             
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'  ❌ Blockchain service initialization failed: {str(e)}'))
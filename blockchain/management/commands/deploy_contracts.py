@@ -4,8 +4,9 @@ Django management command for contract deployment
 ================================================
 
 This command provides comprehensive contract deployment functionality:
-1. Copies JSON files from Truffle build to abis folder
-2. Deploys contracts using Truffle or direct Web3 deployment
+1. Compiles the contracts with Truffle and copies the build JSON files to the abis folder
+2. Deploys contracts using Truffle or direct Web3 deployment (always from a fresh compile,
+   since the committed abis files carry no bytecode)
 3. Updates .env file with contract addresses
 4. Generates operator account credentials
 
@@ -95,7 +96,9 @@ class Command(BaseCommand):
             if use_truffle:
                 self.deploy_with_truffle(truffle_project_path, ganache_port)
             else:
-                self.deploy_with_web3(abis_path, ganache_port, network)
+                if skip_abi_update:
+                    self.compile_contracts(truffle_project_path)
+                self.deploy_with_web3(build_contracts_path, ganache_port, network)
         
         # Step 3: Update .env file with contract addresses
         if not skip_env_update:
@@ -111,30 +114,8 @@ class Command(BaseCommand):
         if not truffle_project_path.exists():
             raise CommandError(f'Truffle project not found at: {truffle_project_path}')
         
-        # Check if build directory exists
-        if not build_contracts_path.exists():
-            self.stdout.write(self.style.WARNING('Truffle build directory not found. Running truffle compile...'))
-            try:
-                # Check if Truffle is installed
-                subprocess.run(['truffle', 'version'], capture_output=True, check=True)
-                
-                # Run truffle compile
-                subprocess.run(['truffle', 'compile'], cwd=truffle_project_path, check=True, capture_output=True)
-                self.stdout.write(self.style.SUCCESS('Truffle compile completed successfully'))
-            except subprocess.CalledProcessError as e:
-                raise CommandError(f'Truffle compile failed: {e}')
-            except FileNotFoundError:
-                self.stdout.write(self.style.ERROR('Truffle not found. Attempting to install...'))
-                try:
-                    # Try to install Truffle
-                    subprocess.run(['npm', 'install', '-g', 'truffle'], check=True, capture_output=True)
-                    self.stdout.write(self.style.SUCCESS('Truffle installed successfully'))
-                    
-                    # Try compilation again
-                    subprocess.run(['truffle', 'compile'], cwd=truffle_project_path, check=True, capture_output=True)
-                    self.stdout.write(self.style.SUCCESS('Truffle compile completed successfully'))
-                except (subprocess.CalledProcessError, FileNotFoundError):
-                    raise CommandError('Failed to install Truffle. Please install manually: npm install -g truffle')
+        # Always compile: an existing build directory may predate the current sources
+        self.compile_contracts(truffle_project_path)
         
         # Create ABIs directory if it doesn't exist
         abis_path.mkdir(parents=True, exist_ok=True)
@@ -150,7 +131,11 @@ class Command(BaseCommand):
             'DIDRegistry.json',
             'TrustRegistry.json', 
             'CredentialAnchor.json',
-            'RevocationRegistry.json'
+            'RevocationRegistry.json',
+            'Multicall.json',
+            'DIDRegistryV2.json',
+            'TrustRegistryV2.json',
+            'RevocationRegistryV2.json'
         ]
         
         copied_count = 0
@@ -167,6 +152,34 @@ class Command(BaseCommand):
         
         self.stdout.write(self.style.SUCCESS(f"✅ Updated {copied_count} ABIs from Truffle build"))
     
+    def compile_contracts(self, truffle_project_path):
+        """Compile the contracts with Truffle, installing it if needed"""
+        if not truffle_project_path.exists():
+            raise CommandError(f'Truffle project not found at: {truffle_project_path}')
+        
+        self.stdout.write('Running truffle compile...')
+        try:
+            # Check if Truffle is installed
+            subprocess.run(['truffle', 'version'], capture_output=True, check=True)
+            
+            # Run truffle compile
+            subprocess.run(['truffle', 'compile'], cwd=truffle_project_path, check=True, capture_output=True)
+            self.stdout.write(self.style.SUCCESS('Truffle compile completed successfully'))
+        except subprocess.CalledProcessError as e:
+            raise CommandError(f'Truffle compile failed: {e}')
+        except FileNotFoundError:
+            self.stdout.write(self.style.ERROR('Truffle not found. Attempting to install...'))
+            try:
+                # Try to install Truffle
+                subprocess.run(['npm', 'install', '-g', 'truffle'], check=True, capture_output=True)
+                self.stdout.write(self.style.SUCCESS('Truffle installed successfully'))
+                
+                # Try compilation again
+                subprocess.run(['truffle', 'compile'], cwd=truffle_project_path, check=True, capture_output=True)
+                self.stdout.write(self.style.SUCCESS('Truffle compile completed successfully'))
+            except (subprocess.CalledProcessError, FileNotFoundError):
+                raise CommandError('Failed to install Truffle. Please install manually: npm install -g truffle')
+    
     def deploy_with_truffle(self, truffle_project_path, ganache_port):
         """Deploy contracts using Truffle"""
         self.stdout.write(f"\n🚀 Deploying contracts with Truffle (port: {ganache_port})...")
@@ -196,8 +209,8 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f'❌ Truffle deployment failed: {e.stderr}'))
             raise CommandError('Truffle deployment failed')
     
-    def deploy_with_web3(self, abis_path, ganache_port, network):
-        """Deploy contracts using direct Web3"""
+    def deploy_with_web3(self, build_contracts_path, ganache_port, network):
+        """Deploy contracts using direct Web3 from the Truffle build artifacts"""
         self.stdout.write(f"\n🚀 Deploying contracts with Web3 (port: {ganache_port})...")
         
         # Connect to Ganache
@@ -213,10 +226,11 @@ class Command(BaseCommand):
         
         # Deploy all contracts
         contracts = {}
-        contract_names = ['DIDRegistry', 'TrustRegistry', 'CredentialAnchor', 'RevocationRegistry']
+        contract_names = ['DIDRegistry', 'TrustRegistry', 'CredentialAnchor', 'RevocationRegistry', 'Multicall',
+                          'DIDRegistryV2', 'TrustRegistryV2', 'RevocationRegistryV2']
         
         for contract_name in contract_names:
-            address, abi = self.deploy_contract(w3, abis_path, contract_name)
+            address, abi = self.deploy_contract(w3, build_contracts_path, contract_name)
             if address and abi:
                 contracts[contract_name] = (address, abi)
         
@@ -233,12 +247,12 @@ class Command(BaseCommand):
         else:
             raise CommandError('No contracts were deployed successfully')
     
-    def deploy_contract(self, w3, abis_path, contract_name):
+    def deploy_contract(self, w3, build_contracts_path, contract_name):
         """Deploy a single contract"""
-        # Load contract ABI from the updated ABIs folder
-        abi_path = abis_path / f'{contract_name}.json'
+        # Load the compiled contract from the Truffle build
+        abi_path = build_contracts_path / f'{contract_name}.json'
         if not abi_path.exists():
-            self.stdout.write(self.style.ERROR(f'ABI not found for {contract_name}. Run with --skip-deploy to update ABIs first.'))
+            self.stdout.write(self.style.ERROR(f'Build artifact not found for {contract_name}. Check the truffle compile output.'))
             return None, None
         
         with open(abi_path, 'r') as f:
@@ -246,7 +260,10 @@ class Command(BaseCommand):
         
         # Get ABI and bytecode from the compiled contract
         abi = contract_data['abi']
-        bytecode = contract_data['bytecode']
+        bytecode = contract_data.get('bytecode')
+        if not bytecode:
+            self.stdout.write(self.style.ERROR(f'Bytecode not found for {contract_name} in the Truffle build.'))
+            return None, None
         
         # Deploy contract
         contract = w3.eth.contract(
@@ -310,6 +327,10 @@ class Command(BaseCommand):
             'TRUSTREGISTRY_ADDRESS': addresses.get('TrustRegistry', ''),
             'CREDENTIALANCHOR_ADDRESS': addresses.get('CredentialAnchor', ''),
             'REVOCATIONREGISTRY_ADDRESS': addresses.get('RevocationRegistry', ''),
+            'MULTICALL_ADDRESS': addresses.get('Multicall', ''),
+            'DIDREGISTRYV2_ADDRESS': addresses.get('DIDRegistryV2', ''),
+            'TRUSTREGISTRYV2_ADDRESS': addresses.get('TrustRegistryV2', ''),
+            'REVOCATIONREGISTRYV2_ADDRESS': addresses.get('RevocationRegistryV2', ''),
             'BLOCKCHAIN_OPERATOR_KEY': operator_account['private_key'],
             'BLOCKCHAIN_OPERATOR_ADDRESS': operator_account['address'],
             'BLOCKCHAIN_RPC_URL': 'http://127.0.0.1:7545',
@@ -340,7 +361,8 @@ class Command(BaseCommand):
         
         # Read addresses from build artifacts
         build_dir = truffle_project_path / 'build' / 'contracts'
-        contracts = ['DIDRegistry', 'TrustRegistry', 'CredentialAnchor', 'RevocationRegistry']
+        contracts = ['DIDRegistry', 'TrustRegistry', 'CredentialAnchor', 'RevocationRegistry', 'Multicall',
+                     'DIDRegistryV2', 'TrustRegistryV2', 'RevocationRegistryV2']
         
         for contract in contracts:
             json_file = build_dir / f'{contract}.json'
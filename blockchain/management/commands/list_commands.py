@@ -58,6 +58,81 @@ class Command(BaseCommand):
                     '--ganache-port: Ganache port (default: 7545)'
                 ]
             },
+            'migrate_registries': {
+                'description': 'Copy DID, trust and revocation state from the v1 registries to the bytes32-keyed v2 registries',
+                'usage': 'python manage.py migrate_registries [--dry-run] [--skip-dids] [--skip-trust] [--skip-revocations]',
+                'options': [
+                    '--dry-run: Show what would be copied without sending transactions',
+                    '--skip-dids: Do not copy DID registrations',
+                    '--skip-trust: Do not copy issuer trust status',
+                    '--skip-revocations: Do not copy credential revocations'
+                ]
+            },
+            'benchmark': {
+                'description': 'Benchmark issuance, verification, wallet, PDF, Merkle and revocation flows on a test database and the in-memory chain; emits JSON',
+                'usage': 'python manage.py benchmark [--iterations N] [--warmup N] [--wallet-size N] [--merkle-leaves N] [--latency SECONDS] [--block-time SECONDS] [--scenario NAME] [--output FILE] [--keepdb]',
+                'options': [
+                    '--iterations: Measured requests per scenario (default: 50)',
+                    '--warmup: Unmeasured requests per scenario (default: 5)',
+                    "--wallet-size: Credentials in the holder's wallet (default: 50)",
+                    '--merkle-leaves: Leaves per Merkle tree (default: 1024)',
+                    '--latency: Simulated latency per chain RPC call in seconds (default: 0)',
+                    '--block-time: Simulated block time in seconds (default: 0)',
+                    '--scenario: Run only this scenario (repeatable)',
+                    '--output: Write the JSON report to a file instead of stdout',
+                    '--keepdb: Reuse the test database between runs'
+                ]
+            },
+            'backfill_transaction_links': {
+                'description': 'Copy did, vc_hash and credential_id from transaction metadata into indexed columns and link credentials to their anchoring transaction',
+                'usage': 'python manage.py backfill_transaction_links [--batch-size N] [--dry-run]',
+                'options': [
+                    '--batch-size: Rows per batch (default: 1000)',
+                    '--dry-run: Count what would be updated without writing'
+                ]
+            },
+            'archive_transactions': {
+                'description': 'Move confirmed and failed transactions older than the retention period to the archive table',
+                'usage': 'python manage.py archive_transactions [--days N] [--batch-size N] [--dry-run]',
+                'options': [
+                    '--days: Archive transactions not updated for N days (default: BLOCKCHAIN_ARCHIVE_AFTER_DAYS)',
+                    '--batch-size: Rows per database transaction (default: BLOCKCHAIN_ARCHIVE_BATCH_SIZE)',
+                    '--dry-run: Count archivable transactions without moving them'
+                ]
+            },
+            'rebuild_verification_rollups': {
+                'description': 'Recompute hourly and daily verification rollups from the verification records',
+                'usage': 'python manage.py rebuild_verification_rollups [--since YYYY-MM-DD]',
+                'options': [
+                    '--since: Only rebuild buckets from this UTC day onwards (default: everything)'
+                ]
+            },
+            'rebuild_search_index': {
+                'description': 'Recompute the full-text search vectors of credentials',
+                'usage': 'python manage.py rebuild_search_index [--batch-size N] [--missing-only]',
+                'options': [
+                    '--batch-size: Credentials per UPDATE (default: 1000)',
+                    '--missing-only: Only index credentials that have no search vector yet'
+                ]
+            },
+            'subject_indexes': {
+                'description': 'Create or drop expression indexes on credentialSubject fields per credential schema',
+                'usage': 'python manage.py subject_indexes [--schema ID] [--fields NAME ...] [--drop] [--list]',
+                'options': [
+                    '--schema: Schema to index (repeatable; default: all schemas)',
+                    '--fields: Fields to index (default: all fields of the schema)',
+                    '--drop: Drop the indexes instead of creating them',
+                    '--list: List the existing indexes and exit'
+                ]
+            },
+            'relay_outbox': {
+                'description': 'Publish tasks stored in the task outbox while the Celery broker was unavailable',
+                'usage': 'python manage.py relay_outbox [--loop] [--interval SECONDS]',
+                'options': [
+                    '--loop: Keep relaying until interrupted',
+                    '--interval: Pause between relay rounds with --loop (default: TASK_OUTBOX_RELAY_INTERVAL)'
+                ]
+            },
             'list_commands': {
                 'description': 'List all available blockchain management commands',
                 'usage': 'python manage.py list_commands',
@@ -105,6 +180,22 @@ class Command(BaseCommand):
                     'python manage.py check_blockchain_status --detailed'
                 ]
             },
+            {
+                'name': 'Switch to v2 Registries',
+                'description': 'Copy registry state to the bytes32-keyed contracts, then set BLOCKCHAIN_REGISTRY_VERSION=2',
+                'commands': [
+                    'python manage.py migrate_registries --dry-run',
+                    'python manage.py migrate_registries'
+                ]
+            },
+            {
+                'name': 'Compare Performance',
+                'description': 'Benchmark two commits and compare the JSON reports',
+                'commands': [
+                    'python manage.py benchmark --output bench-before.json',
+                    'python manage.py benchmark --output bench-after.json'
+                ]
+            },
             {
                 'name': 'Reset Everything',
                 'description': 'Clear all blockchain data and start fresh',
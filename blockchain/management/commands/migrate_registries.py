@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Django management command for migrating registry state to the bytes32-keyed contracts
+=====================================================================================
+
+Copies DID registrations, issuer trust status and revocations from DIDRegistry,
+TrustRegistry and RevocationRegistry to DIDRegistryV2, TrustRegistryV2 and
+RevocationRegistryV2.
+
+The v1 contracts key their mappings by string and only emit hashed string topics,
+so their state cannot be enumerated from the chain. Candidate DIDs and credential
+IDs are taken from the database and every value is read back from the v1 contract
+before it is written to v2; entries already present in v2 are skipped, so the
+command can be re-run safely. Keys whose v1 or v2 value could not be read (node
+errors) are not copied; they are listed and the command exits with an error, so
+a re-run can pick them up.
+
+Usage:
+    python manage.py migrate_registries [options]
+
+Options:
+    --dry-run            Show what would be copied without sending transactions
+    --skip-dids          Do not copy DID registrations
+    --skip-trust         Do not copy issuer trust status
+    --skip-revocations   Do not copy credential revocations
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+
+from blockchain.models import DIDRegistration
+from blockchain.services import BlockchainService
+from credentials.models import Credential
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Copy DID, trust and revocation state from the v1 registries to the bytes32-keyed v2 registries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be copied without sending transactions',
+        )
+        parser.add_argument(
+            '--skip-dids',
+            action='store_true',
+            help='Do not copy DID registrations',
+        )
+        parser.add_argument(
+            '--skip-trust',
+            action='store_true',
+            help='Do not copy issuer trust status',
+        )
+        parser.add_argument(
+            '--skip-revocations',
+            action='store_true',
+            help='Do not copy credential revocations',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        self.stdout.write("🔁 AuthentiCred Registry Migration (v1 → v2)")
+        self.stdout.write("=" * 50)
+
+        missing = [
+            name for name in ('DIDREGISTRYV2_ADDRESS', 'TRUSTREGISTRYV2_ADDRESS', 'REVOCATIONREGISTRYV2_ADDRESS')
+            if not getattr(settings, name)
+        ]
+        if missing:
+            raise CommandError(f"Set {', '.join(missing)} before migrating (run deploy_contracts first)")
+
+        v1 = BlockchainService(registry_version=1)
+        v2 = BlockchainService(client=v1.client, registry_version=2)
+        # Section -> keys that could not be read or written
+        self.failures = {}
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING("Dry run - no transactions will be sent"))
+
+        dids = self.get_candidate_dids()
+        self.stdout.write(f"📋 {len(dids)} candidate DIDs found in the database")
+
+        if not options['skip_dids']:
+            self.migrate_dids(v1, v2, dids, dry_run)
+        if not options['skip_trust']:
+            self.migrate_trust(v1, v2, dids, dry_run)
+        if not options['skip_revocations']:
+            self.migrate_revocations(v1, v2, dry_run)
+
+        if self.failures:
+            for section, keys in self.failures.items():
+                self.stdout.write(self.style.ERROR(f"\n❌ {section}: {len(keys)} not migrated"))
+                for key in keys:
+                    self.stdout.write(f"  {key}")
+            raise CommandError(
+                f"{sum(len(keys) for keys in self.failures.values())} entries could not be migrated; "
+                "re-run once the node is reachable"
+            )
+
+        self.stdout.write(self.style.SUCCESS('\n🎉 Registry migration completed!'))
+        if settings.BLOCKCHAIN_REGISTRY_VERSION != 2 and not dry_run:
+            self.stdout.write(self.style.WARNING(
+                'Set BLOCKCHAIN_REGISTRY_VERSION=2 to switch the application to the v2 registries.'
+            ))
+
+    def get_candidate_dids(self):
+        """DIDs known to the database: registrations plus every user DID"""
+        dids = set(DIDRegistration.objects.values_list('did', flat=True))
+        dids.update(User.objects.exclude(did__isnull=True).exclude(did='').values_list('did', flat=True))
+        return sorted(dids)
+
+    def check_reads(self, section, keys, *results):
+        """
+        Keys whose value came back None (failed read) in any of `results`; they
+        are recorded as failures of `section`.
+        """
+        unread = [key for key in keys if any(result.get(key) is None for result in results)]
+        if unread:
+            self.stdout.write(self.style.ERROR(f"  ⚠️  {len(unread)} could not be read from the chain"))
+            self.failures.setdefault(section, []).extend(unread)
+        return set(unread)
+
+    def migrate_dids(self, v1, v2, dids, dry_run):
+        """Register every DID resolved by DIDRegistry that DIDRegistryV2 does not know yet"""
+        self.stdout.write('\n🆔 DID registrations:')
+        v1_keys = v1.batch_resolve_dids(dids)
+        v2_keys = v2.batch_resolve_dids(dids)
+        unread = self.check_reads('DID registrations', dids, v1_keys, v2_keys)
+
+        to_copy = [did for did in dids if did not in unread and v1_keys[did] and not v2_keys[did]]
+        self.stdout.write(f"  {len(to_copy)} to copy, {sum(1 for did in dids if v2_keys.get(did))} already in v2")
+
+        copied = 0
+        for did in to_copy:
+            if dry_run:
+                self.stdout.write(f"  would register {did}")
+                continue
+            try:
+                tx_hash = v2.register_did(did, v1_keys[did])
+                self.stdout.write(self.style.SUCCESS(f"  ✅ {did}: {tx_hash}"))
+                copied += 1
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f"  ❌ {did}: {str(e)}"))
+                self.failures.setdefault('DID registrations', []).append(did)
+        if not dry_run:
+            self.stdout.write(f"  Copied {copied}/{len(to_copy)} DID registrations")
+
+    def migrate_trust(self, v1, v2, dids, dry_run):
+        """Copy trusted issuers from TrustRegistry to TrustRegistryV2"""
+        self.stdout.write('\n🤝 Issuer trust status:')
+        v1_trust = v1.batch_is_trusted(dids)
+        v2_trust = v2.batch_is_trusted(dids)
+        unread = self.check_reads('Issuer trust status', dids, v1_trust, v2_trust)
+
+        to_copy = {did: True for did in dids if did not in unread and v1_trust[did] and not v2_trust[did]}
+        self.stdout.write(f"  {len(to_copy)} trusted issuers to copy")
+        if not to_copy:
+            return
+        if dry_run:
+            for did in to_copy:
+                self.stdout.write(f"  would trust {did}")
+            return
+
+        tx_by_did = v2.update_issuer_trust_statuses(to_copy)
+        for tx_hash in sorted(set(tx_by_did.values())):
+            self.stdout.write(self.style.SUCCESS(f"  ✅ Trust batch sent: {tx_hash}"))
+
+    def migrate_revocations(self, v1, v2, dry_run):
+        """Copy revoked credentials from RevocationRegistry to RevocationRegistryV2"""
+        self.stdout.write('\n🚫 Credential revocations:')
+        # Revocations can exist on chain without the DB status being updated, so every
+        # credential is checked; the reads are batched through Multicall.
+        credential_ids = [str(cid) for cid in Credential.objects.values_list('id', flat=True)]
+        v1_revoked = v1.batch_is_revoked(credential_ids)
+        v2_revoked = v2.batch_is_revoked(credential_ids)
+        unread = self.check_reads('Credential revocations', credential_ids, v1_revoked, v2_revoked)
+
+        to_copy = [cid for cid in credential_ids if cid not in unread and v1_revoked[cid] and not v2_revoked[cid]]
+        self.stdout.write(f"  {len(credential_ids)} credentials checked, {len(to_copy)} revocations to copy")
+        if not to_copy:
+            return
+        if dry_run:
+            for cid in to_copy:
+                self.stdout.write(f"  would revoke {cid}")
+            return
+
+        tx_by_id = v2.revoke_credentials(to_copy)
+        for tx_hash in sorted(set(tx_by_id.values())):
+            self.stdout.write(self.style.SUCCESS(f"  ✅ Revocation batch sent: {tx_hash}"))
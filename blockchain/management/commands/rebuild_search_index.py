@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Django management command for rebuilding the credential search index
+=====================================================================
+
+Recomputes Credential.search_vector (title, holder, type, credentialSubject
+values and description) in batches. Vectors are kept up to date as credentials
+and users are saved; run this once after migrating, and after bulk updates
+that bypass model signals.
+
+Usage:
+    python manage.py rebuild_search_index [options]
+
+Options:
+    --batch-size N   Credentials per UPDATE (default: 1000)
+    --missing-only   Only index credentials that have no search vector yet
+"""
+
+from django.core.management.base import BaseCommand
+
+from credentials.models import Credential
+from credentials.search import update_search_vectors
+
+
+class Command(BaseCommand):
+    help = 'Recompute the full-text search vectors of credentials'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Credentials per UPDATE (default: 1000)',
+        )
+        parser.add_argument(
+            '--missing-only',
+            action='store_true',
+            help='Only index credentials that have no search vector yet',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        credentials = Credential.objects.all()
+        if options['missing_only']:
+            credentials = credentials.filter(search_vector__isnull=True)
+
+        self.stdout.write("🔎 AuthentiCred Credential Search Index")
+        self.stdout.write("=" * 50)
+        self.stdout.write(f"📋 Credentials to index: {credentials.count()}")
+
+        updated = 0
+        last_pk = None
+        while True:
+            batch = credentials.order_by('pk')
+            if last_pk is not None:
+                batch = batch.filter(pk__gt=last_pk)
+            pks = list(batch.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            updated += update_search_vectors(Credential.objects.filter(pk__in=pks))
+            last_pk = pks[-1]
+            self.stdout.write(f"   Indexed {updated} credentials")
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Indexed {updated} credentials"))
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Django management command for rebuilding verification rollups
+=============================================================
+
+Recomputes the hourly and daily VerificationRollup rows from VerificationRecord.
+Rollups are kept up to date as verifications are saved and deleted; run this
+once after migrating, and after bulk imports or deletes that bypass signals.
+
+Usage:
+    python manage.py rebuild_verification_rollups [options]
+
+Options:
+    --since YYYY-MM-DD   Only rebuild buckets from this UTC day onwards (default: everything)
+"""
+
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from credentials import rollups
+from credentials.models import VerificationRecord, VerificationRollup
+
+
+class Command(BaseCommand):
+    help = 'Recompute hourly and daily verification rollups from the verification records'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help='Only rebuild buckets from this UTC day onwards (YYYY-MM-DD)',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = datetime.strptime(options['since'], '%Y-%m-%d').replace(tzinfo=dt_timezone.utc)
+            except ValueError:
+                raise CommandError(f"Invalid --since date: {options['since']} (expected YYYY-MM-DD)")
+
+        self.stdout.write("📊 AuthentiCred Verification Rollups")
+        self.stdout.write("=" * 50)
+        self.stdout.write(f"📋 Verification records: {VerificationRecord.objects.count()}")
+        self.stdout.write(f"📋 Rollup rows before: {VerificationRollup.objects.count()}")
+
+        written = rollups.rebuild(since=since)
+        scope = f"since {since.date()}" if since else "for all time"
+        self.stdout.write(self.style.SUCCESS(f"✅ Wrote {written} rollup rows {scope}"))
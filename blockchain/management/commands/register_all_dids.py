@@ -32,11 +32,7 @@ class Command(BaseCommand):
             
             try:
                 # Check if DID is already registered
-                is_registered = blockchain_service.client.call_contract_function(
-                    'DIDRegistry',
-                    'isDIDRegistered',
-                    user.did
-                )
+                is_registered = blockchain_service.is_did_registered(user.did)
                 
                 if is_registered and not force:
                     self.stdout.write(self.style.SUCCESS("✓ DID already registered - skipping"))
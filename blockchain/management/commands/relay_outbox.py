@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Django management command for relaying the task outbox
+======================================================
+
+Publishes Celery tasks that were stored in the TaskOutbox table while the
+broker was unavailable. Web processes relay their own entries from a
+background thread; this command is for draining the outbox from a separate
+process (e.g. after web processes were restarted during a broker outage).
+
+Usage:
+    python manage.py relay_outbox [options]
+
+Options:
+    --loop              Keep relaying until interrupted
+    --interval SECONDS  Pause between relay rounds with --loop (default: TASK_OUTBOX_RELAY_INTERVAL)
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blockchain.models import TaskOutbox
+from blockchain.utils.outbox import ACTIVE_STATUSES, relay_outbox
+
+
+class Command(BaseCommand):
+    help = 'Publish tasks stored in the task outbox to Celery'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep relaying until interrupted',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=settings.TASK_OUTBOX_RELAY_INTERVAL,
+            help='Pause between relay rounds with --loop (seconds)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("📤 AuthentiCred Task Outbox Relay")
+        self.stdout.write("=" * 50)
+
+        try:
+            while True:
+                pending = TaskOutbox.objects.filter(status__in=ACTIVE_STATUSES).count()
+                if pending:
+                    published = relay_outbox()
+                    if published:
+                        self.stdout.write(self.style.SUCCESS(f"✅ Published {published}/{pending} pending tasks"))
+                        if not options['loop']:
+                            # Keep draining batches until the outbox is empty
+                            continue
+                    else:
+                        self.stdout.write(self.style.WARNING(f"⚠️  Broker unavailable, {pending} tasks still pending"))
+                elif not options['loop']:
+                    self.stdout.write(self.style.SUCCESS("✅ Outbox is empty"))
+
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("\n👋 Relay stopped")
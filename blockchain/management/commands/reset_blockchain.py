@@ -111,6 +111,10 @@ class Command(BaseCommand):
                 'TRUSTREGISTRY_ADDRESS',
                 'CREDENTIALANCHOR_ADDRESS',
                 'REVOCATIONREGISTRY_ADDRESS',
+                'MULTICALL_ADDRESS',
+                'DIDREGISTRYV2_ADDRESS',
+                'TRUSTREGISTRYV2_ADDRESS',
+                'REVOCATIONREGISTRYV2_ADDRESS',
                 'BLOCKCHAIN_OPERATOR_KEY',
                 'BLOCKCHAIN_OPERATOR_ADDRESS',
             ]
@@ -173,15 +177,16 @@ class Command(BaseCommand):
         try:
             with transaction.atomic():
                 # Import models here to avoid circular imports
-                from blockchain.models import DIDRegistration, OnChainTransaction
+                from blockchain.models import ArchivedTransaction, DIDRegistration, OnChainTransaction
                 from credentials.models import Credential, VerificationRecord
                 
                 # Clear blockchain records
                 did_count = DIDRegistration.objects.count()
                 DIDRegistration.objects.all().delete()
                 
-                tx_count = OnChainTransaction.objects.count()
+                tx_count = OnChainTransaction.objects.count() + ArchivedTransaction.objects.count()
                 OnChainTransaction.objects.all().delete()
+                ArchivedTransaction.objects.all().delete()
                 
                 # Clear credential records
                 cred_count = Credential.objects.count()
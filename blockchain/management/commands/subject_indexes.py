@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Django management command for credentialSubject expression indexes
+===================================================================
+
+Creates or drops the partial expression indexes that serve range and equality
+queries on credentialSubject fields of one schema's credentials
+(credentials/subject_query.py). Indexes are generated from CredentialSchema.fields
+and built concurrently, so writes are not blocked.
+
+Usage:
+    python manage.py subject_indexes [options]
+
+Options:
+    --schema ID      Schema to index (repeatable; default: all schemas)
+    --fields NAME    Fields to index (default: all fields of the schema)
+    --drop           Drop the indexes instead of creating them
+    --list           List the existing indexes and exit
+"""
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from credentials.models import CredentialSchema
+from credentials.subject_query import (
+    create_subject_indexes, drop_subject_indexes, existing_subject_indexes, subject_index
+)
+
+
+class Command(BaseCommand):
+    help = 'Create or drop expression indexes on credentialSubject fields per credential schema'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--schema',
+            action='append',
+            help='Schema to index (repeatable; default: all schemas)',
+        )
+        parser.add_argument(
+            '--fields',
+            nargs='+',
+            help='Fields to index (default: all fields of the schema)',
+        )
+        parser.add_argument(
+            '--drop',
+            action='store_true',
+            help='Drop the indexes instead of creating them',
+        )
+        parser.add_argument(
+            '--list',
+            action='store_true',
+            help='List the existing indexes and exit',
+        )
+
+    def handle(self, *args, **options):
+        schemas = CredentialSchema.objects.order_by('name', 'version')
+        if options['schema']:
+            try:
+                schemas = list(schemas.filter(pk__in=options['schema']))
+            except ValidationError:
+                raise CommandError("Invalid schema ID in --schema")
+            if len(schemas) != len(set(options['schema'])):
+                raise CommandError("Unknown schema ID in --schema")
+
+        self.stdout.write("🗂️  AuthentiCred credentialSubject Indexes")
+        self.stdout.write("=" * 50)
+
+        if options['list']:
+            existing = existing_subject_indexes()
+            for schema in schemas:
+                for field in schema.fields or {}:
+                    name = subject_index(schema, field).name
+                    status = "✅" if name in existing else "  "
+                    self.stdout.write(f"{status} {schema} - {field} ({name})")
+            return
+
+        for schema in schemas:
+            try:
+                if options['drop']:
+                    names = drop_subject_indexes(schema, fields=options['fields'])
+                    self.stdout.write(self.style.SUCCESS(f"🗑️  {schema}: dropped {len(names)} indexes"))
+                else:
+                    names = create_subject_indexes(schema, fields=options['fields'])
+                    self.stdout.write(self.style.SUCCESS(f"✅ {schema}: created {len(names)} indexes"))
+            except ValueError as e:
+                self.stdout.write(self.style.ERROR(f"❌ {schema}: {e}"))
@@ -0,0 +1,289 @@
+# blockchain/metrics.py
+# Prometheus metrics for issuance, verification, chain calls, task health and database connections
+#
+# Counters and histograms are updated in the process doing the work (web or Celery
+# worker). With PROMETHEUS_MULTIPROC_DIR set, every process writes its samples to that
+# directory and /metrics aggregates them, so gunicorn and Celery worker children are
+# all included. The directory must be set before the first import of prometheus_client
+# and emptied when the service starts (see gunicorn.conf.py).
+#
+# Backlog gauges (pending transactions, queued writes, Celery queue depth) are computed
+# by the refresh_chain_state_metrics beat task and stored in ChainStateSnapshot;
+# ChainStateCollector only reads that row at scrape time.
+import logging
+import os
+import time
+from datetime import datetime
+from celery import signals
+from django.conf import settings
+from django.db.models import Count, Min
+from django.utils import timezone
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+CREDENTIALS_ISSUED = Counter(
+    'authenticred_credentials_issued_total',
+    'Credentials issued'
+)
+CREDENTIALS_REVOKED = Counter(
+    'authenticred_credentials_revoked_total',
+    'Credentials revoked'
+)
+VERIFICATIONS = Counter(
+    'authenticred_verifications_total',
+    'Credential verifications by source and outcome',
+    ['source', 'result']
+)
+VERIFICATION_SECONDS = Histogram(
+    'authenticred_verification_seconds',
+    'Time to verify a credential',
+    ['source']
+)
+CHAIN_CALLS = Counter(
+    'authenticred_chain_calls_total',
+    'Chain client calls by contract.function and error class',
+    ['kind', 'label', 'error']
+)
+CHAIN_CALL_SECONDS = Histogram(
+    'authenticred_chain_call_seconds',
+    'Chain client call latency',
+    ['kind', 'label'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+CHAIN_TRANSACTIONS = Counter(
+    'authenticred_chain_transactions_total',
+    'Transactions sent by the blockchain service',
+    ['type']
+)
+CONFIRMATION_SECONDS = Histogram(
+    'authenticred_chain_confirmation_seconds',
+    'Time from sending a transaction to seeing it confirmed (anchoring lag for CREDENTIAL_ANCHORING)',
+    ['type'],
+    buckets=(5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+)
+TASK_DISPATCHES = Counter(
+    'authenticred_task_dispatch_total',
+    'execute_task_with_fallback dispatches by method (celery, outbox, failed)',
+    ['task', 'method']
+)
+TASK_RUNS = Counter(
+    'authenticred_task_runs_total',
+    'Celery task runs by outcome',
+    ['task', 'outcome']
+)
+TASK_SECONDS = Histogram(
+    'authenticred_task_seconds',
+    'Celery task run time',
+    ['task'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+)
+
+DB_CONNECTIONS_OPENED = Counter(
+    'authenticred_db_connections_opened_total',
+    'New database connections by alias (opened by the pool in pool mode)',
+    ['alias']
+)
+# Pool gauges are summed over live processes in multiprocess mode
+DB_POOL_CONNECTIONS = Gauge(
+    'authenticred_db_pool_connections',
+    'Connections held by psycopg pools, by state (open, idle, max)',
+    ['alias', 'state'],
+    multiprocess_mode='livesum'
+)
+DB_POOL_WAITING = Gauge(
+    'authenticred_db_pool_waiting',
+    'Threads waiting for a pooled connection',
+    ['alias'],
+    multiprocess_mode='livesum'
+)
+DB_POOL_REQUESTS = Counter(
+    'authenticred_db_pool_requests_total',
+    'Connection requests to psycopg pools by outcome (served, queued, timeout)',
+    ['alias', 'outcome']
+)
+DB_POOL_WAIT_SECONDS = Counter(
+    'authenticred_db_pool_wait_seconds_total',
+    'Time spent waiting for pooled connections',
+    ['alias']
+)
+DB_POOL_CONNECTIONS_LOST = Counter(
+    'authenticred_db_pool_connections_lost_total',
+    'Pooled connections found broken by health checks or returned in a bad state',
+    ['alias']
+)
+
+
+def observe_chain_call(kind, label, duration, error=''):
+    CHAIN_CALLS.labels(kind=kind, label=label, error=error).inc()
+    CHAIN_CALL_SECONDS.labels(kind=kind, label=label).observe(duration)
+
+
+def observe_verification(source, valid, duration):
+    VERIFICATIONS.labels(source=source, result='valid' if valid else 'invalid').inc()
+    VERIFICATION_SECONDS.labels(source=source).observe(duration)
+
+
+def observe_confirmation(tx):
+    CONFIRMATION_SECONDS.labels(type=tx.transaction_type).observe(
+        (timezone.now() - tx.created_at).total_seconds()
+    )
+
+
+SNAPSHOT_ID = 1
+
+
+def compute_chain_state():
+    """Backlog counts from the database and broker, as stored in ChainStateSnapshot"""
+    from .models import OnChainTransaction, QueuedChainWrite, TaskOutbox
+
+    pending = (
+        OnChainTransaction.objects.filter(status='PENDING')
+        .values('transaction_type')
+        .annotate(count=Count('id'), oldest=Min('created_at'))
+    )
+    queued = (
+        QueuedChainWrite.objects.filter(status__in=['QUEUED', 'PROCESSING'])
+        .values('operation', 'status')
+        .annotate(count=Count('id'))
+    )
+    return {
+        'pending': [
+            {'type': row['transaction_type'], 'count': row['count'], 'oldest': row['oldest'].isoformat()}
+            for row in pending
+        ],
+        'queued': list(queued),
+        'outbox_pending': TaskOutbox.objects.filter(status__in=['PENDING', 'PUBLISHING']).count(),
+        'queue_depth': celery_queue_depth(),
+    }
+
+
+def refresh_chain_state():
+    """Recompute the backlog gauges and store them as the current snapshot"""
+    from .models import ChainStateSnapshot
+
+    snapshot, _ = ChainStateSnapshot.objects.update_or_create(
+        pk=SNAPSHOT_ID,
+        defaults={'data': compute_chain_state(), 'refreshed_at': timezone.now()},
+    )
+    return snapshot
+
+
+def celery_queue_depth():
+    """Message count per queue, or None if the broker is unreachable"""
+    from AuthentiCred.celery import app
+
+    queues = [queue.name for queue in app.amqp.queues.values()] or [app.conf.task_default_queue]
+    try:
+        with app.connection_for_read() as connection:
+            connection.ensure_connection(max_retries=1, timeout=settings.METRICS_BROKER_TIMEOUT)
+            channel = connection.default_channel
+            return {
+                queue: channel.queue_declare(queue=queue, passive=True).message_count
+                for queue in queues
+            }
+    except Exception as e:
+        logger.warning(f"Celery queue depth unavailable: {str(e)}")
+        return None
+
+
+class ChainStateCollector:
+    """Backlog gauges from the latest ChainStateSnapshot (one primary key lookup per scrape)"""
+
+    def collect(self):
+        from .models import ChainStateSnapshot
+
+        snapshot = ChainStateSnapshot.objects.filter(pk=SNAPSHOT_ID).first()
+        if snapshot is None:
+            # Beat has not refreshed the snapshot yet
+            return
+        now = timezone.now()
+        data = snapshot.data
+
+        yield GaugeMetricFamily(
+            'authenticred_chain_state_age_seconds',
+            'Age of the backlog gauges below (refreshed every METRICS_REFRESH_SECONDS)',
+            value=(now - snapshot.refreshed_at).total_seconds()
+        )
+
+        pending = GaugeMetricFamily(
+            'authenticred_pending_transactions',
+            'OnChainTransaction rows still PENDING',
+            labels=['type']
+        )
+        oldest = GaugeMetricFamily(
+            'authenticred_oldest_pending_transaction_seconds',
+            'Age of the oldest PENDING transaction (anchoring lag for CREDENTIAL_ANCHORING)',
+            labels=['type']
+        )
+        for row in data.get('pending', []):
+            pending.add_metric([row['type']], row['count'])
+            oldest.add_metric([row['type']], (now - datetime.fromisoformat(row['oldest'])).total_seconds())
+        yield pending
+        yield oldest
+
+        queued = GaugeMetricFamily(
+            'authenticred_queued_chain_writes',
+            'Chain writes waiting for a batch flush',
+            labels=['operation', 'status']
+        )
+        for row in data.get('queued', []):
+            queued.add_metric([row['operation'], row['status']], row['count'])
+        yield queued
+
+        yield GaugeMetricFamily(
+            'authenticred_task_outbox_pending',
+            'Tasks waiting in the outbox for the broker',
+            value=data.get('outbox_pending', 0)
+        )
+
+        depth = data.get('queue_depth')
+        if depth is not None:
+            queue_depth = GaugeMetricFamily(
+                'authenticred_celery_queue_depth',
+                'Messages waiting in Celery queues',
+                labels=['queue']
+            )
+            for queue, count in depth.items():
+                queue_depth.add_metric([queue], count)
+            yield queue_depth
+
+
+# Celery task outcomes and run times, for every task in the worker
+_task_started = {}
+
+
+@signals.task_prerun.connect
+def _task_prerun(task_id=None, **kwargs):
+    _task_started[task_id] = time.monotonic()
+
+
+@signals.task_postrun.connect
+def _task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if task is None:
+        return
+    TASK_RUNS.labels(task=task.name, outcome=(state or 'UNKNOWN').lower()).inc()
+    if started is not None:
+        TASK_SECONDS.labels(task=task.name).observe(time.monotonic() - started)
+
+
+@signals.worker_process_shutdown.connect
+def _worker_process_shutdown(pid=None, **kwargs):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+def render_metrics():
+    """Exposition text for all processes (multiprocess mode) or this process, plus backlog gauges"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    state_registry = CollectorRegistry()
+    state_registry.register(ChainStateCollector())
+    return generate_latest(registry) + generate_latest(state_registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,30 @@
+# blockchain/middleware.py
+from django.conf import settings
+from .utils.instrumentation import track_chain_calls
+
+
+class ChainCallMiddleware:
+    """
+    Track the chain calls made while handling a request.
+
+    The CallStats are available to views as `request.chain_calls`. With
+    BLOCKCHAIN_SERVER_TIMING enabled, totals are also sent in a Server-Timing header
+    so they show up in the browser's network panel.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with track_chain_calls() as stats:
+            request.chain_calls = stats
+            response = self.get_response(request)
+
+        if settings.BLOCKCHAIN_SERVER_TIMING and stats.count:
+            timing = (
+                f'chain;dur={stats.duration * 1000:.1f};'
+                f'desc="{stats.count} calls, {stats.errors} errors"'
+            )
+            existing = response.get('Server-Timing')
+            response['Server-Timing'] = f'{existing}, {timing}' if existing else timing
+        return response
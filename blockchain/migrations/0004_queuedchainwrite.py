@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0003_didregistration_transaction_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedChainWrite',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('operation', models.CharField(choices=[('ANCHOR', 'Credential Anchoring'), ('REVOKE', 'Credential Revocation'), ('TRUST', 'Trust Status Update')], max_length=20)),
+                ('subject', models.CharField(max_length=255)),
+                ('trusted', models.BooleanField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('QUEUED', 'Queued'), ('PROCESSING', 'Processing'), ('SUBMITTED', 'Submitted'), ('FAILED', 'Failed')], default='QUEUED', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('transaction', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='queued_writes', to='blockchain.onchaintransaction')),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'operation', 'created_at'], name='blockchain__status_83e506_idx')],
+            },
+        ),
+    ]
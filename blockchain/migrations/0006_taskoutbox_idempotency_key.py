@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0005_taskoutbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskoutbox',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=255, null=True, unique=True),
+        ),
+    ]
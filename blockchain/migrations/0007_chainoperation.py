@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0006_taskoutbox_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChainOperation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('operation', models.CharField(choices=[('ANCHOR', 'Credential Anchoring'), ('REVOKE', 'Credential Revocation')], max_length=20)),
+                ('subject', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('SENDING', 'Sending'), ('SENT', 'Sent'), ('ON_CHAIN', 'Already on chain'), ('FAILED', 'Failed')], default='SENDING', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('transaction', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='operations', to='blockchain.onchaintransaction')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('operation', 'subject'), name='unique_chain_operation')],
+            },
+        ),
+    ]
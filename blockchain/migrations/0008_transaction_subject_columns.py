@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0007_chainoperation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='onchaintransaction',
+            name='credential_id',
+            field=models.UUIDField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='onchaintransaction',
+            name='did',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='onchaintransaction',
+            name='vc_hash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='onchaintransaction',
+            index=models.Index(fields=['status', 'created_at'], name='blockchain__status_6d6d22_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='onchaintransaction',
+            index=models.Index(fields=['transaction_type', 'status'], name='blockchain__transac_b34ece_idx'),
+        ),
+    ]
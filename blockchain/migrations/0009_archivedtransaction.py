@@ -0,0 +1,46 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0008_transaction_subject_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTransaction',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('tx_hash', models.CharField(max_length=66, unique=True)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('CONFIRMED', 'Confirmed'), ('FAILED', 'Failed')], max_length=20)),
+                ('transaction_type', models.CharField(choices=[('DID_REGISTRATION', 'DID Registration'), ('CREDENTIAL_ANCHORING', 'Credential Anchoring'), ('CREDENTIAL_REVOCATION', 'Credential Revocation'), ('TRUST_UPDATE', 'Trust Status Update')], max_length=50)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('did', models.CharField(blank=True, db_index=True, default='', max_length=255)),
+                ('vc_hash', models.CharField(blank=True, db_index=True, default='', max_length=64)),
+                ('credential_id', models.UUIDField(blank=True, db_index=True, null=True)),
+                ('block_number', models.PositiveIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='chainoperation',
+            name='transaction',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='operations', to='blockchain.onchaintransaction'),
+        ),
+        migrations.AlterField(
+            model_name='didregistration',
+            name='transaction',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='did_registrations', to='blockchain.onchaintransaction'),
+        ),
+        migrations.AlterField(
+            model_name='queuedchainwrite',
+            name='transaction',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='queued_writes', to='blockchain.onchaintransaction'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0009_archivedtransaction'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chainoperation',
+            name='tx_hash',
+            field=models.CharField(blank=True, default='', max_length=66),
+        ),
+        migrations.AlterField(
+            model_name='chainoperation',
+            name='status',
+            field=models.CharField(choices=[('SENDING', 'Sending'), ('SENT', 'Sent'), ('UNKNOWN', 'Send outcome unknown'), ('ON_CHAIN', 'Already on chain'), ('FAILED', 'Failed')], default='SENDING', max_length=20),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:34
+
+from django.db import migrations, models
+
+# Most advanced first: the row kept of a duplicate group
+ACTIVE_STATUSES = ['SUBMITTED', 'PROCESSING', 'QUEUED']
+
+
+def fail_duplicate_writes(apps, schema_editor):
+    """Keep one active anchoring or revocation per subject, so the constraint can be created"""
+    QueuedChainWrite = apps.get_model('blockchain', 'QueuedChainWrite')
+    seen = set()
+    duplicates = []
+    active = QueuedChainWrite.objects.filter(status__in=ACTIVE_STATUSES).exclude(operation='TRUST')
+    for item in sorted(active, key=lambda item: (ACTIVE_STATUSES.index(item.status), item.created_at)):
+        key = (item.operation, item.subject)
+        if key in seen:
+            duplicates.append(item.pk)
+        seen.add(key)
+    QueuedChainWrite.objects.filter(pk__in=duplicates).update(status='FAILED')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0010_chain_operation_signed_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_duplicate_writes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='queuedchainwrite',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['QUEUED', 'PROCESSING', 'SUBMITTED']), models.Q(('operation', 'TRUST'), _negated=True)), fields=('operation', 'subject'), name='unique_active_chain_write'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0011_queued_chain_write_unique_active'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='taskoutbox',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AlterField(
+            model_name='taskoutbox',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('PUBLISHING', 'Publishing'), ('DISPATCHED', 'Dispatched')], default='PENDING', max_length=20),
+        ),
+        migrations.AddConstraint(
+            model_name='taskoutbox',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['PENDING', 'PUBLISHING'])), fields=('idempotency_key',), name='unique_active_outbox_key'),
+        ),
+    ]
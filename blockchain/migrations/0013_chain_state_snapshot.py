@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0012_task_outbox_claims'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChainStateSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.JSONField(default=dict)),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+        ),
+    ]
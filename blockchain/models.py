@@ -1,6 +1,7 @@
 # On-chain state representation
 from django.db import models
 from django.db.models import JSONField
+from django.db.models.fields.related_descriptors import ForwardManyToOneDescriptor
 
 class OnChainTransaction(models.Model):
     TX_TYPES = (
@@ -20,13 +21,87 @@ class OnChainTransaction(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
     transaction_type = models.CharField(max_length=50, choices=TX_TYPES)
     metadata = JSONField(default=dict, blank=True)
+    # Subject of single-item transactions, copied out of metadata so lookups use an index;
+    # batch transactions keep their item lists in metadata only
+    did = models.CharField(max_length=255, blank=True, default='', db_index=True)
+    vc_hash = models.CharField(max_length=64, blank=True, default='', db_index=True)
+    credential_id = models.UUIDField(null=True, blank=True, db_index=True)
     block_number = models.PositiveIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['transaction_type', 'status']),
+        ]
+    
     def __str__(self):
         return f"{self.tx_hash} ({self.get_status_display()})"
 
+class ArchivedTransaction(models.Model):
+    """
+    Confirmed or failed OnChainTransaction moved out of the hot table.
+
+    Keeps the original primary key, so foreign keys to OnChainTransaction (created
+    without a database constraint) still identify the row after archival. Read through
+    blockchain/utils/archive.py, which looks in both tables.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    tx_hash = models.CharField(max_length=66, unique=True)
+    status = models.CharField(max_length=20, choices=OnChainTransaction.STATUS_CHOICES)
+    transaction_type = models.CharField(max_length=50, choices=OnChainTransaction.TX_TYPES)
+    metadata = JSONField(default=dict, blank=True)
+    did = models.CharField(max_length=255, blank=True, default='', db_index=True)
+    vc_hash = models.CharField(max_length=64, blank=True, default='', db_index=True)
+    credential_id = models.UUIDField(null=True, blank=True, db_index=True)
+    block_number = models.PositiveIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.tx_hash} ({self.get_status_display()}, archived)"
+
+class ArchivedTransactionDescriptor(ForwardManyToOneDescriptor):
+    """Reads a transaction that has been archived from ArchivedTransaction"""
+
+    def __get__(self, instance, cls=None):
+        tx = super().__get__(instance, cls)
+        # select_related joins only the hot table and caches None for archived rows
+        if tx is None and instance is not None and getattr(instance, self.field.attname) is not None:
+            tx = self._archived(instance)
+            self.field.set_cached_value(instance, tx)
+        return tx
+
+    def get_object(self, instance):
+        try:
+            return super().get_object(instance)
+        except self.field.remote_field.model.DoesNotExist:
+            tx = self._archived(instance)
+            if tx is None:
+                raise
+            return tx
+
+    def _archived(self, instance):
+        return ArchivedTransaction.objects.filter(pk=getattr(instance, self.field.attname)).first()
+
+
+class TransactionForeignKey(models.ForeignKey):
+    """
+    Foreign key to OnChainTransaction that may point at an archived transaction.
+
+    Created without a database constraint, since archival deletes the hot row;
+    accessing the relation returns the ArchivedTransaction (same primary key) then.
+    Deconstructs as a plain ForeignKey, so migrations are unaffected.
+    """
+    forward_related_accessor_class = ArchivedTransactionDescriptor
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        return name, 'django.db.models.ForeignKey', args, kwargs
+
+
 class DIDRegistration(models.Model):
     did = models.CharField(max_length=255, unique=True)
     public_key = models.TextField()
@@ -36,9 +111,10 @@ class DIDRegistration(models.Model):
         on_delete=models.CASCADE,
         related_name='dids'
     )
-    transaction = models.ForeignKey(
+    transaction = TransactionForeignKey(
         OnChainTransaction,
-        on_delete=models.SET_NULL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,  # May point at an archived transaction (ArchivedTransaction)
         null=True,
         blank=True,
         related_name='did_registrations'
@@ -47,4 +123,153 @@ class DIDRegistration(models.Model):
     
     def __str__(self):
         return self.did
-      
\ No newline at end of file
+      
+class QueuedChainWrite(models.Model):
+    """Chain write waiting to be coalesced into a batch transaction"""
+    OPERATIONS = (
+        ('ANCHOR', 'Credential Anchoring'),
+        ('REVOKE', 'Credential Revocation'),
+        ('TRUST', 'Trust Status Update'),
+    )
+    
+    STATUS_CHOICES = (
+        ('QUEUED', 'Queued'),
+        ('PROCESSING', 'Processing'),
+        ('SUBMITTED', 'Submitted'),
+        ('FAILED', 'Failed'),
+    )
+    
+    operation = models.CharField(max_length=20, choices=OPERATIONS)
+    subject = models.CharField(max_length=255)  # vc_hash, credential ID or DID
+    trusted = models.BooleanField(null=True, blank=True)  # Only used for trust updates
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='QUEUED')
+    attempts = models.PositiveIntegerField(default=0)
+    transaction = TransactionForeignKey(
+        OnChainTransaction,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,  # May point at an archived transaction (ArchivedTransaction)
+        null=True,
+        blank=True,
+        related_name='queued_writes'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'operation', 'created_at']),
+        ]
+        constraints = [
+            # Anchoring and revocation are one-off writes; trust updates may legitimately repeat
+            models.UniqueConstraint(
+                fields=['operation', 'subject'],
+                condition=models.Q(status__in=['QUEUED', 'PROCESSING', 'SUBMITTED']) & ~models.Q(operation='TRUST'),
+                name='unique_active_chain_write',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_operation_display()}: {self.subject} ({self.get_status_display()})"
+
+class ChainOperation(models.Model):
+    """
+    One logical chain write per (operation, subject).
+
+    The unique constraint makes duplicate anchoring or revocation tasks (re-issue,
+    Celery redelivery, retries after a timeout) share one row, and with it at most
+    one transaction in flight.
+    """
+    OPERATIONS = (
+        ('ANCHOR', 'Credential Anchoring'),
+        ('REVOKE', 'Credential Revocation'),
+    )
+    
+    STATUS_CHOICES = (
+        ('SENDING', 'Sending'),
+        ('SENT', 'Sent'),
+        ('UNKNOWN', 'Send outcome unknown'),
+        ('ON_CHAIN', 'Already on chain'),
+        ('FAILED', 'Failed'),
+    )
+    
+    operation = models.CharField(max_length=20, choices=OPERATIONS)
+    subject = models.CharField(max_length=255)  # vc_hash or credential ID
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='SENDING')
+    # Hash of the last signed transaction, stored before it is broadcast
+    tx_hash = models.CharField(max_length=66, blank=True, default='')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    transaction = TransactionForeignKey(
+        OnChainTransaction,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,  # May point at an archived transaction (ArchivedTransaction)
+        null=True,
+        blank=True,
+        related_name='operations'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['operation', 'subject'], name='unique_chain_operation'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_operation_display()}: {self.subject} ({self.get_status_display()})"
+
+class TaskOutbox(models.Model):
+    """
+    Celery task waiting to be published.
+
+    Rows are written in the same database transaction as the change that needs the
+    task and published once it commits, or stored after a failed publish while the
+    broker is down. idempotency_key makes repeated dispatches of the same work a no-op
+    while an entry for it is waiting to be published.
+    """
+    STATUS_CHOICES = (
+        ('PENDING', 'Pending'),
+        ('PUBLISHING', 'Publishing'),  # Claimed by a relay
+        ('DISPATCHED', 'Dispatched'),
+    )
+    
+    task_name = models.CharField(max_length=255)  # Registered Celery task name
+    idempotency_key = models.CharField(max_length=255, null=True, blank=True)
+    args = JSONField(default=list, blank=True)
+    kwargs = JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    task_id = models.CharField(max_length=255, blank=True, default='')  # Celery task ID once published
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['idempotency_key'],
+                condition=models.Q(status__in=['PENDING', 'PUBLISHING']),
+                name='unique_active_outbox_key',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.task_name} ({self.get_status_display()})"
+
+class ChainStateSnapshot(models.Model):
+    """
+    Backlog gauges for /metrics, recomputed periodically by
+    blockchain.tasks.refresh_chain_state_metrics (blockchain/metrics.py), so scrapes
+    never query the backlog tables or the broker. Holds a single row.
+    """
+    data = models.JSONField(default=dict)
+    refreshed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Chain state at {self.refreshed_at}"
@@ -3,8 +3,13 @@
 import logging
 from web3 import Web3
 from django.conf import settings
-from .exceptions import BlockchainError
+from .clients import get_client
+from .exceptions import BlockchainError, ChainConnectionError, PartialBatchError
+from .metrics import CHAIN_TRANSACTIONS
+from credentials.models import Credential
 from .models import OnChainTransaction
+from .utils.archive import get_transaction
+from .utils.keys import credential_key, did_key
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +19,10 @@ class BlockchainService:
         'TrustRegistry': 'TrustRegistry.json',
         'CredentialAnchor': 'CredentialAnchor.json',
         'RevocationRegistry': 'RevocationRegistry.json',
+        'Multicall': 'Multicall.json',
+        'DIDRegistryV2': 'DIDRegistryV2.json',
+        'TrustRegistryV2': 'TrustRegistryV2.json',
+        'RevocationRegistryV2': 'RevocationRegistryV2.json',
     }
     
     CONTRACT_ADDRESSES = {
@@ -21,22 +30,44 @@ class BlockchainService:
         'TrustRegistry': settings.TRUSTREGISTRY_ADDRESS,
         'CredentialAnchor': settings.CREDENTIALANCHOR_ADDRESS,
         'RevocationRegistry': settings.REVOCATIONREGISTRY_ADDRESS,
+        'Multicall': settings.MULTICALL_ADDRESS,
+        'DIDRegistryV2': settings.DIDREGISTRYV2_ADDRESS,
+        'TrustRegistryV2': settings.TRUSTREGISTRYV2_ADDRESS,
+        'RevocationRegistryV2': settings.REVOCATIONREGISTRYV2_ADDRESS,
     }
     
-    def __init__(self, client=None):
+    # Approximate gas per item for the batch write functions, used to size chunks;
+    # a fresh SSTORE plus event costs ~22k for bytes32 keys and more for hashed string keys
+    BATCH_BASE_GAS = 50000
+    BATCH_ITEM_GAS = {
+        'storeProofs': 30000,
+        'revokeCredentials': 40000,
+        'setIssuerTrustStatuses': 45000,
+    }
+    
+    def __init__(self, client=None, registry_version=None):
         self.client = client or self.get_default_client()
+        self.registry_version = registry_version or settings.BLOCKCHAIN_REGISTRY_VERSION
     
     def get_default_client(self):
-        if settings.BLOCKCHAIN_NETWORK == 'ganache':
-            from .clients.ganache import GanacheClient
-            return GanacheClient()
-        else:
-            raise BlockchainError("Unsupported blockchain network")
+        return get_client(settings.BLOCKCHAIN_NETWORK)
+    
+    def _registry(self, contract_name):
+        """Name of the DID/trust/revocation registry contract for the configured version"""
+        return f"{contract_name}V2" if self.registry_version == 2 else contract_name
+    
+    def _credential_key(self, credential_id):
+        """Revocation registry key: the ID string for v1, bytes32 UUID bytes for v2"""
+        return credential_key(credential_id) if self.registry_version == 2 else str(credential_id)
+    
+    def _did_key(self, did):
+        """Trust/DID registry lookup key: the DID string for v1, keccak256(did) for v2"""
+        return did_key(did) if self.registry_version == 2 else did
     
     def register_did(self, did, public_key):
         try:
             tx_hash = self.client.execute_contract_function(
-                'DIDRegistry',
+                self._registry('DIDRegistry'),
                 'registerDID',
                 did,
                 public_key
@@ -47,12 +78,13 @@ class BlockchainService:
             logger.error(f"DID registration failed: {str(e)}")
             raise BlockchainError(f"DID registration failed: {str(e)}") from e
     
-    def anchor_credential(self, vc_hash):
+    def anchor_credential(self, vc_hash, on_signed=None):
         try:
             tx_hash = self.client.execute_contract_function(
                 'CredentialAnchor',
                 'storeProof',
-                vc_hash
+                vc_hash,
+                on_signed=on_signed
             )
             self._create_transaction_record(tx_hash, 'CREDENTIAL_ANCHORING', vc_hash=vc_hash)
             return tx_hash
@@ -60,28 +92,34 @@ class BlockchainService:
             logger.error(f"Credential anchoring failed: {str(e)}")
             raise BlockchainError(f"Credential anchoring failed: {str(e)}") from e
     
-    def revoke_credential(self, credential_id):
+    def revoke_credential(self, credential_id, on_signed=None):
         """Revoke a credential using its database ID"""
         tx_hash = self.client.execute_contract_function(
-            'RevocationRegistry',
+            self._registry('RevocationRegistry'),
             'revokeCredential',
-            str(credential_id)  # Convert to string as contract expects
+            self._credential_key(credential_id),
+            on_signed=on_signed
         )
+        self._create_transaction_record(tx_hash, 'CREDENTIAL_REVOCATION', credential_id=str(credential_id))
         return tx_hash
 
+    def is_credential_anchored(self, vc_hash):
+        """Check whether a credential hash is anchored in CredentialAnchor"""
+        return self.client.call_contract_function('CredentialAnchor', 'verifyProof', vc_hash)
+
     def is_credential_revoked(self, credential_id):
         """Check revocation status using credential ID"""
         return self.client.call_contract_function(
-            'RevocationRegistry',
+            self._registry('RevocationRegistry'),
             'isRevoked',
-            str(credential_id)
+            self._credential_key(credential_id)
         )
     def is_issuer_registered(self, did):
         try:
             return self.client.call_contract_function(
-                'TrustRegistry',
+                self._registry('TrustRegistry'),
                 'isIssuerTrusted',
-                did
+                self._did_key(did)
             )
         except Exception as e:
             logger.error(f"Issuer check failed: {str(e)}")
@@ -91,9 +129,9 @@ class BlockchainService:
         """Check if a DID is registered in the DIDRegistry"""
         try:
             public_key = self.client.call_contract_function(
-                'DIDRegistry',
+                self._registry('DIDRegistry'),
                 'resolveDID',
-                did
+                self._did_key(did)
             )
             # If the DID is not registered, resolveDID will return an empty string
             return public_key != ""
@@ -101,16 +139,196 @@ class BlockchainService:
             logger.error(f"DID registration check failed: {str(e)}")
             raise BlockchainError(f"DID registration check failed: {str(e)}") from e
 
+    def batch_call(self, calls):
+        """
+        Execute many read calls with as few RPC requests as possible.
+
+        Calls are packed into Multicall chunks that fit under MULTICALL_CALL_GAS_LIMIT.
+        Without a deployed Multicall contract, calls are made one by one.
+
+        Args:
+            calls: list of (contract_name, function_name, args) tuples
+
+        Returns:
+            list: result for each call, or None where the call failed
+        """
+        if not calls:
+            return []
+
+        if not hasattr(self.client, 'aggregate_calls') or not self.client.has_contract('Multicall'):
+            results = []
+            for contract_name, function_name, args in calls:
+                try:
+                    results.append(self.client.call_contract_function(contract_name, function_name, *args))
+                except Exception as e:
+                    logger.error(f"Contract call failed for {contract_name}.{function_name}: {str(e)}")
+                    results.append(None)
+            return results
+
+        chunk_size = max(1, settings.MULTICALL_CALL_GAS_LIMIT // settings.MULTICALL_GAS_PER_CALL)
+        results = []
+        for start in range(0, len(calls), chunk_size):
+            chunk = calls[start:start + chunk_size]
+            try:
+                results.extend(self.client.aggregate_calls(chunk, gas=settings.MULTICALL_CALL_GAS_LIMIT))
+            except Exception as e:
+                logger.error(f"Batched contract call failed: {str(e)}")
+                results.extend([None] * len(chunk))
+        return results
+
+    def _batch_lookup(self, contract_name, function_name, keys, encode_key=None):
+        """Run one read function for many keys and map each key to its result"""
+        unique_keys = list(dict.fromkeys(keys))
+        encode_key = encode_key or (lambda key: key)
+        results = self.batch_call([(contract_name, function_name, (encode_key(key),)) for key in unique_keys])
+        return dict(zip(unique_keys, results))
+
+    def batch_is_revoked(self, credential_ids):
+        """Check revocation status for many credentials, keyed by credential ID string"""
+        return self._batch_lookup(
+            self._registry('RevocationRegistry'), 'isRevoked',
+            [str(cid) for cid in credential_ids], self._credential_key
+        )
+
+    def batch_verify_proofs(self, vc_hashes):
+        """Check anchoring status for many credential hashes, keyed by hash"""
+        return self._batch_lookup('CredentialAnchor', 'verifyProof', vc_hashes)
+
+    def batch_is_trusted(self, dids):
+        """Check issuer trust status for many DIDs, keyed by DID"""
+        return self._batch_lookup(self._registry('TrustRegistry'), 'isIssuerTrusted', dids, self._did_key)
+
+    def batch_resolve_dids(self, dids):
+        """Resolve public keys for many DIDs, keyed by DID ('' when not registered)"""
+        return self._batch_lookup(self._registry('DIDRegistry'), 'resolveDID', dids, self._did_key)
+
+    def get_credentials_chain_status(self, credentials):
+        """
+        Fetch anchoring, trust and revocation status for a list of credentials
+        in a single batch of reads.
+
+        A read that failed (node unreachable, call reverted) gives None rather
+        than False, so an outage is never reported as "not anchored" or "revoked".
+
+        Returns:
+            dict: credential ID string -> {'anchored', 'issuer_trusted', 'revoked'}, each True, False or None
+        """
+        credentials = list(credentials)
+        calls = []
+        for credential in credentials:
+            calls.append(('CredentialAnchor', 'verifyProof', (credential.vc_hash,)))
+            calls.append((self._registry('TrustRegistry'), 'isIssuerTrusted', (self._did_key(credential.issuer.did),)))
+            calls.append((self._registry('RevocationRegistry'), 'isRevoked', (self._credential_key(credential.id),)))
+        results = self.batch_call(calls)
+
+        status = {}
+        for index, credential in enumerate(credentials):
+            anchored, issuer_trusted, revoked = results[index * 3:index * 3 + 3]
+            status[str(credential.id)] = {
+                'anchored': None if anchored is None else bool(anchored),
+                'issuer_trusted': None if issuer_trusted is None else bool(issuer_trusted),
+                'revoked': None if revoked is None else bool(revoked),
+            }
+        return status
+
+    def _batch_write(self, contract_name, function_name, items, build_args, tx_type, record_kwargs, subject):
+        """
+        Send items in chunks that fit BLOCKCHAIN_BATCH_GAS_LIMIT, one transaction per chunk.
+
+        Each chunk's OnChainTransaction is recorded as soon as it is sent, so a failure in a
+        later chunk raises PartialBatchError carrying the subjects that are already on chain.
+
+        Returns:
+            dict: subject -> tx_hash for every item sent
+        """
+        item_gas = self.BATCH_ITEM_GAS[function_name]
+        chunk_size = max(1, (settings.BLOCKCHAIN_BATCH_GAS_LIMIT - self.BATCH_BASE_GAS) // item_gas)
+        sent = {}
+        for start in range(0, len(items), chunk_size):
+            chunk = items[start:start + chunk_size]
+            try:
+                tx_hash = self.client.execute_contract_function(
+                    contract_name,
+                    function_name,
+                    *build_args(chunk)
+                )
+            except Exception as e:
+                logger.error(f"Batch {function_name} failed after {len(sent)} of {len(items)} items: {str(e)}")
+                if sent:
+                    raise PartialBatchError(
+                        f"Batch {function_name} failed after {len(sent)} of {len(items)} items: {str(e)}",
+                        sent
+                    ) from e
+                raise BlockchainError(f"Batch {function_name} failed: {str(e)}") from e
+            self._create_transaction_record(tx_hash, tx_type, **record_kwargs(chunk))
+            sent.update({subject(item): tx_hash for item in chunk})
+        return sent
+
+    def anchor_credentials(self, vc_hashes):
+        """Anchor many credential hashes with storeProofs, returns {vc_hash: tx_hash}"""
+        vc_hashes = list(dict.fromkeys(vc_hashes))
+        return self._batch_write(
+            'CredentialAnchor', 'storeProofs', vc_hashes,
+            lambda chunk: (list(chunk),),
+            'CREDENTIAL_ANCHORING',
+            lambda chunk: {'vc_hashes': chunk},
+            lambda vc_hash: vc_hash
+        )
+
+    def revoke_credentials(self, credential_ids):
+        """Revoke many credentials with revokeCredentials, returns {credential_id: tx_hash}"""
+        credential_ids = list(dict.fromkeys(str(cid) for cid in credential_ids))
+        return self._batch_write(
+            self._registry('RevocationRegistry'), 'revokeCredentials', credential_ids,
+            lambda chunk: ([self._credential_key(cid) for cid in chunk],),
+            'CREDENTIAL_REVOCATION',
+            lambda chunk: {'credential_ids': chunk},
+            lambda credential_id: credential_id
+        )
+
+    def update_issuer_trust_statuses(self, statuses):
+        """
+        Update trust status for many issuers with setIssuerTrustStatuses.
+
+        Args:
+            statuses: dict of DID -> trusted flag
+
+        Returns:
+            dict: DID -> tx_hash
+        """
+        return self._batch_write(
+            self._registry('TrustRegistry'), 'setIssuerTrustStatuses', list(statuses.items()),
+            lambda chunk: ([self._did_key(did) for did, _ in chunk], [bool(trusted) for _, trusted in chunk]),
+            'TRUST_UPDATE',
+            lambda chunk: {'trust_statuses': dict(chunk)},
+            lambda item: item[0]
+        )
+
     def _create_transaction_record(self, tx_hash, tx_type, **kwargs):
-        OnChainTransaction.objects.create(
+        CHAIN_TRANSACTIONS.labels(type=tx_type).inc()
+        record = OnChainTransaction.objects.create(
             tx_hash=tx_hash,
             status='PENDING',
             transaction_type=tx_type,
+            did=kwargs.get('did', ''),
+            vc_hash=kwargs.get('vc_hash', ''),
+            credential_id=kwargs.get('credential_id'),
             metadata=kwargs
         )
+        # Anchored credentials point at the transaction that anchored them
+        vc_hashes = [kwargs['vc_hash']] if 'vc_hash' in kwargs else kwargs.get('vc_hashes')
+        if tx_type == 'CREDENTIAL_ANCHORING' and vc_hashes:
+            Credential.objects.filter(vc_hash__in=vc_hashes).update(anchor_transaction=record)
+        return record
 
     def verify_credential(self, credential):
-        """Comprehensive credential verification"""
+        """
+        Comprehensive credential verification.
+
+        Raises:
+            ChainConnectionError: if the chain status could not be read, instead
+                of reporting the credential as not anchored or revoked
+        """
         results = {
             'anchored': False,
             'issuer_trusted': False,
@@ -118,28 +336,60 @@ class BlockchainService:
             'signature_valid': False
         }
         
+        # Verify anchoring, issuer and revocation in one batch of reads
+        status = self.get_credentials_chain_status([credential])[str(credential.id)]
+        unread = [name for name, value in status.items() if value is None]
+        if unread:
+            logger.error(f"Credential verification failed for {credential.id}: could not read {', '.join(unread)}")
+            raise ChainConnectionError(f"Could not read {', '.join(unread)} status of credential {credential.id}")
+        results['anchored'] = status['anchored']
+        results['issuer_trusted'] = status['issuer_trusted']
+        results['not_revoked'] = not status['revoked']
+
+        # Verify signature (pseudocode - implement based on your crypto)
+        # results['signature_valid'] = verify_signature(credential.vc_json)
+        
+        return results
+    
+    def replace_stuck_transaction(self, tx_record):
+        """
+        Resend a pending transaction with bumped fees and point the record at the replacement.
+        
+        The replaced hashes are kept in metadata['replaced_tx_hashes'], since any of them may
+        still be the one that gets mined.
+        
+        Returns:
+            str: new transaction hash, or None if the current one is already mined or
+            cannot be outbid under BLOCKCHAIN_MAX_FEE_GWEI
+        """
         try:
-            # Verify anchoring
-            results['anchored'] = self.client.call_contract_function(
-                'CredentialAnchor',
-                'verifyProof',
-                credential.vc_hash
-            )
-            
-            # Verify issuer
-            results['issuer_trusted'] = self.is_issuer_registered(credential.issuer.did)
-            
-            # Verify revocation
-            results['not_revoked'] = not self.is_credential_revoked(str(credential.id))
-            
-            # Verify signature (pseudocode - implement based on your crypto)
-            # results['signature_valid'] = verify_signature(credential.vc_json)
-            
+            new_hash = self.client.replace_transaction(tx_record.tx_hash)
         except Exception as e:
-            logger.error(f"Credential verification failed: {str(e)}")
+            logger.error(f"Transaction replacement failed for {tx_record.tx_hash}: {str(e)}")
+            raise BlockchainError(f"Transaction replacement failed: {str(e)}") from e
+        if new_hash is None:
+            return None
         
-        return results
+        tx_record.metadata['replaced_tx_hashes'] = tx_record.metadata.get('replaced_tx_hashes', []) + [tx_record.tx_hash]
+        tx_record.tx_hash = new_hash
+        tx_record.save(update_fields=['tx_hash', 'metadata', 'updated_at'])
+        return new_hash
     
+    def recover_transaction(self, tx_hash, tx_type, **kwargs):
+        """
+        Record a signed transaction whose send raised (e.g. an RPC timeout after broadcast).
+
+        Returns:
+            str or None: `tx_hash` if the node has the transaction (now recorded),
+            None if it never arrived and the write must be sent again
+        """
+        if get_transaction(tx_hash=tx_hash):
+            return tx_hash
+        if not self.client.transaction_exists(tx_hash):
+            return None
+        self._create_transaction_record(tx_hash, tx_type, **kwargs)
+        return tx_hash
+
     def is_transaction_confirmed(self, tx_hash):
         """Check if transaction is confirmed on blockchain"""
         try:
@@ -153,9 +403,9 @@ class BlockchainService:
         """Update issuer trust status on blockchain and return transaction"""
         try:
             tx_hash = self.client.execute_contract_function(
-                'TrustRegistry',
+                self._registry('TrustRegistry'),
                 'setIssuerTrustStatus',
-                did,
+                self._did_key(did),
                 trusted
             )
             return self._create_transaction_record(
@@ -168,3 +418,21 @@ class BlockchainService:
             logger.error(f"Trust status update failed: {str(e)}")
             raise BlockchainError(f"Trust status update failed: {str(e)}") from e
           
+
+
+def attach_chain_status(credentials):
+    """
+    Set `chain_status` on each credential of a listing from one batch of reads.
+
+    Drafts are not on chain and get no status. When the node cannot be reached,
+    including while the service is being built, every value of the status is None (unknown).
+    """
+    credentials = [credential for credential in credentials if credential.status != 'DRAFT']
+    try:
+        status = BlockchainService().get_credentials_chain_status(credentials)
+    except Exception as e:
+        logger.error(f"Chain status lookup failed for {len(credentials)} credentials: {str(e)}")
+        status = {}
+    unknown = {'anchored': None, 'issuer_trusted': None, 'revoked': None}
+    for credential in credentials:
+        credential.chain_status = status.get(str(credential.id), unknown)
@@ -5,18 +5,31 @@ from celery.exceptions import MaxRetriesExceededError
 
 from blockchain import apps
 
-from .exceptions import BlockchainError
+from .exceptions import BlockchainError, OperationInProgress, PartialBatchError
+from .metrics import observe_confirmation, refresh_chain_state
 from .services import BlockchainService
+from .utils.archive import archive_transactions, get_transaction
+from .utils.chain_operations import run_chain_operation
+from .utils.outbox import relay_outbox
 from django.conf import settings
 import logging
-from .models import OnChainTransaction, DIDRegistration
+from .models import OnChainTransaction, DIDRegistration, QueuedChainWrite
+from django.db import IntegrityError, transaction
 from django.utils import timezone
+from datetime import timedelta
 
 
 logger = logging.getLogger(__name__)
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=30)
 def register_did_task(self, did, public_key):
+    # Redelivered or re-dispatched task: the registration is already linked to its transaction
+    linked = DIDRegistration.objects.filter(did=did, transaction__isnull=False).first()
+    if linked:
+        sent = get_transaction(pk=linked.transaction_id)
+        tx_hash = sent.tx_hash if sent else None
+        logger.info(f"DID registration already sent for {did}: {tx_hash}")
+        return tx_hash
     try:
         service = BlockchainService()
         tx_hash = service.register_did(did, public_key)
@@ -47,12 +60,37 @@ def register_did_task(self, did, public_key):
                 pass
             raise
 
+def queue_chain_write(operation, subject, trusted=None):
+    """Queue a chain write and schedule a flush after the batching window"""
+    # The unique_active_chain_write constraint rejects a second active anchoring or
+    # revocation of the same subject, also when two workers queue it concurrently
+    try:
+        with transaction.atomic():
+            QueuedChainWrite.objects.create(operation=operation, subject=subject, trusted=trusted)
+    except IntegrityError:
+        logger.info(f"Skipping duplicate queued {operation} for {subject}")
+        return
+    try:
+        flush_queued_chain_writes.apply_async(countdown=settings.BLOCKCHAIN_BATCH_WINDOW)
+    except Exception as e:
+        # Broker unavailable - the item stays QUEUED for the periodic flush
+        logger.warning(f"Could not schedule batch flush, leaving {operation} for {subject} to beat: {e}")
+
 @shared_task(bind=True, max_retries=3, default_retry_delay=30)
 def anchor_credential_task(self, vc_hash):
+    if settings.BLOCKCHAIN_BATCH_WRITES:
+        queue_chain_write('ANCHOR', vc_hash)
+        return None
     try:
         service = BlockchainService()
-        tx_hash = service.anchor_credential(vc_hash)
-        return tx_hash
+        return run_chain_operation(
+            'ANCHOR', vc_hash,
+            is_on_chain=lambda: service.is_credential_anchored(vc_hash),
+            send=lambda on_signed: service.anchor_credential(vc_hash, on_signed=on_signed),
+            find_sent=lambda tx_hash: service.recover_transaction(tx_hash, 'CREDENTIAL_ANCHORING', vc_hash=vc_hash)
+        )
+    except OperationInProgress as e:
+        raise self.retry(exc=e, countdown=e.retry_after)
     except Exception as e:
         logger.warning(f"Retrying credential anchoring for {vc_hash} (attempt {self.request.retries})")
         try:
@@ -67,10 +105,21 @@ def anchor_credential_task(self, vc_hash):
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=30)
 def revoke_credential_task(self, credential_id):
+    if settings.BLOCKCHAIN_BATCH_WRITES:
+        queue_chain_write('REVOKE', str(credential_id))
+        return None
     try:
         service = BlockchainService()
-        tx_hash = service.revoke_credential(credential_id)
-        return tx_hash
+        return run_chain_operation(
+            'REVOKE', str(credential_id),
+            is_on_chain=lambda: service.is_credential_revoked(credential_id),
+            send=lambda on_signed: service.revoke_credential(credential_id, on_signed=on_signed),
+            find_sent=lambda tx_hash: service.recover_transaction(
+                tx_hash, 'CREDENTIAL_REVOCATION', credential_id=str(credential_id)
+            )
+        )
+    except OperationInProgress as e:
+        raise self.retry(exc=e, countdown=e.retry_after)
     except Exception as e:
         logger.warning(f"Retrying credential revocation for {credential_id} (attempt {self.request.retries})")
         try:
@@ -79,6 +128,67 @@ def revoke_credential_task(self, credential_id):
             logger.error(f"Credential revocation failed after retries: {credential_id}")
             raise
 
+@shared_task
+def flush_queued_chain_writes():
+    """Coalesce queued chain writes into batch transactions"""
+    # Release items left in PROCESSING by a worker that died mid-flush
+    QueuedChainWrite.objects.filter(
+        status='PROCESSING',
+        updated_at__lt=timezone.now() - timedelta(minutes=10)
+    ).update(status='QUEUED')
+
+    # Claim queued items so concurrent flushes never send the same item twice
+    with transaction.atomic():
+        claimed = list(
+            QueuedChainWrite.objects.select_for_update(skip_locked=True)
+            .filter(status='QUEUED')
+            .order_by('created_at')
+        )
+        if not claimed:
+            return 0
+        QueuedChainWrite.objects.filter(pk__in=[item.pk for item in claimed]).update(
+            status='PROCESSING',
+            updated_at=timezone.now()
+        )
+    
+    service = BlockchainService()
+    senders = {
+        'ANCHOR': lambda items: service.anchor_credentials([item.subject for item in items]),
+        'REVOKE': lambda items: service.revoke_credentials([item.subject for item in items]),
+        'TRUST': lambda items: service.update_issuer_trust_statuses({item.subject: item.trusted for item in items}),
+    }
+    
+    submitted = 0
+    for operation, send in senders.items():
+        items = [item for item in claimed if item.operation == operation]
+        if not items:
+            continue
+        try:
+            tx_by_subject = send(items)
+        except Exception as e:
+            logger.error(f"Batch {operation} write failed for {len(items)} items: {str(e)}")
+            # Chunks sent before the failure are on chain and must not be sent again
+            tx_by_subject = e.sent if isinstance(e, PartialBatchError) else {}
+            for item in items:
+                if item.subject in tx_by_subject:
+                    continue
+                item.attempts += 1
+                item.status = 'FAILED' if item.attempts >= settings.BLOCKCHAIN_BATCH_MAX_ATTEMPTS else 'QUEUED'
+                item.save(update_fields=['attempts', 'status', 'updated_at'])
+            items = [item for item in items if item.subject in tx_by_subject]
+            if not items:
+                continue
+        
+        transactions = OnChainTransaction.objects.in_bulk(set(tx_by_subject.values()), field_name='tx_hash')
+        for item in items:
+            item.status = 'SUBMITTED'
+            item.transaction = transactions.get(tx_by_subject.get(item.subject))
+            item.save(update_fields=['status', 'transaction', 'updated_at'])
+        submitted += len(items)
+        logger.info(f"Batch {operation} write submitted for {len(items)} items in {len(transactions)} transactions")
+    
+    return submitted
+
 @shared_task
 def monitor_transactions():
     """Monitor and update transaction statuses every 10 seconds"""
@@ -87,10 +197,15 @@ def monitor_transactions():
     
     for tx in pending_txs:
         try:
-            if service.is_transaction_confirmed(tx.tx_hash):
+            # A replaced transaction may still be the one that gets mined
+            candidates = [tx.tx_hash] + tx.metadata.get('replaced_tx_hashes', [])
+            mined_hash = next((h for h in candidates if service.is_transaction_confirmed(h)), None)
+            if mined_hash:
+                tx.tx_hash = mined_hash
                 tx.status = 'CONFIRMED'
                 tx.updated_at = timezone.now()
                 tx.save()
+                observe_confirmation(tx)
                 logger.info(f"Transaction confirmed: {tx.tx_hash}")
         except Exception as e:
             logger.error(f"Error checking transaction {tx.tx_hash}: {str(e)}")
@@ -98,6 +213,44 @@ def monitor_transactions():
             # tx.status = 'FAILED'
             # tx.save()
 
+@shared_task
+def relay_task_outbox():
+    """Publish tasks stored in the outbox while the broker was unavailable"""
+    return relay_outbox()
+
+@shared_task
+def refresh_chain_state_metrics():
+    """Recompute the backlog gauges served at /metrics (blockchain/metrics.py)"""
+    refresh_chain_state()
+
+@shared_task
+def archive_settled_transactions():
+    """Move confirmed and failed transactions older than BLOCKCHAIN_ARCHIVE_AFTER_DAYS to the archive"""
+    return archive_transactions()
+
+@shared_task
+def bump_stuck_transactions():
+    """Replace transactions pending longer than BLOCKCHAIN_STUCK_TX_SECONDS with bumped fees"""
+    cutoff = timezone.now() - timedelta(seconds=settings.BLOCKCHAIN_STUCK_TX_SECONDS)
+    stuck_txs = OnChainTransaction.objects.filter(status='PENDING', updated_at__lt=cutoff)
+    if not stuck_txs.exists():
+        return 0
+    
+    service = BlockchainService()
+    replaced = 0
+    for tx in stuck_txs:
+        if len(tx.metadata.get('replaced_tx_hashes', [])) >= settings.BLOCKCHAIN_MAX_FEE_BUMPS:
+            continue
+        try:
+            old_hash = tx.tx_hash
+            new_hash = service.replace_stuck_transaction(tx)
+            if new_hash:
+                replaced += 1
+                logger.info(f"Stuck transaction {old_hash} replaced with {new_hash}")
+        except Exception as e:
+            logger.error(f"Error replacing stuck transaction {tx.tx_hash}: {str(e)}")
+    return replaced
+
 @shared_task
 def process_did_registration_confirmation():
     """Process confirmed DID registrations every 5 minutes"""
@@ -107,6 +260,28 @@ def process_did_registration_confirmation():
         trust_updated=False
     ).select_related('transaction', 'institution')
     
+    if settings.BLOCKCHAIN_BATCH_WRITES:
+        registrations = list(pending_registrations)
+        if not registrations:
+            return
+        try:
+            # One setIssuerTrustStatuses call per chunk instead of one transaction per DID
+            tx_by_did = service.update_issuer_trust_statuses({r.did: True for r in registrations})
+        except Exception as e:
+            logger.error(f"Failed to update trust status for {len(registrations)} DIDs: {str(e)}")
+            if not isinstance(e, PartialBatchError):
+                return
+            tx_by_did = e.sent
+            registrations = [r for r in registrations if r.did in tx_by_did]
+        for registration in registrations:
+            registration.trust_updated = True
+            registration.save()
+            institution = registration.institution
+            institution.is_trusted = True
+            institution.save()
+            logger.info(f"Trust status updated for {registration.did}: {tx_by_did[registration.did]}")
+        return
+    
     for registration in pending_registrations:
         try:
             # Update trust status on blockchain
@@ -1,124 +1,807 @@
-# from django.test import TestCase
-
-# # Create your tests here.
-# # tests.py
-# import os
-# import json
-# from django.test import TestCase
-# from blockchain.services import BlockchainService
-# from blockchain.utils import vc_proofs
-# from credentials.models import Credential
-# from users.models import User, InstitutionProfile
-
-# class BlockchainTestCase(TestCase):
-#     @classmethod
-#     def setUpTestData(cls):
-#         # Create institution
-#         user = User.objects.create_user(
-#             email='university@example.com',
-#             password='password',
-#             user_type='INSTITUTION'
-#         )
-#         cls.institution = InstitutionProfile.objects.create(
-#             user=user,
-#             name='Test University',
-#             is_trusted=True
-#         )
-        
-#         # Generate DID keys
-#         private_key, public_key = vc_proofs.generate_key_pair()
-#         cls.institution_did = 'did:example:university'
-#         cls.institution_public_key = public_key
-        
-#     def test_did_registration(self):
-#         # Register DID
-#         service = BlockchainService()
-#         tx_hash = service.register_did(
-#             self.institution_did, 
-#             self.institution_public_key.hex()
-#         )
-        
-#         # Check transaction record
-#         tx_record = OnChainTransaction.objects.get(tx_hash=tx_hash)
-#         self.assertEqual(tx_record.transaction_type, 'DID_REGISTRATION')
-        
-#         # Verify DID registration (after some delay)
-#         # In real test, wait for confirmation
-#         registered_key = service.client.call_contract_function(
-#             'DIDRegistry',
-#             'resolveDID',
-#             self.institution_did
-#         )
-#         self.assertEqual(registered_key, self.institution_public_key.hex())
-    
-#     def test_credential_lifecycle(self):
-#         # Create a test credential
-#         credential_data = {
-#             '@context': ['https://www.w3.org/2018/credentials/v1'],
-#             'type': ['VerifiableCredential', 'UniversityDegreeCredential'],
-#             'issuer': self.institution_did,
-#             'issuanceDate': '2023-01-01T00:00:00Z',
-#             'credentialSubject': {
-#                 'id': 'did:example:student123',
-#                 'degree': {
-#                     'type': 'BachelorDegree',
-#                     'name': 'Bachelor of Science'
-#                 }
-#             }
-#         }
-        
-#         # Sign credential
-#         private_key, _ = vc_proofs.generate_key_pair()
-#         signed_vc = vc_proofs.sign_json_ld(credential_data, private_key)
-        
-#         # Create credential in DB
-#         credential = Credential.objects.create(
-#             vc_json=signed_vc,
-#             issuer=self.institution,
-#             holder=User.objects.create_user(email='student@example.com', password='password')
-#         )
-        
-#         # Anchor credential hash to blockchain
-#         vc_hash = vc_proofs.compute_sha256(json.dumps(signed_vc))
-#         service = BlockchainService()
-#         tx_hash = service.anchor_credential(vc_hash)
-        
-#         # Check transaction record
-#         tx_record = OnChainTransaction.objects.get(tx_hash=tx_hash)
-#         self.assertEqual(tx_record.transaction_type, 'CREDENTIAL_ANCHORING')
-        
-#         # Verify credential anchoring
-#         anchored = service.client.call_contract_function(
-#             'CredentialAnchor',
-#             'verifyProof',
-#             vc_hash
-#         )
-#         self.assertTrue(anchored)
-        
-#         # Revoke credential
-#         tx_hash = service.revoke_credential(str(credential.id))
-#         tx_record = OnChainTransaction.objects.get(tx_hash=tx_hash)
-#         self.assertEqual(tx_record.transaction_type, 'CREDENTIAL_REVOCATION')
-        
-#         # Check revocation status
-#         revoked = service.is_credential_revoked(str(credential.id))
-#         self.assertTrue(revoked)
-    
-#     def test_trust_registry(self):
-#         service = BlockchainService()
-        
-#         # Initially should not be trusted
-#         trusted = service.is_issuer_registered(self.institution_did)
-#         self.assertFalse(trusted)
-        
-#         # Add to trust registry (admin function)
-#         tx_hash = service.client.execute_contract_function(
-#             'TrustRegistry',
-#             'setIssuerTrustStatus',
-#             self.institution_did,
-#             True
-#         )
-        
-#         # Now should be trusted
-#         trusted = service.is_issuer_registered(self.institution_did)
-#         self.assertTrue(trusted)
+# blockchain/tests.py
+# Runs against the in-memory chain (blockchain/clients/memory.py), so no node is needed
+import json
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from web3 import Web3
+from blockchain.clients.failover import FailoverProvider, RPCEndpoint
+from blockchain.clients.memory import InMemoryChain, InMemoryChainClient, reset_memory_chain
+from blockchain.exceptions import BlockchainError, ChainConnectionError, OperationInProgress
+from AuthentiCred.celery import app
+from blockchain.models import (
+    ArchivedTransaction, ChainOperation, DIDRegistration, OnChainTransaction, QueuedChainWrite, TaskOutbox,
+)
+from blockchain.services import BlockchainService
+from blockchain.tasks import (
+    anchor_credential_task, flush_queued_chain_writes, queue_chain_write, refresh_chain_state_metrics,
+    revoke_credential_task,
+)
+from blockchain.utils import archive, fees, instrumentation, outbox, vc_proofs
+from blockchain.utils.chain_operations import run_chain_operation
+from blockchain.utils.task_runner import execute_task_with_fallback
+from credentials.models import Credential
+from users.models import User, InstitutionProfile
+from wallets.models import Wallet, WalletCredential
+
+
+class BlockchainTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Create institution
+        user = User.objects.create_user(
+            username='university',
+            email='university@example.com',
+            password='password',
+            user_type='INSTITUTION'
+        )
+        cls.institution = InstitutionProfile.objects.create(
+            user=user,
+            name='Test University',
+            is_trusted=True
+        )
+
+        # Generate DID keys
+        _, public_key = vc_proofs.generate_key_pair()
+        cls.institution_did = user.did
+        cls.institution_public_key = f"0x{public_key.hex()}"
+
+    def setUp(self):
+        self.chain = InMemoryChain()
+        self.service = BlockchainService(client=InMemoryChainClient(chain=self.chain))
+
+    def create_credential(self, title='Bachelor of Science'):
+        credential_data = {
+            '@context': ['https://www.w3.org/2018/credentials/v1'],
+            'type': ['VerifiableCredential', 'UniversityDegreeCredential'],
+            'issuer': self.institution_did,
+            'issuanceDate': '2023-01-01T00:00:00Z',
+            'credentialSubject': {'id': 'did:example:student123', 'degree': {'name': title}},
+        }
+        holder, _ = User.objects.get_or_create(
+            username='student', defaults={'email': 'student@example.com', 'user_type': 'STUDENT'}
+        )
+        return Credential.objects.create(
+            vc_json=credential_data,
+            issuer=self.institution.user,
+            holder=holder,
+            title=title,
+            credential_type='DEGREE',
+            vc_hash=vc_proofs.compute_sha256(json.dumps(credential_data)),
+        )
+
+    def test_did_registration(self):
+        tx_hash = self.service.register_did(self.institution_did, self.institution_public_key)
+
+        tx_record = OnChainTransaction.objects.get(tx_hash=tx_hash)
+        self.assertEqual(tx_record.transaction_type, 'DID_REGISTRATION')
+        self.assertTrue(self.service.is_transaction_confirmed(tx_hash))
+
+        registered_key = self.service.client.call_contract_function('DIDRegistry', 'resolveDID', self.institution_did)
+        self.assertEqual(registered_key, self.institution_public_key)
+        self.assertTrue(self.service.is_did_registered(self.institution_did))
+
+        # The contract rejects a second registration
+        with self.assertRaises(BlockchainError):
+            self.service.register_did(self.institution_did, self.institution_public_key)
+
+    def test_credential_lifecycle(self):
+        credential = self.create_credential()
+
+        tx_hash = self.service.anchor_credential(credential.vc_hash)
+        tx_record = OnChainTransaction.objects.get(tx_hash=tx_hash)
+        self.assertEqual(tx_record.transaction_type, 'CREDENTIAL_ANCHORING')
+        self.assertEqual(tx_record.vc_hash, credential.vc_hash)
+        self.assertTrue(self.service.client.call_contract_function('CredentialAnchor', 'verifyProof', credential.vc_hash))
+        credential.refresh_from_db()
+        self.assertEqual(credential.anchor_transaction, tx_record)
+
+        self.assertFalse(self.service.is_credential_revoked(str(credential.id)))
+        self.service.revoke_credential(str(credential.id))
+        self.assertTrue(self.service.is_credential_revoked(str(credential.id)))
+
+        results = self.service.verify_credential(credential)
+        self.assertTrue(results['anchored'])
+        self.assertFalse(results['not_revoked'])
+
+    def test_trust_registry(self):
+        self.assertFalse(self.service.is_issuer_registered(self.institution_did))
+        self.service.update_issuer_trust_status(self.institution_did, True)
+        self.assertTrue(self.service.is_issuer_registered(self.institution_did))
+
+    def test_batch_writes_and_reads(self):
+        credentials = [self.create_credential(f'Credential {index}') for index in range(5)]
+
+        tx_by_hash = self.service.anchor_credentials([credential.vc_hash for credential in credentials])
+        self.assertEqual(len(set(tx_by_hash.values())), 1)
+        self.service.revoke_credentials([str(credentials[0].id)])
+
+        self.service.client.rpc_calls.clear()
+        status = self.service.get_credentials_chain_status(credentials)
+        # All 15 reads go out as a single simulated Multicall round trip
+        self.assertEqual(sum(self.service.client.rpc_calls.values()), 1)
+        self.assertTrue(all(entry['anchored'] for entry in status.values()))
+        self.assertTrue(status[str(credentials[0].id)]['revoked'])
+        self.assertFalse(status[str(credentials[1].id)]['revoked'])
+
+    def test_chain_status_unknown_when_node_fails(self):
+        credential = self.create_credential()
+        self.service.anchor_credential(credential.vc_hash)
+
+        with mock.patch.object(self.service.client, 'aggregate_calls', side_effect=ChainConnectionError('node down')):
+            status = self.service.get_credentials_chain_status([credential])[str(credential.id)]
+            # Unknown, not "not anchored" or "revoked"
+            self.assertEqual(status, {'anchored': None, 'issuer_trusted': None, 'revoked': None})
+            with self.assertRaises(ChainConnectionError):
+                self.service.verify_credential(credential)
+
+    @override_settings(BLOCKCHAIN_NETWORK='memory')
+    def test_listings_show_chain_status(self):
+        reset_memory_chain()
+        credential = self.create_credential()
+        Credential.objects.filter(pk=credential.pk).update(status='ISSUED')
+        BlockchainService().anchor_credential(credential.vc_hash)
+        wallet = Wallet.objects.create(user=credential.holder)
+        WalletCredential.objects.create(wallet=wallet, credential=credential)
+
+        self.client.force_login(self.institution.user)
+        self.assertContains(self.client.get(reverse('issued_credentials')), 'Anchored')
+        self.client.force_login(credential.holder)
+        self.assertContains(self.client.get(reverse('wallet_home')), 'Anchored')
+
+        with mock.patch.object(InMemoryChainClient, 'aggregate_calls', side_effect=ChainConnectionError('node down')):
+            self.assertContains(self.client.get(reverse('wallet_home')), 'Chain status unknown')
+
+        # A node that is down when the client is built leaves both listings up, with unknown status
+        with mock.patch.object(InMemoryChainClient, '__init__', side_effect=ChainConnectionError('node down')):
+            self.assertContains(self.client.get(reverse('wallet_home')), 'Chain status unknown')
+            self.client.force_login(self.institution.user)
+            self.assertContains(self.client.get(reverse('issued_credentials')), 'Chain status unknown')
+
+    def test_queued_chain_writes_are_unique(self):
+        with mock.patch.object(flush_queued_chain_writes, 'apply_async', side_effect=ConnectionError('broker down')):
+            queue_chain_write('ANCHOR', 'ab' * 32)
+            queue_chain_write('ANCHOR', 'ab' * 32)
+            queue_chain_write('TRUST', self.institution_did, trusted=True)
+            queue_chain_write('TRUST', self.institution_did, trusted=False)
+
+        # Without a broker the items wait for the periodic flush instead of being sent inline
+        self.assertEqual(QueuedChainWrite.objects.filter(operation='ANCHOR', status='QUEUED').count(), 1)
+        self.assertEqual(QueuedChainWrite.objects.filter(operation='TRUST', status='QUEUED').count(), 2)
+        self.assertFalse(OnChainTransaction.objects.exists())
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            QueuedChainWrite.objects.create(operation='ANCHOR', subject='ab' * 32, status='SUBMITTED')
+
+        # A failed write may be queued again
+        QueuedChainWrite.objects.filter(operation='ANCHOR').update(status='FAILED')
+        with mock.patch.object(flush_queued_chain_writes, 'apply_async'):
+            queue_chain_write('ANCHOR', 'ab' * 32)
+        self.assertEqual(QueuedChainWrite.objects.filter(operation='ANCHOR').count(), 2)
+
+    @override_settings(BLOCKCHAIN_NETWORK='memory', BLOCKCHAIN_BATCH_GAS_LIMIT=110000)
+    def test_partial_batch_keeps_sent_chunks(self):
+        reset_memory_chain()
+        vc_hashes = [f'{index:064x}' for index in range(5)]
+        with mock.patch.object(flush_queued_chain_writes, 'apply_async'):
+            for vc_hash in vc_hashes:
+                queue_chain_write('ANCHOR', vc_hash)
+
+        # Two items per chunk; the second chunk fails after the first went out
+        send = InMemoryChainClient.execute_contract_function
+        calls = []
+
+        def flaky_send(client, *args, **kwargs):
+            calls.append(args)
+            if len(calls) == 2:
+                raise ChainConnectionError('node down')
+            return send(client, *args, **kwargs)
+
+        with mock.patch.object(InMemoryChainClient, 'execute_contract_function', flaky_send):
+            self.assertEqual(flush_queued_chain_writes(), 2)
+
+        tx_record = OnChainTransaction.objects.get()
+        submitted = QueuedChainWrite.objects.filter(status='SUBMITTED')
+        self.assertEqual(sorted(item.subject for item in submitted), vc_hashes[:2])
+        self.assertTrue(all(item.transaction_id == tx_record.pk for item in submitted))
+        self.assertEqual(QueuedChainWrite.objects.filter(status='QUEUED').count(), 3)
+
+        # The next flush only sends the items that never went out
+        self.assertEqual(flush_queued_chain_writes(), 3)
+        self.assertEqual(OnChainTransaction.objects.count(), 3)
+
+    def test_v2_registries(self):
+        credential = self.create_credential()
+        v2 = BlockchainService(client=self.service.client, registry_version=2)
+
+        v2.register_did(self.institution_did, 'public-key')
+        v2.update_issuer_trust_status(self.institution_did, True)
+        v2.revoke_credential(str(credential.id))
+
+        self.assertEqual(v2.batch_resolve_dids([self.institution_did]), {self.institution_did: 'public-key'})
+        self.assertTrue(v2.is_issuer_registered(self.institution_did))
+        self.assertTrue(v2.is_credential_revoked(str(credential.id)))
+        # The v1 registries are separate contracts
+        self.assertFalse(self.service.is_did_registered(self.institution_did))
+        self.assertFalse(self.service.is_credential_revoked(str(credential.id)))
+
+    @override_settings(
+        BLOCKCHAIN_NETWORK='memory', DIDREGISTRYV2_ADDRESS='0x1', TRUSTREGISTRYV2_ADDRESS='0x2',
+        REVOCATIONREGISTRYV2_ADDRESS='0x3',
+    )
+    def test_registry_migration_reports_unread_keys(self):
+        reset_memory_chain()
+        BlockchainService().register_did(self.institution_did, 'public-key')
+
+        with mock.patch.object(InMemoryChainClient, 'aggregate_calls', side_effect=ChainConnectionError('node down')):
+            out = StringIO()
+            with self.assertRaises(CommandError):
+                call_command('migrate_registries', '--skip-trust', '--skip-revocations', stdout=out)
+            self.assertIn(self.institution_did, out.getvalue())
+
+        call_command('migrate_registries', '--skip-trust', '--skip-revocations', stdout=StringIO())
+        v2 = BlockchainService(registry_version=2)
+        self.assertEqual(v2.batch_resolve_dids([self.institution_did]), {self.institution_did: 'public-key'})
+
+    def test_backfill_dry_run_counts_legacy_anchors(self):
+        credential = self.create_credential()
+        # Legacy single anchor: the subject is only in metadata
+        tx = OnChainTransaction.objects.create(
+            tx_hash='0x' + 'ef' * 32, transaction_type='CREDENTIAL_ANCHORING', status='CONFIRMED',
+            metadata={'vc_hash': credential.vc_hash},
+        )
+
+        for args in (['--dry-run'], []):
+            out = StringIO()
+            call_command('backfill_transaction_links', *args, stdout=out)
+            self.assertIn('Credentials linked to their anchoring transaction: 1', out.getvalue())
+            credential.refresh_from_db()
+            self.assertEqual(credential.anchor_transaction_id, None if args else tx.pk)
+
+    def test_block_time(self):
+        service = BlockchainService(client=InMemoryChainClient(chain=InMemoryChain(block_time=0.05)))
+        tx_hash = service.anchor_credential('ab' * 32)
+
+        self.assertFalse(service.is_transaction_confirmed(tx_hash))
+        self.assertFalse(service.client.call_contract_function('CredentialAnchor', 'verifyProof', 'ab' * 32))
+
+        time.sleep(0.06)
+        self.assertTrue(service.is_transaction_confirmed(tx_hash))
+        self.assertTrue(service.client.call_contract_function('CredentialAnchor', 'verifyProof', 'ab' * 32))
+
+    def test_call_instrumentation(self):
+        with instrumentation.track_chain_calls() as stats:
+            self.service.is_issuer_registered(self.institution_did)
+            with self.assertRaises(BlockchainError):
+                self.service.register_did('', 'public-key')
+
+        self.assertEqual(stats.count, 2)
+        self.assertEqual(stats.errors, 1)
+        self.assertEqual(
+            [(call['label'], call['error']) for call in stats.calls],
+            [('TrustRegistry.isIssuerTrusted', ''), ('DIDRegistry.registerDID', 'TransactionFailedError')]
+        )
+        self.assertIn(('call', 'TrustRegistry.isIssuerTrusted', ''), instrumentation.snapshot())
+
+        # Transaction lookups are recorded under the RPC method they use
+        tx_hash = self.service.register_did(self.institution_did, self.institution_public_key)
+        with instrumentation.track_chain_calls() as stats:
+            self.service.client.transaction_exists(tx_hash)
+            self.service.is_transaction_confirmed(tx_hash)
+        self.assertEqual(
+            [call['label'] for call in stats.calls], ['eth_getTransactionByHash', 'eth_getTransactionReceipt']
+        )
+        self.assertIn(('receipt', 'eth_getTransactionReceipt', ''), instrumentation.snapshot())
+
+    @override_settings(BLOCKCHAIN_NETWORK='memory', BLOCKCHAIN_SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        reset_memory_chain()
+        response = self.client.post(reverse('verify_credential'), {'credential_hash': 'ab' * 32})
+        self.assertEqual(response.wsgi_request.chain_calls.count, 1)
+        self.assertIn('chain;dur=', response['Server-Timing'])
+
+    @override_settings(METRICS_TOKEN='', DEBUG=False)
+    def test_metrics_require_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        with self.settings(METRICS_TOKEN='secret'):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_serve_refreshed_backlog(self):
+        self.service.anchor_credential('ab' * 32)
+        with mock.patch('blockchain.metrics.celery_queue_depth', return_value={'housekeeping': 3}):
+            refresh_chain_state_metrics()
+
+        # A scrape reads the snapshot row only: no backlog queries, no broker connection
+        with self.assertNumQueries(1), mock.patch('blockchain.metrics.celery_queue_depth') as depth:
+            response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        depth.assert_not_called()
+        self.assertContains(response, 'authenticred_pending_transactions{type="CREDENTIAL_ANCHORING"} 1.0')
+        self.assertContains(response, 'authenticred_celery_queue_depth{queue="housekeeping"} 3.0')
+
+    @override_settings(BLOCKCHAIN_NETWORK='memory', BLOCKCHAIN_BATCH_WRITES=False, TASK_OUTBOX_RELAY_THREAD=False)
+    def test_task_outbox_publishes_after_commit(self):
+        reset_memory_chain()
+        app.conf.task_always_eager = True
+        self.addCleanup(setattr, app.conf, 'task_always_eager', False)
+        vc_hash = 'cd' * 32
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            with transaction.atomic():
+                first = execute_task_with_fallback(
+                    anchor_credential_task, vc_hash, idempotency_key=f"anchor_credential:{vc_hash}"
+                )
+                second = execute_task_with_fallback(
+                    anchor_credential_task, vc_hash, idempotency_key=f"anchor_credential:{vc_hash}"
+                )
+
+        # Nothing runs before commit, and the second dispatch reuses the first entry
+        self.assertEqual(first['method'], 'outbox')
+        self.assertEqual(first['task_id'], second['task_id'])
+        self.assertEqual(TaskOutbox.objects.count(), 1)
+        self.assertEqual(len(callbacks), 1)
+        self.assertFalse(OnChainTransaction.objects.exists())
+
+        callbacks[0]()
+        self.assertEqual(TaskOutbox.objects.get().status, 'DISPATCHED')
+        self.assertEqual(OnChainTransaction.objects.filter(vc_hash=vc_hash).count(), 1)
+
+        # Once dispatched, the key no longer suppresses a new dispatch
+        with self.captureOnCommitCallbacks(execute=True):
+            third = execute_task_with_fallback(
+                anchor_credential_task, vc_hash, idempotency_key=f"anchor_credential:{vc_hash}"
+            )
+        self.assertNotEqual(third['task_id'], first['task_id'])
+        self.assertEqual(list(TaskOutbox.objects.values_list('status', flat=True)), ['DISPATCHED', 'DISPATCHED'])
+
+    @override_settings(TASK_OUTBOX_RELAY_THREAD=False)
+    def test_outbox_relay_publishes_claimed_entries(self):
+        entries = [outbox.enqueue('blockchain.tasks.relay_task_outbox') for _ in range(3)]
+        statuses = []
+
+        def publish(task_name, args=None, kwargs=None, task_id=None):
+            # Claims are committed before publishing, so no row lock is held meanwhile
+            statuses.append(TaskOutbox.objects.get(task_id=task_id).status)
+            if len(statuses) == 2:
+                raise ConnectionError('broker down')
+
+        with mock.patch.object(outbox, 'publish', side_effect=publish):
+            self.assertEqual(outbox.relay_outbox(), 1)
+        self.assertEqual(statuses, ['PUBLISHING', 'PUBLISHING'])
+        self.assertEqual(
+            [TaskOutbox.objects.get(pk=entry.pk).status for entry in entries], ['DISPATCHED', 'PENDING', 'PENDING']
+        )
+        self.assertEqual(TaskOutbox.objects.get(pk=entries[1].pk).last_error, 'broker down')
+        outbox.mark_broker_up()
+
+    @override_settings(BLOCKCHAIN_NETWORK='memory', BLOCKCHAIN_BATCH_WRITES=False)
+    def test_chain_operations_are_deduplicated(self):
+        chain = reset_memory_chain()
+        credential = self.create_credential()
+
+        tx_hash = anchor_credential_task.apply(args=[credential.vc_hash]).get()
+        # Redelivery and re-issue reuse the operation instead of sending again
+        self.assertEqual(anchor_credential_task.apply(args=[credential.vc_hash]).get(), tx_hash)
+        self.assertEqual(chain.rpc_calls['eth_sendTransaction'], 1)
+
+        # A write that is already on chain is recorded without a transaction
+        BlockchainService().revoke_credential(str(credential.id))
+        self.assertIsNone(revoke_credential_task.apply(args=[str(credential.id)]).get())
+        self.assertEqual(
+            dict(ChainOperation.objects.values_list('operation', 'status')),
+            {'ANCHOR': 'SENT', 'REVOKE': 'ON_CHAIN'}
+        )
+
+    def test_send_timeout_after_broadcast_is_not_resent(self):
+        credential = self.create_credential()
+        vc_hash = credential.vc_hash
+
+        def find_sent(tx_hash):
+            return self.service.recover_transaction(tx_hash, 'CREDENTIAL_ANCHORING', vc_hash=vc_hash)
+
+        def broadcast_then_time_out(on_signed):
+            self.service.anchor_credential(vc_hash, on_signed=on_signed)
+            raise ChainConnectionError('Read timed out')
+
+        # Keep the transaction pending, so chain state alone cannot tell it was sent
+        self.chain.block_time = 3600
+        with self.assertRaises(ChainConnectionError):
+            run_chain_operation('ANCHOR', vc_hash, lambda: False, broadcast_then_time_out, find_sent)
+        op = ChainOperation.objects.get(subject=vc_hash)
+        self.assertEqual(op.status, 'UNKNOWN')
+
+        tx_hash = run_chain_operation('ANCHOR', vc_hash, lambda: False, self.fail, find_sent)
+        self.assertEqual(tx_hash, op.tx_hash)
+        self.assertEqual(self.chain.rpc_calls['eth_sendTransaction'], 1)
+        op.refresh_from_db()
+        self.assertEqual((op.status, op.transaction.tx_hash), ('SENT', tx_hash))
+
+    def test_signed_send_that_never_arrived_is_resent(self):
+        credential = self.create_credential()
+        vc_hash = credential.vc_hash
+
+        def sign_then_fail(on_signed):
+            on_signed('0x' + 'ab' * 32)
+            raise ChainConnectionError('Connection reset')
+
+        with self.assertRaises(ChainConnectionError):
+            run_chain_operation('ANCHOR', vc_hash, lambda: False, sign_then_fail)
+        tx_hash = run_chain_operation(
+            'ANCHOR', vc_hash, lambda: False,
+            lambda on_signed: self.service.anchor_credential(vc_hash, on_signed=on_signed),
+            lambda tx_hash: self.service.recover_transaction(tx_hash, 'CREDENTIAL_ANCHORING', vc_hash=vc_hash),
+        )
+        self.assertEqual(ChainOperation.objects.get(subject=vc_hash).status, 'SENT')
+        self.assertTrue(self.service.is_credential_anchored(vc_hash))
+        self.assertIsNotNone(tx_hash)
+
+        # A duplicate arriving while another worker holds the claim retries after the lease
+        ChainOperation.objects.create(operation='REVOKE', subject=str(credential.id), status='SENDING')
+        with self.assertRaises(OperationInProgress) as raised:
+            run_chain_operation('REVOKE', str(credential.id), lambda: False, self.fail)
+        self.assertGreater(raised.exception.retry_after, 0)
+
+    def test_transaction_archival(self):
+        credential = self.create_credential()
+        tx_hash = self.service.anchor_credential(credential.vc_hash)
+        OnChainTransaction.objects.filter(tx_hash=tx_hash).update(
+            status='CONFIRMED', updated_at=timezone.now() - timedelta(days=100)
+        )
+        pending_hash = self.service.register_did(self.institution_did, self.institution_public_key)
+
+        self.assertEqual(archive.archive_transactions(days=90, batch_size=1), 1)
+        self.assertFalse(OnChainTransaction.objects.filter(tx_hash=tx_hash).exists())
+
+        # Lookups and links fall back to the archive
+        credential.refresh_from_db()
+        archived = archive.get_transaction(pk=credential.anchor_transaction_id)
+        self.assertIsInstance(archived, ArchivedTransaction)
+        self.assertEqual(archived.tx_hash, tx_hash)
+        self.assertEqual(archive.get_transaction(tx_hash=pending_hash).status, 'PENDING')
+        self.assertEqual(
+            [tx.tx_hash for tx in archive.recent_transactions(5, transaction_type='CREDENTIAL_ANCHORING')],
+            [tx_hash]
+        )
+
+    def test_archived_transaction_references(self):
+        credential = self.create_credential()
+        anchor_hash = self.service.anchor_credential(credential.vc_hash)
+        did_hash = self.service.register_did(self.institution_did, self.institution_public_key)
+        registration = DIDRegistration.objects.create(
+            did=self.institution_did, public_key=self.institution_public_key, institution=self.institution,
+            transaction=OnChainTransaction.objects.get(tx_hash=did_hash), trust_updated=True,
+        )
+        OnChainTransaction.objects.update(status='CONFIRMED', updated_at=timezone.now() - timedelta(days=100))
+
+        self.assertEqual(archive.archive_transactions(days=90), 2)
+        self.assertFalse(OnChainTransaction.objects.exists())
+
+        # Plain and select_related accessors both fall back to the archive
+        credential = Credential.objects.get(pk=credential.pk)
+        self.assertIsInstance(credential.anchor_transaction, ArchivedTransaction)
+        self.assertEqual(credential.anchor_transaction.tx_hash, anchor_hash)
+        registration = DIDRegistration.objects.select_related('transaction').get(pk=registration.pk)
+        self.assertIsInstance(registration.transaction, ArchivedTransaction)
+
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        for url in (
+            reverse('admin:credentials_credential_change', args=[credential.pk]),
+            reverse('admin:blockchain_didregistration_change', args=[registration.pk]),
+            reverse('admin:blockchain_didregistration_changelist'),
+        ):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertContains(response, 'archived')
+
+        # Saving the registration keeps its link
+        response = self.client.post(
+            reverse('admin:blockchain_didregistration_change', args=[registration.pk]),
+            {'institution': self.institution.pk, 'public_key': registration.public_key, 'trust_updated': 'on'},
+        )
+        self.assertEqual(response.status_code, 302)
+        linked = registration.transaction_id
+        registration.refresh_from_db()
+        self.assertEqual(registration.transaction_id, linked)
+
+        self.client.force_login(credential.issuer)
+        response = self.client.get(reverse('credential_detail', args=[credential.pk]))
+        self.assertEqual(response.status_code, 200)
+
+    def test_pending_trust_update_keeps_transaction_hot(self):
+        did_hash = self.service.register_did(self.institution_did, self.institution_public_key)
+        DIDRegistration.objects.create(
+            did=self.institution_did, public_key=self.institution_public_key, institution=self.institution,
+            transaction=OnChainTransaction.objects.get(tx_hash=did_hash),
+        )
+        OnChainTransaction.objects.update(status='CONFIRMED', updated_at=timezone.now() - timedelta(days=100))
+
+        self.assertEqual(archive.archive_transactions(days=90), 0)
+        self.assertTrue(DIDRegistration.objects.filter(transaction__status='CONFIRMED', trust_updated=False).exists())
+
+
+class BenchmarkCommandTestCase(SimpleTestCase):
+    # The command creates and destroys its own test database
+    databases = {'default'}
+
+    def test_benchmark_reports_every_scenario(self):
+        stdout, stderr = StringIO(), StringIO()
+        # The test runner has already set up the test environment
+        with mock.patch('blockchain.management.commands.benchmark.setup_test_environment'), \
+                mock.patch('blockchain.management.commands.benchmark.teardown_test_environment'):
+            call_command(
+                'benchmark', iterations=2, warmup=1, wallet_size=3, merkle_leaves=8, stdout=stdout, stderr=stderr
+            )
+
+        report = json.loads(stdout.getvalue())
+        self.assertEqual(report['meta']['iterations'], 2)
+        self.assertEqual(
+            set(report['scenarios']),
+            {'issuance', 'verification_internal', 'verification_external', 'wallet_listing', 'pdf_download',
+             'merkle', 'revocation'}
+        )
+        for name, summary in report['scenarios'].items():
+            self.assertEqual(summary['iterations'], 2, name)
+            self.assertGreater(summary['p50_ms'], 0, name)
+        # Verifying an anchored credential reads the chain; a Merkle root touches neither the chain nor the database
+        self.assertGreater(report['scenarios']['verification_internal']['rpc_calls_per_request'], 0)
+        self.assertEqual(report['scenarios']['merkle']['queries_per_request'], 0)
+        self.assertEqual(report['scenarios']['merkle']['rpc_calls_per_request'], 0)
+
+    def test_benchmark_rejects_zero_iterations(self):
+        with self.assertRaisesMessage(CommandError, '--iterations must be at least 1'):
+            call_command('benchmark', iterations=0)
+
+
+class CeleryRoutingTestCase(SimpleTestCase):
+    def route(self, name):
+        return app.amqp.router.route({}, name)['queue'].name
+
+    def test_tasks_are_routed_to_their_queues(self):
+        app.loader.import_default_modules()
+        expected = {
+            'blockchain.tasks.register_did_task': 'chain_writes',
+            'blockchain.tasks.anchor_credential_task': 'chain_writes',
+            'blockchain.tasks.revoke_credential_task': 'chain_writes',
+            'blockchain.tasks.flush_queued_chain_writes': 'chain_writes',
+            'blockchain.tasks.monitor_transactions': 'confirmations',
+            'blockchain.tasks.bump_stuck_transactions': 'confirmations',
+            'blockchain.tasks.process_did_registration_confirmation': 'confirmations',
+            'blockchain.tasks.relay_task_outbox': 'housekeeping',
+            'blockchain.tasks.archive_settled_transactions': 'housekeeping',
+            'blockchain.tasks.refresh_chain_state_metrics': 'housekeeping',
+            'users.tasks.refresh_admin_snapshot': 'housekeeping',
+        }
+        for name, queue in expected.items():
+            # A misspelled route or task name would leave the task on the default queue
+            self.assertIn(name, app.tasks)
+            self.assertEqual(self.route(name), queue, name)
+            self.assertTrue(app.tasks[name].acks_late, name)
+        for entry in app.conf.beat_schedule.values():
+            self.assertIn(entry['task'], expected)
+
+    def test_late_acks_and_single_prefetch(self):
+        self.assertTrue(app.conf.task_acks_late)
+        self.assertTrue(app.conf.task_reject_on_worker_lost)
+        self.assertEqual(app.conf.worker_prefetch_multiplier, 1)
+
+
+class FakeNode:
+    """Stand-in JSON-RPC provider that answers, or fails with a transport error"""
+
+    def __init__(self, name):
+        self.name = name
+        self.down = False
+        self.calls = []
+
+    def make_request(self, method, params):
+        self.calls.append(method)
+        if self.down:
+            raise ConnectionError(f"{self.name} is down")
+        return {'jsonrpc': '2.0', 'id': 1, 'result': self.name}
+
+
+@override_settings(
+    BLOCKCHAIN_RPC_FAILURE_THRESHOLD=2, BLOCKCHAIN_RPC_COOLDOWN=30, BLOCKCHAIN_RPC_HEDGE_DELAY=5,
+)
+class FailoverProviderTestCase(SimpleTestCase):
+    def setUp(self):
+        self.primary, self.secondary = FakeNode('primary'), FakeNode('secondary')
+        self.provider = FailoverProvider([('http://primary', self.primary), ('http://secondary', self.secondary)])
+        self.endpoint, self.backup = self.provider.endpoints
+
+    def read(self):
+        return self.provider.make_request('eth_call', [])['result']
+
+    def send(self):
+        return self.provider.make_request('eth_sendRawTransaction', ['0x00'])['result']
+
+    def expire_cooldown(self, endpoint):
+        endpoint.opened_at -= 31
+
+    def test_failing_endpoint_is_ejected_and_reads_fail_over(self):
+        self.endpoint.latency, self.backup.latency = 0.01, 0.05
+        self.primary.down = True
+        self.assertEqual(self.read(), 'secondary')
+        self.assertEqual(self.read(), 'secondary')
+        self.assertEqual(self.endpoint.state, RPCEndpoint.OPEN)
+
+        # While ejected the node is not asked, even though its latency is better
+        self.primary.calls.clear()
+        self.assertEqual(self.read(), 'secondary')
+        self.assertEqual(self.primary.calls, [])
+
+    def test_probe_readmits_or_reopens_endpoint(self):
+        self.endpoint.latency, self.backup.latency = 0.01, 0.05
+        self.primary.down = True
+        self.read()
+        self.read()
+
+        # After the cooldown the next read probes the ejected node; a failed probe reopens it
+        self.expire_cooldown(self.endpoint)
+        self.primary.calls.clear()
+        self.assertEqual(self.read(), 'secondary')
+        self.assertEqual(self.primary.calls, ['eth_call'])
+        self.assertEqual(self.endpoint.state, RPCEndpoint.OPEN)
+
+        self.primary.down = False
+        self.expire_cooldown(self.endpoint)
+        self.assertEqual(self.read(), 'primary')
+        self.assertEqual(self.endpoint.state, RPCEndpoint.CLOSED)
+
+    def test_writes_stay_on_primary(self):
+        self.endpoint.latency, self.backup.latency = 0.5, 0.01
+        self.assertEqual(self.send(), 'primary')
+        self.assertEqual(self.secondary.calls, [])
+
+        self.primary.down = True
+        for _ in range(2):
+            with self.assertRaises(ConnectionError):
+                self.send()
+        with self.assertRaisesMessage(Exception, 'is unavailable'):
+            self.send()
+        self.assertEqual(self.secondary.calls, [])
+
+        # Ranking candidates does not claim the probe of an endpoint that is not asked
+        self.expire_cooldown(self.endpoint)
+        self.provider._read_candidates()
+        self.assertEqual(self.endpoint.state, RPCEndpoint.OPEN)
+        self.primary.down = False
+        self.assertEqual(self.send(), 'primary')
+        self.assertEqual(self.endpoint.state, RPCEndpoint.CLOSED)
+
+    def test_transaction_lookups_stay_on_primary(self):
+        # A lagging secondary does not know the transaction the primary just accepted
+        self.endpoint.latency, self.backup.latency = 0.5, 0.01
+        self.secondary.make_request = lambda method, params: {'jsonrpc': '2.0', 'id': 1, 'result': None}
+        for method in ('eth_getTransactionByHash', 'eth_getTransactionReceipt'):
+            self.assertEqual(self.provider.make_request(method, ['0xabc'])['result'], 'primary')
+        self.assertEqual(self.primary.calls, ['eth_getTransactionByHash', 'eth_getTransactionReceipt'])
+
+    def test_unanswered_probe_allows_another_after_cooldown(self):
+        self.endpoint.state, self.endpoint.opened_at = RPCEndpoint.OPEN, time.monotonic() - 31
+        self.assertTrue(self.endpoint.acquire())
+        self.assertEqual(self.endpoint.state, RPCEndpoint.HALF_OPEN)
+        # The probe is in flight: no second probe until another cooldown
+        self.assertFalse(self.endpoint.acquire())
+        self.expire_cooldown(self.endpoint)
+        self.assertTrue(self.endpoint.acquire())
+
+
+def gwei(value):
+    return int(value * 10 ** 9)
+
+
+class FakeEth:
+    """Stand-in for w3.eth with fixed fee data; counts feeHistory calls"""
+
+    def __init__(self, base_fees, rewards, gas_price):
+        self.base_fees = base_fees
+        self.rewards = rewards
+        self.gas_price = gas_price
+        self.fee_history_calls = 0
+
+    def fee_history(self, block_count, newest_block, reward_percentiles):
+        self.fee_history_calls += 1
+        return {'baseFeePerGas': self.base_fees, 'reward': [[reward] for reward in self.rewards]}
+
+
+class FakeW3:
+    to_wei = staticmethod(Web3.to_wei)
+    from_wei = staticmethod(Web3.from_wei)
+
+    def __init__(self, eth):
+        self.eth = eth
+
+
+class FakeContractFunction:
+    address = '0x0000000000000000000000000000000000000001'
+    signature = 'storeProofs(bytes32[])'
+
+    def __init__(self, args, estimate):
+        self.args = args
+        self.estimate = estimate
+        self.estimates = 0
+
+    def estimate_gas(self, transaction):
+        self.estimates += 1
+        return self.estimate
+
+
+@override_settings(
+    BLOCKCHAIN_FEE_CACHE_TTL=10, BLOCKCHAIN_GAS_CACHE_TTL=300, BLOCKCHAIN_GAS_MARGIN=0.2,
+    BLOCKCHAIN_MIN_PRIORITY_FEE_GWEI=1, BLOCKCHAIN_MAX_FEE_GWEI=500, BLOCKCHAIN_FEE_BUMP_PERCENT=15,
+)
+class FeeStrategyTestCase(SimpleTestCase):
+    def setUp(self):
+        fees.clear_caches()
+        self.addCleanup(fees.clear_caches)
+        self.eth = FakeEth(base_fees=[gwei(8), gwei(10)], rewards=[gwei(1), gwei(3), gwei(2)], gas_price=gwei(5))
+        self.strategy = fees.FeeStrategy(FakeW3(self.eth), chain_id=1337)
+
+    def test_eip1559_fees_from_fee_history(self):
+        # Median reward as the tip, twice the next base fee plus the tip as the cap
+        self.assertEqual(self.strategy.fee_params(), {'maxFeePerGas': gwei(22), 'maxPriorityFeePerGas': gwei(2)})
+
+        # Tips below BLOCKCHAIN_MIN_PRIORITY_FEE_GWEI are raised to it
+        fees.clear_caches()
+        self.eth.rewards = [0, 0, 0]
+        self.assertEqual(self.strategy.fee_params(), {'maxFeePerGas': gwei(21), 'maxPriorityFeePerGas': gwei(1)})
+
+        # Capped at BLOCKCHAIN_MAX_FEE_GWEI
+        fees.clear_caches()
+        with self.settings(BLOCKCHAIN_MAX_FEE_GWEI=15):
+            self.assertEqual(self.strategy.fee_params()['maxFeePerGas'], gwei(15))
+
+    def test_legacy_gas_price_without_base_fee(self):
+        self.eth.base_fees = [0, 0]
+        self.assertEqual(self.strategy.fee_params(), {'gasPrice': gwei(5)})
+
+        fees.clear_caches()
+        self.eth.fee_history = mock.Mock(side_effect=ValueError('eth_feeHistory not supported'))
+        self.assertEqual(self.strategy.fee_params(), {'gasPrice': gwei(5)})
+
+    def test_fees_are_cached_per_chain(self):
+        with mock.patch.object(fees.time, 'monotonic', return_value=1000):
+            self.strategy.fee_params()
+            self.strategy.fee_params()
+        self.assertEqual(self.eth.fee_history_calls, 1)
+
+        # Another chain has its own entry, and the entry expires after BLOCKCHAIN_FEE_CACHE_TTL
+        with mock.patch.object(fees.time, 'monotonic', return_value=1000):
+            fees.FeeStrategy(FakeW3(self.eth), chain_id=137).fee_params()
+        self.assertEqual(self.eth.fee_history_calls, 2)
+        with mock.patch.object(fees.time, 'monotonic', return_value=1011):
+            self.strategy.fee_params()
+        self.assertEqual(self.eth.fee_history_calls, 3)
+
+    def test_gas_estimates_are_cached_per_shape(self):
+        function = FakeContractFunction([b'\x00' * 32] * 3, estimate=100000)
+        self.assertEqual(self.strategy.estimate_gas(function, '0xsender'), 120000)
+        self.assertEqual(self.strategy.estimate_gas(FakeContractFunction([b'\x01' * 32] * 3, 1), '0xsender'), 120000)
+        other_shape = FakeContractFunction([b'\x00' * 32] * 4, estimate=130000)
+        self.assertEqual(self.strategy.estimate_gas(other_shape, '0xsender'), 156000)
+        self.assertEqual(function.estimates, 1)
+
+    def test_replacement_bumps_old_fees(self):
+        # Old fees above the market are bumped by BLOCKCHAIN_FEE_BUMP_PERCENT
+        params = self.strategy.replacement_params({'maxFeePerGas': gwei(40), 'maxPriorityFeePerGas': gwei(4)})
+        self.assertEqual(params, {'maxFeePerGas': gwei(46) + 1, 'maxPriorityFeePerGas': gwei(4.6) + 1})
+
+        # Old fees below the market move up to the market
+        params = self.strategy.replacement_params({'maxFeePerGas': gwei(10), 'maxPriorityFeePerGas': gwei(1)})
+        self.assertEqual(params, {'maxFeePerGas': gwei(22), 'maxPriorityFeePerGas': gwei(2)})
+
+        params = self.strategy.replacement_params({'gasPrice': gwei(20)})
+        self.assertEqual(params, {'gasPrice': gwei(23) + 1})
+
+    def test_replacement_skipped_when_cap_leaves_no_room(self):
+        with self.settings(BLOCKCHAIN_MAX_FEE_GWEI=45):
+            self.assertIsNone(self.strategy.replacement_params({'maxFeePerGas': gwei(40), 'maxPriorityFeePerGas': gwei(4)}))
+            self.assertIsNone(self.strategy.replacement_params({'gasPrice': gwei(40)}))
+            # Room for the bump below the cap
+            self.assertEqual(self.strategy.replacement_params({'gasPrice': gwei(30)}), {'gasPrice': gwei(34.5) + 1})
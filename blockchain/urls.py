@@ -1,5 +1,8 @@
 # blockchain/urls.py
 from django.urls import path
+from . import views
 
-# The blockchain app doesn't have any web views - it only provides background tasks and services
-urlpatterns = []
+# The blockchain app only exposes operational endpoints; everything else is background tasks and services
+urlpatterns = [
+    path('metrics', views.metrics_view, name='metrics'),
+]
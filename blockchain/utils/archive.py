@@ -0,0 +1,103 @@
+# blockchain/utils/archive.py
+# Moves settled transactions out of OnChainTransaction and reads across both tables
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Columns copied verbatim from OnChainTransaction to ArchivedTransaction
+ARCHIVED_FIELDS = (
+    'id', 'tx_hash', 'status', 'transaction_type', 'metadata', 'did', 'vc_hash',
+    'credential_id', 'block_number', 'created_at', 'updated_at',
+)
+
+
+def archivable_transactions(days=None):
+    """
+    Confirmed or failed transactions not updated for `days` (BLOCKCHAIN_ARCHIVE_AFTER_DAYS).
+
+    DID registrations still waiting for their trust update keep their
+    transaction hot, since process_did_registration_confirmation joins on it.
+    """
+    from ..models import OnChainTransaction
+
+    days = settings.BLOCKCHAIN_ARCHIVE_AFTER_DAYS if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    return OnChainTransaction.objects.filter(
+        status__in=['CONFIRMED', 'FAILED'], updated_at__lt=cutoff
+    ).exclude(did_registrations__trust_updated=False)
+
+
+def archive_transactions(days=None, batch_size=None, max_batches=None):
+    """
+    Move settled transactions to ArchivedTransaction in batches.
+
+    Each batch is copied and deleted in its own transaction, so the hot table is
+    never locked for long and an interrupted run loses nothing. Rows are copied
+    with their primary key; references to them stay valid through the read
+    functions below.
+
+    Returns:
+        int: number of transactions archived
+    """
+    from ..models import ArchivedTransaction, OnChainTransaction
+
+    batch_size = batch_size or settings.BLOCKCHAIN_ARCHIVE_BATCH_SIZE
+    candidates = archivable_transactions(days)
+    archived = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            rows = list(
+                candidates.select_for_update(skip_locked=True)
+                .order_by('pk')
+                .values(*ARCHIVED_FIELDS)[:batch_size]
+            )
+            if not rows:
+                break
+            ArchivedTransaction.objects.bulk_create(
+                [ArchivedTransaction(**row) for row in rows],
+                ignore_conflicts=True
+            )
+            OnChainTransaction.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+        archived += len(rows)
+        batches += 1
+        logger.info(f"Archived {len(rows)} transactions ({archived} so far)")
+    return archived
+
+
+def get_transaction(tx_hash=None, pk=None):
+    """
+    Look up a transaction by hash or primary key in the hot table, then the archive.
+
+    Returns:
+        OnChainTransaction, ArchivedTransaction or None
+    """
+    from ..models import ArchivedTransaction, OnChainTransaction
+
+    if not tx_hash and pk is None:
+        return None
+    lookup = {'tx_hash': tx_hash} if tx_hash else {'pk': pk}
+    return (
+        OnChainTransaction.objects.filter(**lookup).first()
+        or ArchivedTransaction.objects.filter(**lookup).first()
+    )
+
+
+def recent_transactions(limit, **filters):
+    """
+    Newest transactions matching `filters` across both tables.
+
+    The hot table is queried first; the archive is only read when it has fewer
+    than `limit` matches.
+    """
+    from ..models import ArchivedTransaction, OnChainTransaction
+
+    rows = list(OnChainTransaction.objects.filter(**filters).order_by('-created_at')[:limit])
+    if len(rows) < limit:
+        rows += list(ArchivedTransaction.objects.filter(**filters).order_by('-created_at')[:limit - len(rows)])
+        rows.sort(key=lambda tx: tx.created_at, reverse=True)
+    return rows
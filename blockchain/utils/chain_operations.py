@@ -0,0 +1,122 @@
+# blockchain/utils/chain_operations.py
+# Send each anchoring or revocation at most once, however often its task runs
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+from .archive import get_transaction
+
+logger = logging.getLogger(__name__)
+
+
+def run_chain_operation(operation, subject, is_on_chain, send, find_sent=None):
+    """
+    Send a chain write once per (operation, subject).
+
+    The ChainOperation row is claimed first, so concurrent duplicates collapse into
+    the one in-flight send. A claimed operation checks chain state before sending
+    and is marked ON_CHAIN instead if the write is already there.
+
+    The hash of the signed transaction is stored before it is broadcast. If the send
+    raises after signing (e.g. an RPC timeout), the operation is marked UNKNOWN and
+    the next attempt asks `find_sent` whether that transaction reached the node
+    before sending again. Failed and UNKNOWN operations, operations whose
+    transaction failed, and SENDING claims older than BLOCKCHAIN_OPERATION_LEASE_SECONDS
+    (worker died mid-send) can be claimed again.
+
+    Args:
+        operation: 'ANCHOR' or 'REVOKE'
+        subject: vc_hash or credential ID
+        is_on_chain: callable returning True if the write is already on chain
+        send: callable taking an `on_signed(tx_hash)` callback, sending the
+            transaction and returning its hash
+        find_sent: callable taking a signed transaction hash and returning it if the
+            node has that transaction (recording it), else None
+
+    Returns:
+        str or None: hash of the transaction for this operation (sent now or earlier),
+        or None if it was already on chain
+
+    Raises:
+        OperationInProgress: another worker claimed the operation less than a lease ago
+    """
+    from ..exceptions import OperationInProgress
+    from ..models import ChainOperation
+
+    op, created = ChainOperation.objects.get_or_create(
+        operation=operation, subject=subject, defaults={'attempts': 1}
+    )
+    if not created:
+        previous_status = op.status
+        now = timezone.now()
+        lease_expired = now - timedelta(seconds=settings.BLOCKCHAIN_OPERATION_LEASE_SECONDS)
+        claimed = ChainOperation.objects.filter(pk=op.pk).filter(
+            Q(status__in=['FAILED', 'UNKNOWN'])
+            | Q(status='SENDING', updated_at__lt=lease_expired)
+            | Q(status='SENT', transaction__status='FAILED')
+        ).update(status='SENDING', attempts=F('attempts') + 1, updated_at=now)
+        op.refresh_from_db()
+        if not claimed:
+            if op.status == 'SENDING':
+                # Redelivered or concurrent task: retry once the claim has finished or expired
+                retry_after = (op.updated_at - lease_expired).total_seconds() + 1
+                raise OperationInProgress(f"{operation} for {subject} is being sent by another worker", retry_after)
+            sent = get_transaction(pk=op.transaction_id) if op.transaction_id else None
+            tx_hash = sent.tx_hash if sent else None
+            logger.info(f"Skipping duplicate {operation} for {subject}: {op.get_status_display()} {tx_hash or ''}")
+            return tx_hash
+
+        # (a SENT operation is only reclaimed when its transaction failed)
+        if op.tx_hash and find_sent and previous_status != 'SENT':
+            # An earlier send was signed but its outcome is unknown; never send twice
+            try:
+                found = find_sent(op.tx_hash)
+            except Exception as e:
+                ChainOperation.objects.filter(pk=op.pk).update(
+                    status='UNKNOWN', last_error=str(e), updated_at=timezone.now()
+                )
+                raise
+            if found:
+                logger.info(f"{operation} for {subject} was already sent as {found}")
+                return _mark_sent(op, found)
+
+    try:
+        on_chain = is_on_chain()
+    except Exception as e:
+        # A failed read must not block the write; the contract rejects real duplicates
+        logger.warning(f"Could not check chain state for {operation} {subject}: {str(e)}")
+        on_chain = False
+    if on_chain:
+        ChainOperation.objects.filter(pk=op.pk).update(status='ON_CHAIN', last_error='', updated_at=timezone.now())
+        logger.info(f"{operation} for {subject} is already on chain, not sending")
+        return None
+
+    signed = []
+
+    def on_signed(tx_hash):
+        signed.append(tx_hash)
+        ChainOperation.objects.filter(pk=op.pk).update(tx_hash=tx_hash, updated_at=timezone.now())
+
+    try:
+        tx_hash = send(on_signed)
+    except Exception as e:
+        # Once signed, the transaction may have reached the node despite the error
+        status = 'UNKNOWN' if signed else 'FAILED'
+        ChainOperation.objects.filter(pk=op.pk).update(status=status, last_error=str(e), updated_at=timezone.now())
+        raise
+
+    return _mark_sent(op, tx_hash)
+
+
+def _mark_sent(op, tx_hash):
+    from ..models import ChainOperation, OnChainTransaction
+
+    ChainOperation.objects.filter(pk=op.pk).update(
+        status='SENT',
+        last_error='',
+        tx_hash=tx_hash,
+        transaction=OnChainTransaction.objects.filter(tx_hash=tx_hash).first(),
+        updated_at=timezone.now()
+    )
+    return tx_hash
@@ -0,0 +1,190 @@
+# blockchain/utils/fees.py
+import logging
+import threading
+import time
+from django.conf import settings
+from ..exceptions import BlockchainError
+
+logger = logging.getLogger(__name__)
+
+# Gas estimates shared by every client in the process, keyed by
+# (chain_id, contract address, function signature, argument shape)
+_gas_cache = {}
+_gas_cache_lock = threading.Lock()
+
+# Latest fee fields per chain_id, as (params, fetched_at)
+_fee_cache = {}
+
+
+def argument_shape(args):
+    """
+    Describe the parts of the arguments that change gas usage.
+
+    Array lengths and the number of 32-byte words in strings/bytes drive the cost
+    of the registry functions, so calls with the same shape share a gas estimate.
+    """
+    shape = []
+    for arg in args:
+        if isinstance(arg, (list, tuple)):
+            shape.append(('array', len(arg)))
+        elif isinstance(arg, (str, bytes)):
+            shape.append(('words', (len(arg) + 31) // 32))
+        else:
+            shape.append(None)
+    return tuple(shape)
+
+
+def clear_caches():
+    """Drop all cached gas estimates and fees (e.g. after redeploying contracts)"""
+    with _gas_cache_lock:
+        _gas_cache.clear()
+    _fee_cache.clear()
+
+
+class FeeStrategy:
+    """
+    Gas limit and fee selection for contract transactions.
+
+    - Gas limits come from eth_estimateGas plus BLOCKCHAIN_GAS_MARGIN, cached per
+      function signature and argument shape for BLOCKCHAIN_GAS_CACHE_TTL seconds.
+    - Fees use EIP-1559 (maxFeePerGas / maxPriorityFeePerGas derived from
+      eth_feeHistory) when the chain reports a base fee, and eth_gasPrice otherwise.
+    - Stuck transactions are replaced with the same nonce and bumped fees.
+    """
+
+    def __init__(self, w3, chain_id):
+        self.w3 = w3
+        self.chain_id = chain_id
+
+    def estimate_gas(self, contract_function, sender_address):
+        """
+        Estimate the gas limit for a contract call, including the safety margin.
+
+        Raises:
+            BlockchainError: if the node rejects the estimate (usually a revert)
+        """
+        key = (
+            self.chain_id,
+            contract_function.address,
+            contract_function.signature,
+            argument_shape(contract_function.args),
+        )
+        now = time.monotonic()
+        with _gas_cache_lock:
+            cached = _gas_cache.get(key)
+        if cached and now - cached[1] < settings.BLOCKCHAIN_GAS_CACHE_TTL:
+            return cached[0]
+
+        try:
+            estimate = contract_function.estimate_gas({'from': sender_address})
+        except Exception as e:
+            raise BlockchainError(f"Gas estimation failed for {contract_function.signature}: {str(e)}") from e
+
+        gas = min(int(estimate * (1 + settings.BLOCKCHAIN_GAS_MARGIN)), settings.BLOCKCHAIN_MAX_GAS)
+        with _gas_cache_lock:
+            # Keep the highest estimate seen so a cheap first call (e.g. overwriting
+            # existing storage) does not under-provision later ones
+            if cached and now - cached[1] < settings.BLOCKCHAIN_GAS_CACHE_TTL:
+                gas = max(gas, cached[0])
+            _gas_cache[key] = (gas, now)
+        return gas
+
+    def fee_params(self):
+        """
+        Current fee fields for a transaction.
+
+        Returns:
+            dict: {'maxFeePerGas', 'maxPriorityFeePerGas'} on EIP-1559 chains, else {'gasPrice'}
+        """
+        now = time.monotonic()
+        cached = _fee_cache.get(self.chain_id)
+        if cached and now - cached[1] < settings.BLOCKCHAIN_FEE_CACHE_TTL:
+            return dict(cached[0])
+
+        try:
+            params = self._eip1559_fee_params()
+        except Exception as e:
+            logger.info(f"EIP-1559 fee data unavailable, using legacy gas price: {str(e)}")
+            params = None
+        if params is None:
+            params = {'gasPrice': self._cap(self.w3.eth.gas_price)}
+
+        _fee_cache[self.chain_id] = (params, now)
+        return dict(params)
+
+    def _eip1559_fee_params(self):
+        history = self.w3.eth.fee_history(
+            settings.BLOCKCHAIN_FEE_HISTORY_BLOCKS,
+            'latest',
+            [settings.BLOCKCHAIN_PRIORITY_FEE_PERCENTILE]
+        )
+        base_fees = history.get('baseFeePerGas') or []
+        if not base_fees or not base_fees[-1]:
+            return None
+
+        # The last entry is the base fee of the next block
+        next_base_fee = base_fees[-1]
+        rewards = sorted(reward[0] for reward in history.get('reward') or [] if reward)
+        priority_fee = rewards[len(rewards) // 2] if rewards else 0
+        priority_fee = max(priority_fee, self.w3.to_wei(settings.BLOCKCHAIN_MIN_PRIORITY_FEE_GWEI, 'gwei'))
+
+        # Twice the base fee keeps the transaction includable through ~6 full blocks of base fee growth
+        max_fee = self._cap(2 * next_base_fee + priority_fee)
+        return {
+            'maxFeePerGas': max_fee,
+            'maxPriorityFeePerGas': min(priority_fee, max_fee),
+        }
+
+    def _cap(self, fee):
+        cap = self.w3.to_wei(settings.BLOCKCHAIN_MAX_FEE_GWEI, 'gwei')
+        if fee > cap:
+            logger.warning(f"Fee {self.w3.from_wei(fee, 'gwei')} gwei capped at {settings.BLOCKCHAIN_MAX_FEE_GWEI} gwei")
+            return cap
+        return fee
+
+    def transaction_params(self, contract_function, sender_address, gas=None):
+        """Gas limit and fee fields for a contract transaction; an explicit gas skips estimation"""
+        params = self.fee_params()
+        params['gas'] = gas or self.estimate_gas(contract_function, sender_address)
+        return params
+
+    def replacement_params(self, tx):
+        """
+        Fee fields for a replacement of a pending transaction.
+
+        Nodes only accept a replacement with the same nonce when its fees are at least
+        ~10% higher, so the old fees are bumped by BLOCKCHAIN_FEE_BUMP_PERCENT and the
+        result is never below the current market fees.
+
+        Returns:
+            dict: fee fields, or None when BLOCKCHAIN_MAX_FEE_GWEI leaves no room for the
+            bump (the node would reject the replacement as underpriced)
+        """
+        _fee_cache.pop(self.chain_id, None)
+        current = self.fee_params()
+        bump = 1 + settings.BLOCKCHAIN_FEE_BUMP_PERCENT / 100
+
+        if tx.get('maxFeePerGas') is not None:
+            old_priority = tx.get('maxPriorityFeePerGas') or 0
+            min_priority_fee = int(old_priority * bump) + 1
+            min_max_fee = int(tx['maxFeePerGas'] * bump) + 1
+            priority_fee = max(min_priority_fee, current.get('maxPriorityFeePerGas', 0))
+            max_fee = self._cap(max(min_max_fee, current.get('maxFeePerGas', 0), priority_fee))
+            if max_fee < min_max_fee or min(priority_fee, max_fee) < min_priority_fee:
+                logger.warning(
+                    f"Not replacing transaction: the bumped fee is above {settings.BLOCKCHAIN_MAX_FEE_GWEI} gwei"
+                )
+                return None
+            return {
+                'maxFeePerGas': max_fee,
+                'maxPriorityFeePerGas': min(priority_fee, max_fee),
+            }
+
+        min_gas_price = int(tx['gasPrice'] * bump) + 1
+        gas_price = self._cap(max(min_gas_price, current.get('gasPrice', current.get('maxFeePerGas', 0))))
+        if gas_price < min_gas_price:
+            logger.warning(
+                f"Not replacing transaction: the bumped gas price is above {settings.BLOCKCHAIN_MAX_FEE_GWEI} gwei"
+            )
+            return None
+        return {'gasPrice': gas_price}
@@ -0,0 +1,146 @@
+# blockchain/utils/instrumentation.py
+# Counts and timings for chain client calls, per request and per process
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from ..metrics import observe_chain_call
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current_stats = ContextVar('chain_call_stats', default=None)
+
+# Process-wide totals keyed by (kind, label, error class or '')
+_totals = {}
+_totals_lock = threading.Lock()
+
+
+class CallStats:
+    """Chain calls made inside one tracking scope (usually one HTTP request)"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.duration = 0.0
+        self.calls = []
+
+    def record(self, kind, label, duration, error):
+        self.count += 1
+        self.duration += duration
+        if error:
+            self.errors += 1
+        self.calls.append({'kind': kind, 'label': label, 'duration': duration, 'error': error})
+
+    def by_label(self):
+        """label -> {'count', 'duration'} for the calls in this scope"""
+        summary = {}
+        for call in self.calls:
+            entry = summary.setdefault(call['label'], {'count': 0, 'duration': 0.0})
+            entry['count'] += 1
+            entry['duration'] += call['duration']
+        return summary
+
+
+class CallTotals:
+    """Process-wide count, error count and latency histogram for one label"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe(self, duration):
+        self.count += 1
+        self.duration += duration
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if duration <= bound:
+                self.buckets[index] += 1
+                return
+        self.buckets[-1] += 1
+
+
+@contextmanager
+def track_chain_calls():
+    """Collect the chain calls made inside the block into a fresh CallStats"""
+    stats = CallStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def current_stats():
+    """CallStats of the enclosing track_chain_calls() scope, or None"""
+    return _current_stats.get()
+
+
+def snapshot():
+    """
+    Copy of the process-wide totals.
+
+    Returns:
+        dict: (kind, label, error class or '') -> {'count', 'duration', 'buckets'}
+    """
+    with _totals_lock:
+        return {
+            key: {'count': totals.count, 'duration': totals.duration, 'buckets': list(totals.buckets)}
+            for key, totals in _totals.items()
+        }
+
+
+def reset():
+    """Clear the process-wide totals"""
+    with _totals_lock:
+        _totals.clear()
+
+
+def record_call(kind, label, duration, error=None):
+    """Record one finished call in the process totals, the current scope and the slow-call log"""
+    error = error or ''
+    with _totals_lock:
+        totals = _totals.get((kind, label, error))
+        if totals is None:
+            totals = _totals[(kind, label, error)] = CallTotals()
+        totals.observe(duration)
+
+    observe_chain_call(kind, label, duration, error)
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(kind, label, duration, error)
+
+    duration_ms = duration * 1000
+    if duration_ms >= settings.BLOCKCHAIN_SLOW_CALL_MS:
+        outcome = f"failed with {error}" if error else "ok"
+        logger.warning(f"Slow chain {kind} {label}: {duration_ms:.1f} ms ({outcome})")
+
+
+def instrumented(kind, label=None):
+    """
+    Decorator for chain client methods.
+
+    `kind` groups calls ('call', 'send', 'multicall', 'lookup', 'receipt', 'replace'). The label
+    is `label` when given, else "<contract>.<function>" from the first two arguments.
+    Exceptions are recorded by class name and re-raised.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            call_label = label or f"{args[0]}.{args[1]}"
+            start = time.perf_counter()
+            try:
+                result = method(self, *args, **kwargs)
+            except Exception as e:
+                record_call(kind, call_label, time.perf_counter() - start, type(e).__name__)
+                raise
+            record_call(kind, call_label, time.perf_counter() - start)
+            return result
+        return wrapper
+    return decorator
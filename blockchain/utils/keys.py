@@ -0,0 +1,36 @@
+# blockchain/utils/keys.py
+import uuid
+from web3 import Web3
+
+
+def credential_key(credential_id) -> bytes:
+    """
+    Encode a credential ID as the bytes32 key used by RevocationRegistryV2.
+
+    The 16 UUID bytes are right-padded with zeros to 32 bytes, so the key can be
+    turned back into the credential ID. IDs that are not UUIDs fall back to
+    keccak256 of their string form.
+
+    Args:
+        credential_id: UUID instance or string form of the credential ID
+
+    Returns:
+        bytes: 32-byte key
+    """
+    try:
+        value = credential_id if isinstance(credential_id, uuid.UUID) else uuid.UUID(str(credential_id))
+    except ValueError:
+        return bytes(Web3.keccak(text=str(credential_id)))
+    return value.bytes.ljust(32, b'\x00')
+
+
+def credential_id_from_key(key: bytes) -> str:
+    """Recover the credential UUID string from a bytes32 revocation key"""
+    if any(key[16:]):
+        raise ValueError("Key is a hashed credential ID and cannot be decoded")
+    return str(uuid.UUID(bytes=bytes(key[:16])))
+
+
+def did_key(did: str) -> bytes:
+    """Encode a DID as the keccak256 bytes32 key used by DIDRegistryV2 and TrustRegistryV2"""
+    return bytes(Web3.keccak(text=did))
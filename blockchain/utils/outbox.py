@@ -0,0 +1,232 @@
+# blockchain/utils/outbox.py
+# Durable queue for Celery tasks, published after the transaction that needs them commits
+import functools
+import logging
+import threading
+import time
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# While the broker is known to be down, dispatches go straight to the outbox instead
+# of paying a connection timeout on every request
+_broker_down_until = 0.0
+
+_relay_thread = None
+_relay_lock = threading.Lock()
+
+# Entries not yet published; idempotency keys are unique among these only
+ACTIVE_STATUSES = ('PENDING', 'PUBLISHING')
+
+
+def broker_available():
+    return time.monotonic() >= _broker_down_until
+
+
+def mark_broker_down():
+    global _broker_down_until
+    _broker_down_until = time.monotonic() + settings.TASK_BROKER_RETRY_SECONDS
+
+
+def mark_broker_up():
+    global _broker_down_until
+    _broker_down_until = 0.0
+
+
+def publish(task_name, args=None, kwargs=None, task_id=None):
+    """Publish a task by name without connection or publish retries; raises if the broker is unreachable"""
+    from AuthentiCred.celery import app
+    signature = app.signature(task_name, args=list(args or []), kwargs=dict(kwargs or {}))
+    if app.conf.task_always_eager:
+        return signature.apply_async(task_id=task_id)
+    with app.connection_for_write() as conn:
+        # A single connection attempt, so an outage costs one connect timeout rather
+        # than kombu's retry schedule
+        conn.ensure_connection(max_retries=0)
+        return signature.apply_async(task_id=task_id, connection=conn, retry=False)
+
+
+def enqueue(task_name, args=None, kwargs=None, error='', idempotency_key=None):
+    """
+    Store a task in the outbox and make sure it gets published after commit.
+
+    Call it inside the transaction that writes the rows the task needs: the entry is
+    only visible, and only published, if that transaction commits. With an
+    idempotency_key, an entry still waiting to be published under the same key is
+    returned instead of creating a second one; once it has been dispatched, the
+    key can be used again.
+
+    The Celery task ID is fixed when the entry is created, so publishing the same
+    entry again after a crash reuses it.
+    """
+    from ..models import TaskOutbox
+
+    values = {
+        'task_name': task_name,
+        'idempotency_key': idempotency_key,
+        'args': list(args or []),
+        'kwargs': dict(kwargs or {}),
+        'last_error': error,
+        'task_id': str(uuid.uuid4()),
+    }
+    if idempotency_key:
+        active = TaskOutbox.objects.filter(idempotency_key=idempotency_key, status__in=ACTIVE_STATUSES)
+        entry = active.first()
+        if entry is None:
+            try:
+                with transaction.atomic():
+                    entry = TaskOutbox.objects.create(**values)
+            except IntegrityError:
+                # A concurrent dispatch stored the key first (unique_active_outbox_key)
+                entry = active.first()
+                if entry is None:
+                    raise
+            else:
+                transaction.on_commit(functools.partial(relay_entry, entry.pk))
+                return entry
+        logger.info(f"Outbox entry already pending for {idempotency_key}, not dispatching again")
+        return entry
+
+    entry = TaskOutbox.objects.create(**values)
+    transaction.on_commit(functools.partial(relay_entry, entry.pk))
+    return entry
+
+
+def _claim(limit, **filters):
+    """
+    Mark up to `limit` publishable entries PUBLISHING and return them.
+
+    The claim commits before anything is published, so no row lock is held while
+    talking to the broker. Entries left PUBLISHING by a process that died are
+    claimable again after TASK_OUTBOX_CLAIM_SECONDS.
+    """
+    from ..models import TaskOutbox
+
+    stale = timezone.now() - timedelta(seconds=settings.TASK_OUTBOX_CLAIM_SECONDS)
+    with transaction.atomic():
+        entries = list(
+            TaskOutbox.objects.select_for_update(skip_locked=True)
+            .filter(Q(status='PENDING') | Q(status='PUBLISHING', updated_at__lt=stale), **filters)
+            .order_by('created_at')[:limit]
+        )
+        TaskOutbox.objects.filter(pk__in=[entry.pk for entry in entries]).update(
+            status='PUBLISHING', updated_at=timezone.now()
+        )
+    return entries
+
+
+def _release(entries):
+    """Return claimed entries to PENDING without publishing them"""
+    from ..models import TaskOutbox
+
+    TaskOutbox.objects.filter(pk__in=[entry.pk for entry in entries], status='PUBLISHING').update(
+        status='PENDING', updated_at=timezone.now()
+    )
+
+
+def _publish_entry(entry):
+    """Publish one claimed entry; returns False (and records the error) on failure"""
+    from ..models import TaskOutbox
+
+    entry.attempts += 1
+    try:
+        publish(entry.task_name, entry.args, entry.kwargs, task_id=entry.task_id or None)
+    except Exception as e:
+        TaskOutbox.objects.filter(pk=entry.pk, status='PUBLISHING').update(
+            status='PENDING', attempts=entry.attempts, last_error=str(e), updated_at=timezone.now()
+        )
+        mark_broker_down()
+        logger.warning(f"Could not publish {entry.task_name}, broker unavailable: {str(e)}")
+        return False
+    entry.status = 'DISPATCHED'
+    entry.dispatched_at = timezone.now()
+    entry.save(update_fields=['attempts', 'status', 'dispatched_at', 'updated_at'])
+    return True
+
+
+def relay_entry(pk):
+    """
+    Publish a single entry right after the transaction that created it committed.
+
+    Leaves the entry to the relay thread when the broker is down or the publish fails.
+    """
+    if not broker_available():
+        start_relay_thread()
+        return False
+    try:
+        claimed = _claim(1, pk=pk)
+        if not claimed:
+            # Already published, or being published, by a relay
+            return True
+        published = _publish_entry(claimed[0])
+    except Exception as e:
+        logger.error(f"Outbox entry {pk} could not be relayed: {str(e)}")
+        published = False
+    if not published:
+        start_relay_thread()
+    return published
+
+
+def relay_outbox(limit=None):
+    """
+    Publish pending outbox entries in creation order.
+
+    Stops at the first publish failure, since the broker is most likely still down.
+    Entries are claimed (SKIP LOCKED, then committed as PUBLISHING) before they are
+    published, so relays in several processes never publish the same entry twice.
+
+    Returns:
+        int: number of entries published
+    """
+    published = 0
+    entries = _claim(limit or settings.TASK_OUTBOX_BATCH_SIZE)
+    for index, entry in enumerate(entries):
+        if not _publish_entry(entry):
+            _release(entries[index + 1:])
+            break
+        published += 1
+
+    if published:
+        mark_broker_up()
+        logger.info(f"Outbox relay published {published} tasks")
+    return published
+
+
+def has_pending():
+    from ..models import TaskOutbox
+    return TaskOutbox.objects.filter(status__in=ACTIVE_STATUSES).exists()
+
+
+def _relay_loop():
+    global _relay_thread
+    try:
+        while True:
+            time.sleep(settings.TASK_OUTBOX_RELAY_INTERVAL)
+            try:
+                close_old_connections()
+                relay_outbox()
+                with _relay_lock:
+                    if not has_pending():
+                        _relay_thread = None
+                        return
+            except Exception as e:
+                logger.error(f"Outbox relay failed: {str(e)}")
+    finally:
+        connection.close()
+
+
+def start_relay_thread():
+    """Start the in-process relay thread unless one is already running"""
+    global _relay_thread
+    if not settings.TASK_OUTBOX_RELAY_THREAD:
+        return
+    with _relay_lock:
+        if _relay_thread is not None and _relay_thread.is_alive():
+            return
+        _relay_thread = threading.Thread(target=_relay_loop, name='task-outbox-relay', daemon=True)
+        _relay_thread.start()
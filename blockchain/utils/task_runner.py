@@ -2,74 +2,78 @@
 Task execution utility with fallback mechanism
 =============================================
 
-This module provides a reliable way to execute blockchain tasks with automatic
-fallback from Celery to direct execution if Celery is not available.
+This module provides a reliable way to dispatch blockchain tasks. Every task
+is first written to the TaskOutbox table, in the caller's database
+transaction, and published to Celery once that transaction commits. A task
+therefore never runs before the rows it needs are visible, and is never lost
+if the broker is down: the outbox relay publishes it once the broker is back.
+Web requests never run chain work inline or wait on broker retries.
 """
 
 import logging
 from functools import wraps
 from django.conf import settings
+from django.db import transaction
+from ..metrics import TASK_DISPATCHES
+from . import outbox
 
 logger = logging.getLogger(__name__)
 
-def execute_task_with_fallback(task_func, *args, **kwargs):
+def execute_task_with_fallback(task_func, *args, idempotency_key=None, **kwargs):
     """
-    Execute a task with fallback mechanism.
+    Dispatch a task through the transactional outbox.
     
-    First tries to execute via Celery (.delay()), if that fails,
-    falls back to direct execution.
+    Call it inside the transaction.atomic() block that writes the rows the task
+    reads: the task is published after commit and dropped on rollback. Outside
+    a transaction it is published right away. If the publish fails, the entry
+    stays in the outbox and is relayed later (see blockchain/utils/outbox.py).
     
     Args:
         task_func: The Celery task function
         *args: Arguments to pass to the task
+        idempotency_key: Optional key identifying this unit of work; dispatching
+            the same key again returns the existing entry instead of a second task
         **kwargs: Keyword arguments to pass to the task
     
     Returns:
         dict: Result information with keys:
             - success: bool
-            - method: 'celery' or 'direct'
-            - result: The actual result or error message
-            - task_id: Celery task ID (if using Celery)
+            - method: 'celery' (already published), 'outbox' (published after
+              commit or once the broker is back) or 'failed'
+            - result: TaskOutbox entry or None
+            - task_id: Celery task ID the task will run under
     """
-    # Try Celery first
     try:
-        logger.info(f"Attempting Celery execution for task: {task_func.__name__}")
-        celery_result = task_func.delay(*args, **kwargs)
+        entry = outbox.enqueue(task_func.name, args, kwargs, idempotency_key=idempotency_key)
+    except Exception as e:
+        logger.error(f"Outbox write failed for {task_func.__name__}: {e}")
+        TASK_DISPATCHES.labels(task=task_func.__name__, method='failed').inc()
         
         return {
-            'success': True,
-            'method': 'celery',
-            'result': celery_result,
-            'task_id': celery_result.id,
-            'message': f"Task submitted to Celery with ID: {celery_result.id}"
+            'success': False,
+            'method': 'failed',
+            'result': None,
+            'task_id': None,
+            'message': f"Task could not be dispatched or queued: {e}"
         }
-        
-    except Exception as celery_error:
-        logger.warning(f"Celery execution failed for {task_func.__name__}: {celery_error}")
-        
-        # Fallback to direct execution
-        try:
-            logger.info(f"Falling back to direct execution for task: {task_func.__name__}")
-            direct_result = task_func(*args, **kwargs)
-            
-            return {
-                'success': True,
-                'method': 'direct',
-                'result': direct_result,
-                'task_id': None,
-                'message': f"Task executed directly: {direct_result}"
-            }
-            
-        except Exception as direct_error:
-            logger.error(f"Direct execution also failed for {task_func.__name__}: {direct_error}")
-            
-            return {
-                'success': False,
-                'method': 'failed',
-                'result': None,
-                'task_id': None,
-                'message': f"Both Celery and direct execution failed: {direct_error}"
-            }
+    
+    # Outside a transaction the on_commit publish has already run
+    if not transaction.get_connection().in_atomic_block:
+        entry.refresh_from_db(fields=['status'])
+    method = 'celery' if entry.status == 'DISPATCHED' else 'outbox'
+    TASK_DISPATCHES.labels(task=task_func.__name__, method=method).inc()
+    
+    if method == 'celery':
+        message = f"Task submitted to Celery with ID: {entry.task_id}"
+    else:
+        message = "Task queued and will be submitted to background processing shortly"
+    return {
+        'success': True,
+        'method': method,
+        'result': entry,
+        'task_id': entry.task_id,
+        'message': message
+    }
 
 def task_with_fallback(task_func):
     """
@@ -117,8 +121,8 @@ def get_task_status_message(result_dict):
     if result_dict['success']:
         if result_dict['method'] == 'celery':
             return f"Task submitted to background processing. Task ID: {result_dict['task_id']}"
-        elif result_dict['method'] == 'direct':
-            return f"Task completed successfully: {result_dict['message']}"
+        elif result_dict['method'] == 'outbox':
+            return result_dict['message']
     else:
         return f"Task failed: {result_dict['message']}"
     
@@ -1,3 +1,22 @@
-from django.shortcuts import render
+# blockchain/views.py
+import hmac
+from django.conf import settings
+from django.http import HttpResponse
+from .metrics import render_metrics
 
-# Create your views here.
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint; requires `Authorization: Bearer <METRICS_TOKEN>`.
+
+    Without a METRICS_TOKEN the endpoint is only served with DEBUG on.
+    """
+    if settings.METRICS_TOKEN:
+        expected = f'Bearer {settings.METRICS_TOKEN}'
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), expected):
+            return HttpResponse('Unauthorized', status=401)
+    elif not settings.DEBUG:
+        return HttpResponse('Metrics are disabled until METRICS_TOKEN is set', status=403)
+
+    output, content_type = render_metrics()
+    return HttpResponse(output, content_type=content_type)
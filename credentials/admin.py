@@ -1,5 +1,9 @@
+import re
 from django.contrib import admin
-from .models import CredentialSchema, Credential, VerificationRecord
+from django.db.models import Q
+from users.models import User
+from .models import CredentialSchema, Credential, VerificationRecord, VerificationRollup
+from .search import text_filter
 
 @admin.register(CredentialSchema)
 class CredentialSchemaAdmin(admin.ModelAdmin):
@@ -26,10 +30,25 @@ class CredentialSchemaAdmin(admin.ModelAdmin):
 class CredentialAdmin(admin.ModelAdmin):
     list_display = ('title', 'credential_type', 'issuer', 'holder', 'status', 'created_at', 'issued_at')
     list_filter = ('status', 'credential_type', 'created_at', 'issued_at', 'expiration_date')
-    search_fields = ('title', 'description', 'issuer__username', 'holder__username', 'issuer__email', 'holder__email', 'vc_hash')
-    readonly_fields = ('id', 'created_at', 'issued_at', 'vc_hash')
+    search_fields = ('title',)  # Searched through search_vector and issuer, see get_search_results
+    readonly_fields = ('id', 'created_at', 'issued_at', 'vc_hash', 'anchor_transaction')
     ordering = ('-created_at',)
     
+    def get_search_results(self, request, queryset, search_term):
+        # A full hash is an exact lookup on the unique vc_hash index; anything else goes
+        # through the full-text index instead of LIKE '%term%' scans. The issuer is not
+        # in the search document, so issuers are matched by username or email in the
+        # (much smaller) user table
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        if re.fullmatch(r'[0-9a-fA-F]{64}', search_term):
+            return queryset.filter(vc_hash=search_term.lower()), False
+        issuers = User.objects.filter(
+            Q(username__icontains=search_term) | Q(email__icontains=search_term)
+        ).values('pk')
+        return queryset.filter(text_filter(search_term) | Q(issuer__in=issuers)), False
+    
     fieldsets = (
         ('Basic Information', {
             'fields': ('title', 'description', 'credential_type', 'schema')
@@ -45,7 +64,7 @@ class CredentialAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('Technical Details', {
-            'fields': ('vc_json', 'vc_hash'),
+            'fields': ('vc_json', 'vc_hash', 'anchor_transaction'),
             'classes': ('collapse',)
         }),
     )
@@ -57,7 +76,7 @@ class CredentialAdmin(admin.ModelAdmin):
 class VerificationRecordAdmin(admin.ModelAdmin):
     list_display = ('verifier', 'credential_hash', 'verification_date', 'is_valid', 'source')
     list_filter = ('is_valid', 'source', 'verification_date')
-    search_fields = ('verifier__username', 'verifier__email', 'credential_hash')
+    search_fields = ('verifier__username', 'verifier__email', '=credential_hash')
     readonly_fields = ('id', 'verification_date')
     ordering = ('-verification_date',)
     
@@ -76,3 +95,16 @@ class VerificationRecordAdmin(admin.ModelAdmin):
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('verifier', 'credential')
+
+@admin.register(VerificationRollup)
+class VerificationRollupAdmin(admin.ModelAdmin):
+    list_display = ('scope', 'subject_id', 'period', 'bucket_start', 'total', 'valid', 'invalid')
+    list_filter = ('scope', 'period', 'bucket_start')
+    search_fields = ('subject_id',)
+    ordering = ('-bucket_start',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
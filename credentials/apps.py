@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class CredentialsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'credentials'
+    
+    def ready(self):
+        # Keep the verification rollups in step with VerificationRecord
+        from . import rollups  # noqa: F401
+        # Keep Credential.search_vector in step with credentials and their holders
+        from . import search  # noqa: F401
+        # Drop compiled schema forms and validators when a schema changes
+        from . import schema_compiler  # noqa: F401
@@ -1,6 +1,5 @@
 # credentials/forms.py
 from django import forms
-from django.core.validators import MinValueValidator, MaxValueValidator
 from .models import Credential, CredentialSchema
 from users.models import User
 from django.forms import formset_factory
@@ -16,6 +15,16 @@ class CredentialSchemaForm(forms.ModelForm):
             }),
         }
 
+    def clean_fields(self):
+        from .schema_compiler import check_schema_fields
+
+        fields = self.cleaned_data.get('fields')
+        try:
+            check_schema_fields(fields)
+        except ValueError as e:
+            raise forms.ValidationError(str(e))
+        return fields
+
 class CredentialIssueForm(forms.ModelForm):
     holder_email = forms.EmailField(label="Recipient Email")
     document = forms.FileField(
@@ -54,39 +63,8 @@ class CredentialIssueForm(forms.ModelForm):
     def __init__(self, *args, issuer=None, **kwargs):
         super().__init__(*args, **kwargs)
         self.issuer = issuer
-        
-        # Add dynamic fields based on schema
-        if 'schema' in self.initial:
-            schema = self.initial['schema']
-            if schema and schema.fields:
-                for field_name, field_type in schema.fields.items():
-                    if field_type == 'str':
-                        self.fields[field_name] = forms.CharField(
-                            label=field_name.capitalize(),
-                            required=False
-                        )
-                    elif field_type == 'int':
-                        self.fields[field_name] = forms.IntegerField(
-                            label=field_name.capitalize(),
-                            required=False
-                        )
-                    elif field_type == 'float':
-                        self.fields[field_name] = forms.FloatField(
-                            label=field_name.capitalize(),
-                            required=False,
-                            validators=[MinValueValidator(0.0), MaxValueValidator(4.0)]
-                        )
-                    elif field_type == 'date':
-                        self.fields[field_name] = forms.DateField(
-                            label=field_name.capitalize(),
-                            required=False,
-                            widget=forms.DateInput(attrs={'type': 'date'})
-                        )
-                    elif field_type == 'bool':
-                        self.fields[field_name] = forms.BooleanField(
-                            label=field_name.capitalize(),
-                            required=False
-                        )
+        # Schema fields are declared on the per-schema subclasses built by
+        # credentials.schema_compiler.issue_form_class
 
 class CredentialRevokeForm(forms.Form):
     reason = forms.CharField(
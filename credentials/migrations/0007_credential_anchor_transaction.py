@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0008_transaction_subject_columns'),
+        ('credentials', '0006_credential_document'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='credential',
+            name='anchor_transaction',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='anchored_credentials', to='blockchain.onchaintransaction'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0009_archivedtransaction'),
+        ('credentials', '0007_credential_anchor_transaction'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='credential',
+            name='anchor_transaction',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='anchored_credentials', to='blockchain.onchaintransaction'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:55
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credentials', '0008_credential_anchor_transaction_archivable'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VerificationRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('HOUR', 'Hour'), ('DAY', 'Day')], max_length=10)),
+                ('bucket_start', models.DateTimeField()),
+                ('scope', models.CharField(choices=[('PLATFORM', 'Platform'), ('VERIFIER', 'Verifier'), ('ISSUER', 'Issuer')], max_length=10)),
+                ('subject_id', models.UUIDField(default=uuid.UUID('00000000-0000-0000-0000-000000000000'))),
+                ('total', models.IntegerField(default=0)),
+                ('valid', models.IntegerField(default=0)),
+                ('invalid', models.IntegerField(default=0)),
+                ('internal', models.IntegerField(default=0)),
+                ('external', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('scope', 'subject_id', 'period', 'bucket_start'), name='unique_verification_rollup')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0009_archivedtransaction'),
+        ('credentials', '0009_verificationrollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='verificationrecord',
+            name='credentials_verifie_63cdee_idx',
+        ),
+        migrations.AddIndex(
+            model_name='credential',
+            index=models.Index(fields=['issuer', '-created_at', '-id'], name='credential_issuer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='verificationrecord',
+            index=models.Index(fields=['verifier', '-verification_date', '-id'], name='verification_verifier_date_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:04
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+
+def populate_search_vectors(apps, schema_editor):
+    # Index existing credentials in batches, so they are searchable right after deploy
+    from credentials.search import update_search_vectors
+    Credential = apps.get_model('credentials', 'Credential')
+    pks = list(Credential.objects.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(pks), 1000):
+        update_search_vectors(Credential.objects.filter(pk__in=pks[start:start + 1000]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0009_archivedtransaction'),
+        ('credentials', '0010_keyset_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='credential',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='credential',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='credential_search_idx'),
+        ),
+        migrations.RunPython(populate_search_vectors, migrations.RunPython.noop),
+    ]
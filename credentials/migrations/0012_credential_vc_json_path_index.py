@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:08
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Build the GIN index without blocking writes to a large credentials table
+    atomic = False
+
+    dependencies = [
+        ('blockchain', '0009_archivedtransaction'),
+        ('credentials', '0011_credential_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='credential',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['vc_json'], name='credential_vc_json_path_idx', opclasses=['jsonb_path_ops']),
+        ),
+    ]
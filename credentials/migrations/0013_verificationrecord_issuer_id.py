@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:55
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def populate_issuer_id(apps, schema_editor):
+    Credential = apps.get_model('credentials', 'Credential')
+    VerificationRecord = apps.get_model('credentials', 'VerificationRecord')
+    VerificationRecord.objects.filter(credential__isnull=False).update(
+        issuer_id=Subquery(Credential.objects.filter(pk=OuterRef('credential_id')).values('issuer_id')[:1])
+    )
+
+
+def rebuild_rollups(apps, schema_editor):
+    # Existing verifications are counted here, so dashboards do not start from zero
+    from credentials import rollups
+    rollups.rebuild(
+        record_model=apps.get_model('credentials', 'VerificationRecord'),
+        rollup_model=apps.get_model('credentials', 'VerificationRollup'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credentials', '0012_credential_vc_json_path_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='verificationrecord',
+            name='issuer_id',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(populate_issuer_id, migrations.RunPython.noop),
+        migrations.RunPython(rebuild_rollups, migrations.RunPython.noop),
+    ]
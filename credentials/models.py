@@ -1,8 +1,11 @@
 # credentials/models.py
 import uuid
 import json
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils import timezone
+from blockchain.models import TransactionForeignKey
 from blockchain.utils.vc_proofs import compute_sha256
 from django.core.validators import MinValueValidator, MaxValueValidator
 
@@ -50,6 +53,25 @@ class Credential(models.Model):
     revocation_reason = models.TextField(blank=True, null=True)
     vc_hash = models.CharField(max_length=64, unique=True, null=True, blank=True, help_text="SHA256 hash of the credential JSON")
     document = models.FileField(upload_to='credentials/', null=True, blank=True, help_text="Upload PDF, JPG, PNG, or other document formats")
+    anchor_transaction = TransactionForeignKey(
+        'blockchain.OnChainTransaction',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,  # May point at an archived transaction (blockchain.ArchivedTransaction)
+        null=True,
+        blank=True,
+        related_name='anchored_credentials'
+    )
+    # Weighted full-text document, maintained by credentials/search.py
+    search_vector = SearchVectorField(null=True, editable=False)
+    
+    class Meta:
+        indexes = [
+            # Keyset pagination of an issuer's credentials, newest first
+            models.Index(fields=['issuer', '-created_at', '-id'], name='credential_issuer_created_idx'),
+            GinIndex(fields=['search_vector'], name='credential_search_idx'),
+            # Containment queries on vc_json (credentials/subject_query.py)
+            GinIndex(fields=['vc_json'], opclasses=['jsonb_path_ops'], name='credential_vc_json_path_idx'),
+        ]
     
     def __str__(self):
         return f"{self.credential_type} - {self.title}"
@@ -147,6 +169,8 @@ class VerificationRecord(models.Model):
     verifier = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='verifications_performed')
     credential_hash = models.CharField(max_length=64, help_text="64-character hex hash of the credential")
     credential = models.ForeignKey(Credential, on_delete=models.SET_NULL, null=True, blank=True, related_name='verification_records')
+    # User ID of the credential's issuer, kept when the credential is deleted so the issuer rollups stay put
+    issuer_id = models.UUIDField(null=True, blank=True, editable=False)
     verification_date = models.DateTimeField(default=timezone.now)
     is_valid = models.BooleanField(default=False)
     verification_details = models.JSONField(default=dict, help_text="Detailed verification results")
@@ -158,10 +182,15 @@ class VerificationRecord(models.Model):
     class Meta:
         ordering = ['-verification_date']
         indexes = [
-            models.Index(fields=['verifier', '-verification_date']),
+            models.Index(fields=['verifier', '-verification_date', '-id'], name='verification_verifier_date_idx'),
             models.Index(fields=['credential_hash']),
         ]
     
+    def save(self, *args, **kwargs):
+        if self.credential_id and self.issuer_id is None:
+            self.issuer_id = self.credential.issuer_id
+        super().save(*args, **kwargs)
+    
     def __str__(self):
         return f"Verification by {self.verifier.username} on {self.verification_date.strftime('%Y-%m-%d %H:%M')}"
     
@@ -176,4 +205,43 @@ class VerificationRecord(models.Model):
         if self.credential and self.credential.holder:
             return self.credential.holder.get_full_name() or self.credential.holder.username
         return "Unknown"
-    
\ No newline at end of file
+    
+class VerificationRollup(models.Model):
+    """
+    Verification counts per hour or day for the platform, one verifier or one issuer.
+
+    Kept up to date as VerificationRecord rows are created and deleted (see
+    credentials/rollups.py), so statistics read a few rows instead of scanning the
+    verification history. Rebuild with `python manage.py rebuild_verification_rollups`.
+    """
+    PERIOD_CHOICES = (
+        ('HOUR', 'Hour'),
+        ('DAY', 'Day'),
+    )
+    
+    SCOPE_CHOICES = (
+        ('PLATFORM', 'Platform'),
+        ('VERIFIER', 'Verifier'),
+        ('ISSUER', 'Issuer'),
+    )
+    
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES)
+    bucket_start = models.DateTimeField()  # Start of the hour or day (UTC)
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    subject_id = models.UUIDField(default=uuid.UUID(int=0))  # User ID of the verifier or issuer, zero UUID for the platform
+    total = models.IntegerField(default=0)
+    valid = models.IntegerField(default=0)
+    invalid = models.IntegerField(default=0)
+    internal = models.IntegerField(default=0)
+    external = models.IntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['scope', 'subject_id', 'period', 'bucket_start'],
+                name='unique_verification_rollup'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_scope_display()} {self.subject_id} {self.get_period_display()} {self.bucket_start:%Y-%m-%d %H:%M}"
@@ -0,0 +1,182 @@
+# credentials/rollups.py
+# Hourly and daily verification counts per platform, verifier and issuer
+import functools
+import uuid
+from datetime import timezone as dt_timezone
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDay, TruncHour
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import VerificationRecord, VerificationRollup
+
+COUNTERS = ('total', 'valid', 'invalid', 'internal', 'external')
+
+# subject_id of platform-wide rollups
+PLATFORM = uuid.UUID(int=0)
+
+PERIODS = (
+    ('HOUR', TruncHour),
+    ('DAY', TruncDay),
+)
+
+# Scope -> VerificationRecord field holding the subject's user ID
+SCOPE_FIELDS = (
+    ('VERIFIER', 'verifier_id'),
+    ('ISSUER', 'issuer_id'),
+)
+
+
+def bucket_start(value, period):
+    """Start of the UTC hour or day containing `value`"""
+    value = value.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0) if period == 'DAY' else value
+
+
+def _record_scopes(record):
+    scopes = [('VERIFIER', record.verifier_id)]
+    if record.issuer_id:
+        scopes.append(('ISSUER', record.issuer_id))
+    return scopes
+
+
+def _add(scope, subject_id, when, deltas):
+    """Add `deltas` to the hour and day rollups of one subject"""
+    increments = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    for period, _ in PERIODS:
+        key = {
+            'scope': scope,
+            'subject_id': subject_id,
+            'period': period,
+            'bucket_start': bucket_start(when, period),
+        }
+        if VerificationRollup.objects.filter(**key).update(**increments):
+            continue
+        try:
+            with transaction.atomic():
+                VerificationRollup.objects.create(**key, **deltas)
+        except IntegrityError:
+            # Created by a concurrent verification in the meantime
+            VerificationRollup.objects.filter(**key).update(**increments)
+
+
+def apply_record(record, sign=1):
+    """
+    Add (sign=1) or remove (sign=-1) one verification from its hour and day rollups.
+
+    Verifier and issuer rollups are updated in the caller's transaction. The
+    platform rollups are shared by every verification, so they are updated after
+    commit, one short UPDATE at a time, instead of holding their row locks for
+    the rest of the caller's transaction; rebuild() corrects them if a process
+    dies in between.
+    """
+    deltas = {
+        'total': sign,
+        'valid': sign if record.is_valid else 0,
+        'invalid': 0 if record.is_valid else sign,
+        'internal': sign if record.source == 'INTERNAL' else 0,
+        'external': sign if record.source == 'EXTERNAL' else 0,
+    }
+
+    with transaction.atomic():
+        for scope, subject_id in _record_scopes(record):
+            _add(scope, subject_id, record.verification_date, deltas)
+    transaction.on_commit(functools.partial(_add, 'PLATFORM', PLATFORM, record.verification_date, deltas))
+
+
+@receiver(post_save, sender=VerificationRecord)
+def _verification_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        apply_record(instance)
+
+
+@receiver(post_delete, sender=VerificationRecord)
+def _verification_deleted(sender, instance, **kwargs):
+    apply_record(instance, sign=-1)
+
+
+def _counts():
+    return {
+        'total': Count('pk'),
+        'valid': Count('pk', filter=Q(is_valid=True)),
+        'invalid': Count('pk', filter=Q(is_valid=False)),
+        'internal': Count('pk', filter=Q(source='INTERNAL')),
+        'external': Count('pk', filter=Q(source='EXTERNAL')),
+    }
+
+
+def rebuild(since=None, record_model=VerificationRecord, rollup_model=VerificationRollup):
+    """
+    Recompute rollups from VerificationRecord.
+
+    With `since`, only buckets from the start of that UTC day onwards are rebuilt.
+    The rollup table is locked against writes while the counts are computed and
+    replaced, so verifications made meanwhile wait and then add to the rebuilt rows.
+    Migrations pass their historical models.
+
+    Returns:
+        int: number of rollup rows written
+    """
+    records = record_model.objects.all()
+    rollups = rollup_model.objects.all()
+    if since is not None:
+        since = bucket_start(since, 'DAY')
+        records = records.filter(verification_date__gte=since)
+        rollups = rollups.filter(bucket_start__gte=since)
+
+    using = router.db_for_write(rollup_model)
+    with transaction.atomic(using=using):
+        connection = connections[using]
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'LOCK TABLE {connection.ops.quote_name(rollup_model._meta.db_table)} IN SHARE ROW EXCLUSIVE MODE'
+                )
+
+        rows = []
+        for period, trunc in PERIODS:
+            bucketed = records.using(using).annotate(bucket=trunc('verification_date', tzinfo=dt_timezone.utc))
+            for row in bucketed.values('bucket').annotate(**_counts()):
+                rows.append(rollup_model(scope='PLATFORM', subject_id=PLATFORM, period=period, bucket_start=row['bucket'],
+                                         **{field: row[field] for field in COUNTERS}))
+            for scope, field in SCOPE_FIELDS:
+                for row in bucketed.exclude(**{f'{field}__isnull': True}).values('bucket', field).annotate(**_counts()):
+                    rows.append(rollup_model(scope=scope, subject_id=row[field], period=period,
+                                             bucket_start=row['bucket'],
+                                             **{counter: row[counter] for counter in COUNTERS}))
+
+        rollups.using(using).delete()
+        rollup_model.objects.using(using).bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def summary(scope, subject_id=PLATFORM, windows=None):
+    """
+    Verification totals for one platform/verifier/issuer from the daily rollups.
+
+    Args:
+        windows: optional {name: datetime}; each adds the total since the start of
+            that UTC day as `name`
+
+    Returns:
+        dict: total, valid, invalid, internal, external, success_rate (percent,
+        1 decimal) and one entry per window
+    """
+    # Aggregate aliases may not shadow the summed fields
+    aggregates = {f'sum_{field}': Coalesce(Sum(field), 0) for field in COUNTERS}
+    for name, since in (windows or {}).items():
+        aggregates[f'sum_{name}'] = Coalesce(Sum('total', filter=Q(bucket_start__gte=bucket_start(since, 'DAY'))), 0)
+
+    result = VerificationRollup.objects.filter(
+        scope=scope, subject_id=subject_id, period='DAY'
+    ).aggregate(**aggregates)
+    totals = {alias[len('sum_'):]: value for alias, value in result.items()}
+    totals['success_rate'] = round(totals['valid'] / totals['total'] * 100, 1) if totals['total'] else 0
+    return totals
+
+
+def total_since(since, scope='PLATFORM', subject_id=PLATFORM):
+    """Verifications since `since` (to the hour) from the hourly rollups"""
+    return VerificationRollup.objects.filter(
+        scope=scope, subject_id=subject_id, period='HOUR', bucket_start__gte=bucket_start(since, 'HOUR')
+    ).aggregate(sum_total=Coalesce(Sum('total'), 0))['sum_total']
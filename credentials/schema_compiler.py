@@ -0,0 +1,232 @@
+# credentials/schema_compiler.py
+# Compiles a CredentialSchema into a cached issue form class and a standalone credentialSubject validator
+import logging
+from datetime import date, datetime
+from django import forms
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .forms import CredentialIssueForm
+from .models import CredentialSchema
+
+logger = logging.getLogger(__name__)
+
+# credentialSubject keys set by the issuer rather than by schema fields
+RESERVED_SUBJECT_KEYS = ('id', 'documentHash', 'documentFilename')
+
+# GPA-style range applied to float fields
+FLOAT_MIN, FLOAT_MAX = 0.0, 4.0
+
+
+class SchemaValidationError(ValueError):
+    """A credentialSubject that does not match its schema; `errors` maps field -> message"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__('; '.join(f'{field}: {message}' for field, message in errors.items()))
+
+
+def _check_str(value):
+    if not isinstance(value, str):
+        raise ValueError('must be a string')
+    return value.strip()
+
+
+def _check_int(value):
+    if isinstance(value, bool):
+        raise ValueError('must be an integer')
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            pass
+    raise ValueError('must be an integer')
+
+
+def _check_float(value):
+    if isinstance(value, bool):
+        raise ValueError('must be a number')
+    try:
+        number = float(value.strip() if isinstance(value, str) else value)
+    except (TypeError, ValueError):
+        raise ValueError('must be a number')
+    if not FLOAT_MIN <= number <= FLOAT_MAX:
+        raise ValueError(f'must be between {FLOAT_MIN} and {FLOAT_MAX}')
+    return number
+
+
+def _check_date(value):
+    # Stored as ISO dates in credentialSubject
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, str):
+        try:
+            return date.fromisoformat(value.strip()).isoformat()
+        except ValueError:
+            pass
+    raise ValueError('must be a date (YYYY-MM-DD)')
+
+
+def _check_bool(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ('true', 'false', '1', '0'):
+        return value.strip().lower() in ('true', '1')
+    raise ValueError('must be true or false')
+
+
+# Schema field type -> (form field factory, value check, value of an empty field)
+FIELD_TYPES = {
+    'str': (lambda label: forms.CharField(label=label, required=False), _check_str, ''),
+    'int': (lambda label: forms.IntegerField(label=label, required=False), _check_int, None),
+    'float': (
+        lambda label: forms.FloatField(
+            label=label, required=False,
+            validators=[MinValueValidator(FLOAT_MIN), MaxValueValidator(FLOAT_MAX)]
+        ),
+        _check_float, None,
+    ),
+    'date': (
+        lambda label: forms.DateField(label=label, required=False, widget=forms.DateInput(attrs={'type': 'date'})),
+        _check_date, None,
+    ),
+    'bool': (lambda label: forms.BooleanField(label=label, required=False), _check_bool, False),
+}
+
+
+def check_schema_fields(fields):
+    """
+    Check a CredentialSchema.fields definition.
+
+    Raises:
+        ValueError: if `fields` is not a {name: type} mapping of known types
+    """
+    if not isinstance(fields, dict):
+        raise ValueError('Fields must be a JSON object of {"field_name": "type"}')
+    for name, field_type in fields.items():
+        if name in RESERVED_SUBJECT_KEYS:
+            raise ValueError(f"'{name}' is reserved and cannot be a schema field")
+        if field_type not in FIELD_TYPES:
+            raise ValueError(
+                f"Field '{name}' has unknown type '{field_type}'; use one of {', '.join(FIELD_TYPES)}"
+            )
+
+
+class CompiledSchema:
+    """Form class and credentialSubject validator of one version of a CredentialSchema"""
+
+    def __init__(self, schema):
+        self.schema_id = schema.pk
+        self.version = schema.version
+        self.updated_at = schema.updated_at
+        # Unknown types are skipped, as the issue form always has
+        self.fields = {
+            name: field_type for name, field_type in (schema.fields or {}).items() if field_type in FIELD_TYPES
+        }
+        self._checks = [
+            (name, FIELD_TYPES[field_type][1], FIELD_TYPES[field_type][2])
+            for name, field_type in self.fields.items()
+        ]
+        form_fields = {
+            name: FIELD_TYPES[field_type][0](name.capitalize()) for name, field_type in self.fields.items()
+        }
+        self.form_class = type(f'{CredentialIssueForm.__name__}_{schema.pk.hex[:8]}', (CredentialIssueForm,), form_fields)
+
+    def matches(self, schema):
+        return (self.version, self.updated_at) == (schema.version, schema.updated_at)
+
+    def validate(self, subject, allow_extra=False):
+        """
+        Validate and normalise a credentialSubject dict without building a form.
+
+        Values are coerced like the issue form would (numeric strings, ISO
+        dates, "true"/"false") and missing fields take the form's empty value.
+        Reserved keys (id, documentHash, documentFilename) pass through unchanged.
+
+        Returns:
+            tuple: (cleaned subject, {field: error message}); errors is empty when valid
+        """
+        cleaned = {key: subject[key] for key in RESERVED_SUBJECT_KEYS if key in subject}
+        errors = {}
+        for name, check, empty in self._checks:
+            value = subject.get(name)
+            if value is None or value == '':
+                cleaned[name] = empty
+                continue
+            try:
+                cleaned[name] = check(value)
+            except ValueError as e:
+                errors[name] = str(e)
+
+        extra = subject.keys() - self.fields.keys() - set(RESERVED_SUBJECT_KEYS)
+        if extra:
+            if allow_extra:
+                cleaned.update((key, subject[key]) for key in extra)
+            else:
+                for key in sorted(extra):
+                    errors[key] = 'is not a field of this schema'
+        return cleaned, errors
+
+    def clean(self, subject, allow_extra=False):
+        """Validated credentialSubject, or SchemaValidationError"""
+        cleaned, errors = self.validate(subject, allow_extra=allow_extra)
+        if errors:
+            raise SchemaValidationError(errors)
+        return cleaned
+
+    def validate_many(self, subjects, allow_extra=False):
+        """
+        Validate rows of a bulk import.
+
+        Returns:
+            tuple: ([cleaned subjects of valid rows], {row index: {field: error message}})
+        """
+        valid, invalid = [], {}
+        for index, subject in enumerate(subjects):
+            cleaned, errors = self.validate(subject, allow_extra=allow_extra)
+            if errors:
+                invalid[index] = errors
+            else:
+                valid.append(cleaned)
+        return valid, invalid
+
+
+# Schema pk -> CompiledSchema, per process
+_compiled = {}
+
+
+def compile_schema(schema):
+    """
+    The compiled form class and validator of `schema`, built once per schema version.
+
+    Entries are dropped when the schema is saved or deleted in this process;
+    other processes recompile when they load a schema whose version or
+    updated_at differs from the one they compiled.
+    """
+    compiled = _compiled.get(schema.pk)
+    if compiled is None or not compiled.matches(schema):
+        compiled = CompiledSchema(schema)
+        _compiled[schema.pk] = compiled
+        logger.debug(f"Compiled schema {schema.pk} v{schema.version}")
+    return compiled
+
+
+def issue_form_class(schema=None):
+    """CredentialIssueForm with the fields of `schema`, or the plain form without one"""
+    return compile_schema(schema).form_class if schema is not None else CredentialIssueForm
+
+
+def clear_compiled_schemas():
+    _compiled.clear()
+
+
+@receiver(post_save, sender=CredentialSchema)
+@receiver(post_delete, sender=CredentialSchema)
+def _schema_changed(sender, instance, **kwargs):
+    _compiled.pop(instance.pk, None)
@@ -0,0 +1,164 @@
+# credentials/search.py
+# Full-text and faceted credential search over Credential.search_vector
+from django.contrib.postgres.search import SearchQuery, SearchVector, SearchVectorCombinable, SearchVectorField
+from django.db import connection
+from django.db.models import Count, F, Func, OuterRef, Q, Subquery
+from django.db.models.functions import ExtractYear
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .models import Credential
+
+# credentialSubject keys left out of the search document (identifiers and hashes)
+EXCLUDED_SUBJECT_KEYS = ('id', 'documentHash')
+
+# User fields whose changes are copied into the holder's credentials
+HOLDER_FIELDS = ('first_name', 'last_name', 'email', 'username')
+
+# Facet name -> Credential lookup used to filter by the facet
+FACETS = {
+    'status': 'status',
+    'credential_type': 'credential_type',
+    'year': 'created_at__year',
+}
+
+
+class SubjectVector(SearchVectorCombinable, Func):
+    """String and numeric credentialSubject values of vc_json, weight B"""
+    function = 'jsonb_to_tsvector'
+    template = (
+        "setweight(%(function)s('simple', COALESCE(%(expressions)s -> 'credentialSubject', '{}'::jsonb)"
+        + ''.join(f" - '{key}'" for key in EXCLUDED_SUBJECT_KEYS)
+        + ", '[\"string\", \"numeric\"]'), 'B')"
+    )
+    output_field = SearchVectorField()
+    config = None
+
+
+def search_document():
+    """
+    Weighted tsvector for a credential:
+    A - title and holder name, email and username; B - type and credentialSubject values;
+    C - description
+    """
+    return (
+        SearchVector('title', config='english', weight='A')
+        + SearchVector(*[f'holder__{field}' for field in HOLDER_FIELDS], config='simple', weight='A')
+        + SearchVector('credential_type', config='english', weight='B')
+        + SubjectVector('vc_json')
+        + SearchVector('description', config='english', weight='C')
+    )
+
+
+def update_search_vectors(queryset):
+    """
+    Recompute search_vector for the credentials in `queryset` with one UPDATE.
+
+    Works on the historical Credential model too, for migrations.
+
+    Returns:
+        int: number of credentials updated
+    """
+    vectors = queryset.model.objects.filter(pk=OuterRef('pk')).annotate(vector=search_document()).values('vector')[:1]
+    return queryset.update(search_vector=Subquery(vectors))
+
+
+@receiver(post_save, sender=Credential)
+def _credential_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        update_search_vectors(Credential.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender='users.User')
+def _holder_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # Logins save last_login only; skip saves that cannot change the holder's name or email
+    if created or raw or (update_fields is not None and not set(update_fields) & set(HOLDER_FIELDS)):
+        return
+    update_search_vectors(Credential.objects.filter(holder=instance))
+
+
+_trigram_available = None
+
+
+def trigram_available():
+    """Whether pg_trgm is installed (see users migration 0003), checked once per process"""
+    global _trigram_available
+    if _trigram_available is None:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram_available = cursor.fetchone() is not None
+    return _trigram_available
+
+
+def text_filter(text, prefix=''):
+    """
+    Q matching credentials for a free-text query.
+
+    Uses websearch syntax ("quoted phrases", -excluded, or) against both the
+    stemmed and unstemmed parts of the document. With pg_trgm, holders whose
+    email or name is similar to the query (typos, partial addresses) also match.
+    """
+    query = (
+        SearchQuery(text, config='english', search_type='websearch')
+        | SearchQuery(text, config='simple', search_type='websearch')
+    )
+    condition = Q(**{f'{prefix}search_vector': query})
+    if trigram_available():
+        from users.models import User
+
+        holders = User.objects.filter(
+            Q(email__trigram_word_similar=text)
+            | Q(first_name__trigram_word_similar=text)
+            | Q(last_name__trigram_word_similar=text)
+        ).values('pk')
+        condition |= Q(**{f'{prefix}holder__in': holders})
+    return condition
+
+
+def _facet_filter(filters, prefix):
+    condition = Q()
+    for name, value in filters.items():
+        condition &= Q(**{f'{prefix}{FACETS[name]}': value})
+    return condition
+
+
+def clean_filters(params):
+    """Facet filters from request parameters, dropping unknown facets and malformed years"""
+    filters = {name: params.get(name) for name in FACETS if params.get(name)}
+    if 'year' in filters:
+        try:
+            filters['year'] = int(filters['year'])
+        except ValueError:
+            del filters['year']
+    return filters
+
+
+def search_credentials(queryset, text='', filters=None, prefix=''):
+    """
+    Filter `queryset` by a text query and facet values, and count the facets.
+
+    `queryset` is a Credential queryset, or any queryset reaching Credential
+    through `prefix` (e.g. 'credential__' for WalletCredential). Each facet is
+    counted over the text matches filtered by the other facets only, so the
+    alternatives to a selected value stay visible.
+
+    Returns:
+        tuple: (filtered queryset, {facet: [{'value', 'count', 'selected'}, ...]})
+    """
+    filters = filters or {}
+    matches = queryset.filter(text_filter(text, prefix)) if text else queryset
+    results = matches.filter(_facet_filter(filters, prefix))
+
+    facets = {}
+    for name, field in FACETS.items():
+        others = {other: value for other, value in filters.items() if other != name}
+        value = ExtractYear(f'{prefix}created_at') if name == 'year' else F(f'{prefix}{field}')
+        rows = (
+            matches.filter(_facet_filter(others, prefix))
+            .order_by().annotate(value=value).values('value')
+            .annotate(count=Count('pk')).order_by('-count', 'value')
+        )
+        facets[name] = [
+            {'value': row['value'], 'count': row['count'], 'selected': filters.get(name) == row['value']}
+            for row in rows
+        ]
+    return results, facets
@@ -0,0 +1,51 @@
+# credentials/stats.py
+# Verification statistics for dashboards, from rollups and aggregate queries
+from datetime import timedelta
+from django.db.models import Count, Q
+from django.utils import timezone
+from . import rollups
+from .models import VerificationRecord
+
+# Dashboard label -> condition on VerificationRecord.verification_details for failed
+# verifications. Keys missing from the details (e.g. signature_valid for external
+# checks) do not count as an issue.
+VERIFICATION_ISSUES = (
+    ('Invalid Signature', Q(verification_details__signature_valid=False)),
+    ('Not Blockchain Anchored', Q(verification_details__is_anchored=False)),
+    ('Credential Revoked', Q(verification_details__is_revoked=True)),
+    ('Credential Expired', Q(verification_details__is_expired=True)),
+    ('Untrusted Issuer', Q(verification_details__issuer_trusted=False)),
+)
+
+
+def verifier_stats(verifier, top_issues=3):
+    """
+    Counters for a verifier's dashboard.
+
+    Totals come from the daily rollups (credentials/rollups.py); the failure
+    breakdown is one aggregate query over the verifier's failed verifications.
+
+    Returns:
+        dict: total/valid/invalid/pending counts, success_rate (percent, 1 decimal),
+        internal/external counts, counts for today, the last 7 and the last 30 days,
+        and most_common_issues as [(label, count), ...] for failed verifications
+    """
+    now = timezone.now()
+    counts = rollups.summary('VERIFIER', verifier.pk, windows={
+        'today': now,
+        'this_week': now - timedelta(days=7),
+        'this_month': now - timedelta(days=30),
+    })
+    counts['pending'] = counts['total'] - counts['valid'] - counts['invalid']
+
+    issue_counts = VerificationRecord.objects.filter(verifier=verifier, is_valid=False).aggregate(**{
+        f'issue_{index}': Count('pk', filter=condition)
+        for index, (_, condition) in enumerate(VERIFICATION_ISSUES)
+    })
+    issues = [
+        (label, issue_counts[f'issue_{index}'])
+        for index, (label, _) in enumerate(VERIFICATION_ISSUES)
+    ]
+    issues = sorted((issue for issue in issues if issue[1]), key=lambda issue: issue[1], reverse=True)
+    counts['most_common_issues'] = issues[:top_issues]
+    return counts
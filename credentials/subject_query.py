@@ -0,0 +1,161 @@
+# credentials/subject_query.py
+# Queries on credentialSubject values of Credential.vc_json, and per-schema expression indexes for them
+import hashlib
+from functools import reduce
+from operator import or_
+from django.db import connection, models
+from django.db.models import CharField, Func, Q
+from django.db.models.fields.json import KeyTransform
+from django.db.models.lookups import Exact
+from .models import Credential
+
+# CredentialSchema.fields type -> jsonb_typeof of the stored value
+JSON_TYPES = {
+    'str': 'string',
+    'date': 'string',
+    'int': 'number',
+    'float': 'number',
+    'bool': 'boolean',
+}
+
+RANGE_LOOKUPS = ('gt', 'gte', 'lt', 'lte')
+
+# Names of indexes created by create_subject_indexes (outside migrations)
+INDEX_PREFIX = 'subj_'
+
+
+class JSONBTypeof(Func):
+    function = 'jsonb_typeof'
+    output_field = CharField()
+
+
+def subject_value(field):
+    """The jsonb value of credentialSubject.<field>; also the expression of its index"""
+    return KeyTransform(field, KeyTransform('credentialSubject', 'vc_json'))
+
+
+def _json_type(value):
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, (int, float)):
+        return 'number'
+    return 'string'
+
+
+def _json_value(value):
+    # Dates are stored as ISO strings, which order correctly as strings
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def subject_filter(schema=None, **conditions):
+    """
+    Q for credentials whose credentialSubject matches `conditions`, e.g.
+    subject_filter(schema, degree='BSc', gpa__gte=3.5, graduationDate__lt=date(2024, 1, 1)).
+
+    Supported lookups are exact (the default), in, gt, gte, lt and lte.
+    Equality and `in` are containment tests (vc_json @> ...) served by the GIN
+    jsonb_path_ops index. Ranges compare jsonb values of the field's JSON type,
+    so e.g. gpa__lte=2.0 never matches strings or nulls; with a schema they are
+    served by its expression indexes (create_subject_indexes).
+
+    Raises:
+        ValueError: for an unsupported lookup or a field missing from `schema`
+    """
+    condition = Q(schema=schema) if schema is not None else Q()
+    for key, value in conditions.items():
+        field, _, lookup = key.partition('__')
+        lookup = lookup or 'exact'
+        if schema is not None and field not in (schema.fields or {}):
+            raise ValueError(f"Schema {schema} has no field '{field}'")
+
+        if lookup == 'exact':
+            condition &= Q(vc_json__contains={'credentialSubject': {field: _json_value(value)}})
+        elif lookup == 'in':
+            condition &= reduce(or_, [
+                Q(vc_json__contains={'credentialSubject': {field: _json_value(item)}}) for item in value
+            ], Q(pk__in=[]))
+        elif lookup in RANGE_LOOKUPS:
+            json_type = JSON_TYPES.get(schema.fields[field]) if schema is not None else None
+            condition &= Q(**{f'vc_json__credentialSubject__{field}__{lookup}': _json_value(value)})
+            condition &= Q(Exact(JSONBTypeof(subject_value(field)), json_type or _json_type(value)))
+        else:
+            raise ValueError(f"Unsupported lookup '{lookup}' for credentialSubject field '{field}'")
+    return condition
+
+
+def query_credentials(schema=None, queryset=None, **conditions):
+    """Credentials (of `schema`, within `queryset`) whose credentialSubject matches `conditions`"""
+    queryset = Credential.objects.all() if queryset is None else queryset
+    return queryset.filter(subject_filter(schema, **conditions))
+
+
+def _schema_prefix(schema):
+    return f'{INDEX_PREFIX}{schema.pk.hex[:8]}_'
+
+
+def subject_index(schema, field):
+    """Partial expression index on credentialSubject.<field> for the credentials of `schema`"""
+    digest = hashlib.md5(f'{schema.pk}:{field}'.encode()).hexdigest()[:8]
+    return models.Index(
+        subject_value(field),
+        name=f'{_schema_prefix(schema)}{digest}',
+        condition=Q(schema_id=schema.pk),
+    )
+
+
+def existing_subject_indexes():
+    """Names of the credentialSubject indexes currently in the database"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT indexname FROM pg_indexes WHERE tablename = %s AND indexname LIKE %s",
+            [Credential._meta.db_table, f'{INDEX_PREFIX}%'],
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def create_subject_indexes(schema, fields=None, concurrently=True):
+    """
+    Create the expression indexes for `fields` (default: all fields) of `schema`.
+
+    With `concurrently`, indexes are built without blocking writes; this cannot
+    run inside a transaction.
+
+    Returns:
+        list: names of the indexes created (existing ones are skipped)
+    """
+    fields = list(schema.fields or {}) if fields is None else fields
+    unknown = set(fields) - set(schema.fields or {})
+    if unknown:
+        raise ValueError(f"Schema {schema} has no fields {', '.join(sorted(unknown))}")
+
+    existing = existing_subject_indexes()
+    created = []
+    with connection.schema_editor(atomic=not concurrently) as schema_editor:
+        for field in fields:
+            index = subject_index(schema, field)
+            if index.name in existing:
+                continue
+            schema_editor.add_index(Credential, index, concurrently=concurrently)
+            created.append(index.name)
+    return created
+
+
+def drop_subject_indexes(schema, fields=None, concurrently=True):
+    """
+    Drop the expression indexes of `fields` of `schema`, or all of the schema's
+    indexes (including those of fields since removed from it).
+
+    Returns:
+        list: names of the indexes dropped
+    """
+    existing = existing_subject_indexes()
+    if fields is None:
+        names = sorted(name for name in existing if name.startswith(_schema_prefix(schema)))
+    else:
+        names = [subject_index(schema, field).name for field in fields]
+        names = [name for name in names if name in existing]
+
+    with connection.schema_editor(atomic=not concurrently) as schema_editor:
+        for name in names:
+            schema_editor.remove_index(Credential, models.Index(fields=['schema'], name=name), concurrently=concurrently)
+    return names
@@ -1,3 +1,224 @@
+from importlib import import_module
+from django.apps import apps
+from django.db import connection
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from credentials import rollups
+from credentials.models import Credential, CredentialSchema, VerificationRecord, VerificationRollup
+from credentials.schema_compiler import compile_schema, issue_form_class
+from credentials.search import search_credentials
+from credentials.subject_query import create_subject_indexes, drop_subject_indexes, query_credentials
+from credentials.stats import verifier_stats
+from users.models import User
+
+
+class VerifierStatsTestCase(TestCase):
+    def test_counts_from_rollups(self):
+        verifier = User.objects.create_user(username='verifier', password='password', user_type='EMPLOYER')
+        # Platform rollups are updated after commit
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            VerificationRecord.objects.create(verifier=verifier, credential_hash='a' * 64, is_valid=True)
+            VerificationRecord.objects.create(
+                verifier=verifier, credential_hash='b' * 64, is_valid=False, source='EXTERNAL',
+                verification_details={'is_anchored': False, 'is_revoked': True}
+            )
+            VerificationRecord.objects.create(
+                verifier=verifier, credential_hash='c' * 64, is_valid=False,
+                verification_details={'signature_valid': False, 'is_anchored': False, 'is_revoked': False}
+            )
+            self.assertFalse(VerificationRollup.objects.filter(scope='PLATFORM').exists())
+        self.assertEqual(len(callbacks), 3)
+        self.assertEqual(rollups.summary('PLATFORM')['total'], 3)
+
+        # One query for the rollups, one for the failure breakdown
+        with self.assertNumQueries(2):
+            stats = verifier_stats(verifier)
+
+        self.assertEqual((stats['total'], stats['valid'], stats['invalid']), (3, 1, 2))
+        self.assertEqual((stats['internal'], stats['external'], stats['today']), (2, 1, 3))
+        self.assertEqual(stats['success_rate'], 33.3)
+        self.assertEqual(stats['most_common_issues'][0], ('Not Blockchain Anchored', 2))
+        self.assertEqual(
+            sorted(stats['most_common_issues'][1:]),
+            [('Credential Revoked', 1), ('Invalid Signature', 1)]
+        )
+
+        # Deleting a verification is reflected, and a rebuild gives the same totals
+        with self.captureOnCommitCallbacks(execute=True):
+            VerificationRecord.objects.filter(credential_hash='a' * 64).delete()
+        incremental = list(VerificationRollup.objects.order_by('scope', 'period').values_list('scope', 'period', 'total', 'valid'))
+        self.assertIn(('VERIFIER', 'DAY', 2, 0), incremental)
+        rollups.rebuild()
+        rebuilt = list(VerificationRollup.objects.order_by('scope', 'period').values_list('scope', 'period', 'total', 'valid'))
+        self.assertEqual(rebuilt, incremental)
+
+    def test_issuer_rollups_survive_credential_deletion(self):
+        issuer = User.objects.create_user(username='university', password='password', user_type='INSTITUTION')
+        holder = User.objects.create_user(username='student', password='password', user_type='STUDENT')
+        verifier = User.objects.create_user(username='verifier', password='password', user_type='EMPLOYER')
+        credential = Credential.objects.create(
+            issuer=issuer, holder=holder, title='Diploma', credential_type='DEGREE', vc_json={'id': 'diploma'}
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            VerificationRecord.objects.create(
+                verifier=verifier, credential=credential, credential_hash=credential.vc_hash, is_valid=True
+            )
+        self.assertEqual(rollups.summary('ISSUER', issuer.pk)['total'], 1)
+
+        # Deleting the credential nulls the record's link without signals; the issuer count stays
+        credential.delete()
+        incremental = list(VerificationRollup.objects.order_by('scope', 'period').values_list('scope', 'period', 'total'))
+        rollups.rebuild()
+        rebuilt = list(VerificationRollup.objects.order_by('scope', 'period').values_list('scope', 'period', 'total'))
+        self.assertEqual(rebuilt, incremental)
+        self.assertEqual(rollups.summary('ISSUER', issuer.pk)['total'], 1)
+
+
+class CredentialSearchTestCase(TestCase):
+    def setUp(self):
+        self.issuer = User.objects.create_user(username='university', password='password', user_type='INSTITUTION')
+        holder = User.objects.create_user(
+            username='amara', password='password', user_type='STUDENT', first_name='Amara', last_name='Okafor'
+        )
+        other = User.objects.create_user(username='lee', password='password', user_type='STUDENT', first_name='Lee')
+        Credential.objects.create(
+            issuer=self.issuer, holder=holder, title='Bachelor of Science', credential_type='Degree', status='ISSUED',
+            vc_json={'credentialSubject': {'id': 'did:example:amara', 'major': 'Computer Science', 'gpa': 3.7}}
+        )
+        Credential.objects.create(
+            issuer=self.issuer, holder=other, title='Data Engineering Certificate', credential_type='Certificate',
+            vc_json={'credentialSubject': {'id': 'did:example:lee', 'track': 'Pipelines'}}
+        )
+
+    def test_search_and_facets(self):
+        credentials = Credential.objects.filter(issuer=self.issuer)
+
+        def titles(text='', filters=None):
+            results, _ = search_credentials(credentials, text, filters)
+            return sorted(results.values_list('title', flat=True))
+
+        # Holder name, stemmed title words and credentialSubject values are searchable
+        self.assertEqual(titles('okafor'), ['Bachelor of Science'])
+        self.assertEqual(titles('certificates'), ['Data Engineering Certificate'])
+        self.assertEqual(titles('computer'), ['Bachelor of Science'])
+        self.assertEqual(titles('did:example:lee'), [])
+        self.assertEqual(titles(filters={'status': 'DRAFT'}), ['Data Engineering Certificate'])
+
+        # Each facet ignores its own selection
+        _, facets = search_credentials(credentials, filters={'status': 'ISSUED'})
+        self.assertEqual({row['value']: row['count'] for row in facets['status']}, {'ISSUED': 1, 'DRAFT': 1})
+        self.assertEqual([row['value'] for row in facets['credential_type']], ['Degree'])
+
+        # Renaming the holder updates their credentials' search vectors
+        lee = User.objects.get(username='lee')
+        lee.last_name = 'Nakamura'
+        lee.save()
+        self.assertEqual(titles('nakamura'), ['Data Engineering Certificate'])
+
+    def test_admin_search(self):
+        other_issuer = User.objects.create_user(
+            username='polytechnic', email='registrar@poly.example', password='password', user_type='INSTITUTION'
+        )
+        Credential.objects.create(
+            issuer=other_issuer, holder=self.issuer, title='Welding Diploma', credential_type='Diploma',
+            vc_json={'credentialSubject': {}}
+        )
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+
+        def titles(term):
+            response = self.client.get(reverse('admin:credentials_credential_changelist'), {'q': term})
+            return sorted(credential.title for credential in response.context['cl'].result_list)
+
+        # Issuers are matched by username or email, other fields through the search document
+        self.assertEqual(titles('univers'), ['Bachelor of Science', 'Data Engineering Certificate'])
+        self.assertEqual(titles('poly.example'), ['Welding Diploma'])
+        self.assertEqual(titles('okafor'), ['Bachelor of Science'])
+
+    def test_index_existing_credentials(self):
+        # Migration 0011 indexes the credentials that predate the search vector
+        migration = import_module('credentials.migrations.0011_credential_search_vector')
+        Credential.objects.update(search_vector=None)
+        migration.populate_search_vectors(apps, None)
+        self.assertFalse(Credential.objects.filter(search_vector__isnull=True).exists())
+        results, _ = search_credentials(Credential.objects.all(), 'okafor')
+        self.assertEqual(list(results.values_list('title', flat=True)), ['Bachelor of Science'])
+
+
+class SubjectQueryTestCase(TestCase):
+    def setUp(self):
+        issuer = User.objects.create_user(username='registry', password='password', user_type='INSTITUTION')
+        holder = User.objects.create_user(username='graduate', password='password', user_type='STUDENT')
+        self.schema = CredentialSchema.objects.create(
+            name='Degree', fields={'degree': 'str', 'gpa': 'float'}, created_by=issuer
+        )
+        for title, subject in (
+            ('First', {'degree': 'BSc', 'gpa': 3.7}),
+            ('Second', {'degree': 'BA', 'gpa': 2.5}),
+            ('Third', {'degree': 'BSc', 'gpa': ''}),
+        ):
+            Credential.objects.create(
+                issuer=issuer, holder=holder, schema=self.schema, title=title, credential_type='Degree',
+                vc_json={'credentialSubject': {'id': f'did:example:{title}', **subject}}
+            )
+
+    def titles(self, **conditions):
+        return sorted(query_credentials(self.schema, **conditions).values_list('title', flat=True))
+
+    def test_query_and_indexes(self):
+        self.assertEqual(self.titles(degree='BSc'), ['First', 'Third'])
+        self.assertEqual(self.titles(degree__in=['BA', 'MSc']), ['Second'])
+        # Ranges only match values of the field's JSON type, not the empty string
+        self.assertEqual(self.titles(gpa__lte=3.0), ['Second'])
+        self.assertEqual(self.titles(degree='BSc', gpa__gt=3), ['First'])
+        with self.assertRaises(ValueError):
+            self.titles(major='CS')
+
+        with connection.cursor() as cursor:
+            # DDL cannot run with the test transaction's deferred FK checks pending
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+            created = create_subject_indexes(self.schema, fields=['gpa'], concurrently=False)
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        self.assertIn(created[0], query_credentials(self.schema, gpa__gte=3.0).explain())
+        self.assertEqual(drop_subject_indexes(self.schema, concurrently=False), created)
+
+
+class SchemaCompilerTestCase(TestCase):
+    def setUp(self):
+        issuer = User.objects.create_user(username='faculty', password='password', user_type='INSTITUTION')
+        self.schema = CredentialSchema.objects.create(
+            name='Transcript', created_by=issuer,
+            fields={'degree': 'str', 'credits': 'int', 'gpa': 'float', 'awarded': 'date', 'honours': 'bool'},
+        )
+
+    def test_validator_matches_form(self):
+        compiled = compile_schema(self.schema)
+        cleaned, errors = compiled.validate({
+            'id': 'did:example:1', 'degree': ' BSc ', 'credits': '120', 'gpa': 3.5, 'awarded': '2024-06-30',
+        })
+        self.assertEqual(errors, {})
+        self.assertEqual(cleaned, {
+            'id': 'did:example:1', 'degree': 'BSc', 'credits': 120, 'gpa': 3.5,
+            'awarded': '2024-06-30', 'honours': False,
+        })
+
+        _, errors = compiled.validate({'credits': True, 'gpa': 4.5, 'awarded': '30/06/2024', 'major': 'CS'})
+        self.assertEqual(set(errors), {'credits', 'gpa', 'awarded', 'major'})
+        valid, invalid = compiled.validate_many([{'gpa': 2.0}, {'gpa': 'x'}])
+        self.assertEqual(len(valid), 1)
+        self.assertEqual(list(invalid), [1])
+
+        form = issue_form_class(self.schema)(data={'gpa': '4.5', 'credits': '120'})
+        self.assertFalse(form.is_valid())
+        self.assertIn('gpa', form.errors)
+
+    def test_compiled_once_per_schema_version(self):
+        compiled = compile_schema(self.schema)
+        self.assertIs(compile_schema(CredentialSchema.objects.get(pk=self.schema.pk)), compiled)
+
+        self.schema.fields = {'degree': 'str'}
+        self.schema.save()
+        recompiled = compile_schema(self.schema)
+        self.assertIsNot(recompiled, compiled)
+        self.assertEqual(list(recompiled.form_class.base_fields)[-1], 'degree')
+        self.assertNotIn('gpa', recompiled.form_class.base_fields)
@@ -2,14 +2,22 @@
 import hashlib
 import re
 import json
+import time
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
+from django.db import transaction
 from .models import Credential, CredentialSchema, VerificationRecord
-from .forms import CredentialSchemaForm, CredentialIssueForm, CredentialRevokeForm
+from .forms import CredentialSchemaForm, CredentialRevokeForm
+from .schema_compiler import compile_schema, issue_form_class
+from .search import clean_filters, search_credentials
+from .stats import verifier_stats
+from AuthentiCred.db_router import replica_reads
+from AuthentiCred.pagination import approximate_count, paginate_request
 from users.models import User
-from blockchain.services import BlockchainService
+from blockchain.services import BlockchainService, attach_chain_status
+from blockchain.metrics import CREDENTIALS_ISSUED, CREDENTIALS_REVOKED, observe_verification
 from blockchain.tasks import anchor_credential_task, revoke_credential_task
 from blockchain.utils.task_runner import execute_task_with_fallback, get_task_status_message
 from blockchain.utils.vc_proofs import sign_json_ld, verify_json_ld
@@ -47,7 +55,11 @@ def verify_credential(request):
             
             # Try to find credential in database by hash
             try:
-                credential = Credential.objects.get(vc_hash=vc_hash)
+                with replica_reads():
+                    credential = Credential.objects.filter(vc_hash=vc_hash).first()
+                if credential is None:
+                    # Not replicated yet if just issued
+                    credential = Credential.objects.get(vc_hash=vc_hash)
                 print(f"Found credential in database: {credential.id} with status: {credential.status}")
                 return show_verification_result(request, credential)
             except Credential.DoesNotExist:
@@ -67,6 +79,7 @@ def verify_credential(request):
     return render(request, 'credentials/verify_credential.html', {'form': form})
 
 def show_verification_result(request, credential):
+    started = time.perf_counter()
     blockchain_service = BlockchainService()
     
     # 1. Verify cryptographic signature
@@ -132,6 +145,7 @@ def show_verification_result(request, credential):
         is_issued and
         document_integrity_valid
     )
+    observe_verification('internal', overall_valid, time.perf_counter() - started)
     
     # Create verification record if user is logged in
     if request.user.is_authenticated:
@@ -168,6 +182,7 @@ def show_verification_result(request, credential):
 
 def verify_external_credential(request, vc_hash):
     """Handle verification for credentials not in our database"""
+    started = time.perf_counter()
     blockchain_service = BlockchainService()
     
     # 1. Check if anchored on blockchain
@@ -187,6 +202,7 @@ def verify_external_credential(request, vc_hash):
     is_issued = None  # Unknown for external credentials
     
     overall_valid = is_anchored  # Only anchoring can be verified
+    observe_verification('external', overall_valid, time.perf_counter() - started)
     
     # Create verification record if user is logged in
     if request.user.is_authenticated:
@@ -260,7 +276,7 @@ def issue_credential(request, schema_id=None):
         schema = get_object_or_404(CredentialSchema, id=schema_id, created_by=request.user)
     
     if request.method == 'POST':
-        form = CredentialIssueForm(request.POST, request.FILES, issuer=request.user, initial={'schema': schema})
+        form = issue_form_class(schema)(request.POST, request.FILES, issuer=request.user)
         if form.is_valid():
             # Find holder by email
             holder_email = form.cleaned_data['holder_email']
@@ -273,8 +289,9 @@ def issue_credential(request, schema_id=None):
             # Build credential subject
             subject_data = {"id": holder.did}  # Use holder's DID
             if schema and schema.fields:
-                for field_name in schema.fields.keys():
-                    subject_data[field_name] = form.cleaned_data.get(field_name, "")
+                compiled = compile_schema(schema)
+                subject, _ = compiled.validate({name: form.cleaned_data.get(name) for name in compiled.fields})
+                subject_data.update(subject)
             # Ensure issuer has a wallet
             if not hasattr(request.user, 'wallet'):
                 from blockchain.utils.crypto import generate_key_pair
@@ -379,24 +396,26 @@ def issue_credential(request, schema_id=None):
                 messages.success(request, 'Credential saved as draft!')
                 return redirect('issued_credentials')
             else:
-                # Issue the credential
-                if credential.issue():
-                    # Add to holder's wallet
-                    WalletCredential.objects.create(
-                        wallet=holder.wallet,
-                        credential=credential
-                    )
-                    
-                    # Anchor to blockchain using fallback mechanism (Celery first, then direct execution)
-                    try:
-                        task_result = execute_task_with_fallback(anchor_credential_task, credential.vc_hash)
-                        status_message = get_task_status_message(task_result)
-                        if task_result['success']:
-                            messages.info(request, status_message)
-                        else:
-                            messages.warning(request, status_message)
-                    except Exception as e:
-                        messages.warning(request, f"Credential issued but anchoring failed: {str(e)}")
+                # Issue the credential, add it to the holder's wallet and queue anchoring
+                # in one transaction, so the anchor task is only published once committed
+                with transaction.atomic():
+                    issued = credential.issue()
+                    if issued:
+                        WalletCredential.objects.create(
+                            wallet=holder.wallet,
+                            credential=credential
+                        )
+                        task_result = execute_task_with_fallback(
+                            anchor_credential_task, credential.vc_hash,
+                            idempotency_key=f"anchor_credential:{credential.vc_hash}"
+                        )
+                if issued:
+                    CREDENTIALS_ISSUED.inc()
+                    status_message = get_task_status_message(task_result)
+                    if task_result['success']:
+                        messages.info(request, status_message)
+                    else:
+                        messages.warning(request, status_message)
                     
                     messages.success(request, 'Credential issued successfully!')
                     return redirect('issued_credentials')
@@ -406,7 +425,7 @@ def issue_credential(request, schema_id=None):
             messages.error(request, 'Please correct the errors below')
     else:
         initial = {'expiration_date': timezone.now() + timedelta(days=365)}
-        form = CredentialIssueForm(initial=initial, issuer=request.user)
+        form = issue_form_class(schema)(initial=initial, issuer=request.user)
     
     return render(request, 'credentials/issue_credential.html', {
         'form': form,
@@ -440,8 +459,25 @@ def issued_credentials(request):
         messages.error(request, "Only institutions can view issued credentials")
         return redirect('dashboard')
     
-    credentials = Credential.objects.filter(issuer=request.user).order_by('-issued_at')
-    return render(request, 'credentials/issued_credentials.html', {'credentials': credentials})
+    # Search and facet filters, then newest first, one keyset page at a time;
+    # the signed VC JSON is not needed for the list
+    query = request.GET.get('q', '').strip()
+    filters = clean_filters(request.GET)
+    credentials, facets = search_credentials(Credential.objects.filter(issuer=request.user), query, filters)
+    credentials = credentials.select_related('holder', 'issuer').defer('vc_json', 'search_vector')
+    page = paginate_request(request, credentials, ('-created_at', '-id'), per_page=25)
+    total, total_exact = approximate_count(credentials)
+    # On-chain status of the whole page in one batch of reads
+    attach_chain_status(page)
+    return render(request, 'credentials/issued_credentials.html', {
+        'credentials': page,
+        'page': page,
+        'total_credentials': total,
+        'total_exact': total_exact,
+        'query': query,
+        'filters': filters,
+        'facets': facets,
+    })
 
 @login_required
 def revoke_credential(request, credential_id):
@@ -451,17 +487,20 @@ def revoke_credential(request, credential_id):
         form = CredentialRevokeForm(request.POST)
         if form.is_valid():
             reason = form.cleaned_data['reason']
-            if credential.revoke(reason=reason):
-                # Revoke on blockchain using fallback mechanism (Celery first, then direct execution)
-                try:
-                    task_result = execute_task_with_fallback(revoke_credential_task, str(credential.id))
-                    status_message = get_task_status_message(task_result)
-                    if task_result['success']:
-                        messages.info(request, status_message)
-                    else:
-                        messages.warning(request, status_message)
-                except Exception as e:
-                    messages.warning(request, f"Credential revoked but revocation failed: {str(e)}")
+            with transaction.atomic():
+                revoked = credential.revoke(reason=reason)
+                if revoked:
+                    task_result = execute_task_with_fallback(
+                        revoke_credential_task, str(credential.id),
+                        idempotency_key=f"revoke_credential:{credential.id}"
+                    )
+            if revoked:
+                CREDENTIALS_REVOKED.inc()
+                status_message = get_task_status_message(task_result)
+                if task_result['success']:
+                    messages.info(request, status_message)
+                else:
+                    messages.warning(request, status_message)
                 
                 messages.success(request, 'Credential revoked successfully')
                 return redirect('issued_credentials')
@@ -561,7 +600,7 @@ def edit_credential(request, credential_id):
         return redirect('credential_detail', credential_id=credential.id)
     
     if request.method == 'POST':
-        form = CredentialIssueForm(request.POST, request.FILES, issuer=request.user, instance=credential)
+        form = issue_form_class(credential.schema)(request.POST, request.FILES, issuer=request.user, instance=credential)
         if form.is_valid():
             # Update credential fields
             credential.title = form.cleaned_data['title']
@@ -584,8 +623,9 @@ def edit_credential(request, credential_id):
             # Update credential subject data if schema fields changed
             if credential.schema and credential.schema.fields:
                 subject_data = {"id": credential.holder.did}
-                for field_name in credential.schema.fields.keys():
-                    subject_data[field_name] = form.cleaned_data.get(field_name, "")
+                compiled = compile_schema(credential.schema)
+                subject, _ = compiled.validate({name: form.cleaned_data.get(name) for name in compiled.fields})
+                subject_data.update(subject)
                 
                 # Update the VC JSON
                 credential.vc_json['credentialSubject'] = subject_data
@@ -657,7 +697,7 @@ def edit_credential(request, credential_id):
                 if field_name in subject_data:
                     initial_data[field_name] = subject_data[field_name]
         
-        form = CredentialIssueForm(initial=initial_data, issuer=request.user)
+        form = issue_form_class(credential.schema)(initial=initial_data, issuer=request.user)
     
     return render(request, 'credentials/edit_credential.html', {
         'form': form,
@@ -676,24 +716,26 @@ def issue_draft_credential(request, credential_id):
     
     if request.method == 'POST':
         try:
-            # Issue the credential
-            if credential.issue():
-                # Add to holder's wallet
-                WalletCredential.objects.create(
-                    wallet=credential.holder.wallet,
-                    credential=credential
-                )
-                
-                # Anchor to blockchain using fallback mechanism (Celery first, then direct execution)
-                try:
-                    task_result = execute_task_with_fallback(anchor_credential_task, credential.vc_hash)
-                    status_message = get_task_status_message(task_result)
-                    if task_result['success']:
-                        messages.info(request, status_message)
-                    else:
-                        messages.warning(request, status_message)
-                except Exception as e:
-                    messages.warning(request, f"Credential issued but anchoring failed: {str(e)}")
+            # Issue the credential, add it to the holder's wallet and queue anchoring
+            # in one transaction, so the anchor task is only published once committed
+            with transaction.atomic():
+                issued = credential.issue()
+                if issued:
+                    WalletCredential.objects.create(
+                        wallet=credential.holder.wallet,
+                        credential=credential
+                    )
+                    task_result = execute_task_with_fallback(
+                        anchor_credential_task, credential.vc_hash,
+                        idempotency_key=f"anchor_credential:{credential.vc_hash}"
+                    )
+            if issued:
+                CREDENTIALS_ISSUED.inc()
+                status_message = get_task_status_message(task_result)
+                if task_result['success']:
+                    messages.info(request, status_message)
+                else:
+                    messages.warning(request, status_message)
                 
                 messages.success(request, 'Credential issued successfully!')
                 return redirect('issued_credentials')
@@ -743,27 +785,21 @@ def verification_history(request):
         return redirect('dashboard')
     
     # Get verification records for the current user
-    verifications = VerificationRecord.objects.filter(verifier=request.user).select_related('credential', 'credential__issuer', 'credential__holder').order_by('-verification_date')
-    
-    # Pagination
-    from django.core.paginator import Paginator
-    paginator = Paginator(verifications, 10)  # Show 10 verifications per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    verifications = VerificationRecord.objects.filter(verifier=request.user).select_related(
+        'credential', 'credential__issuer', 'credential__holder'
+    ).defer('verification_details', 'credential__vc_json', 'credential__search_vector')
+    page = paginate_request(request, verifications, ('-verification_date', '-id'), per_page=10)
     
     # Get statistics
-    total_verifications = verifications.count()
-    valid_verifications = verifications.filter(is_valid=True).count()
-    invalid_verifications = verifications.filter(is_valid=False).count()
-    success_rate = (valid_verifications / total_verifications * 100) if total_verifications > 0 else 0
+    stats = verifier_stats(request.user)
     
     return render(request, 'credentials/verification_history.html', {
-        'page_obj': page_obj,
-        'verifications': page_obj,
-        'total_verifications': total_verifications,
-        'valid_verifications': valid_verifications,
-        'invalid_verifications': invalid_verifications,
-        'success_rate': round(success_rate, 1)
+        'page': page,
+        'verifications': page,
+        'total_verifications': stats['total'],
+        'valid_verifications': stats['valid'],
+        'invalid_verifications': stats['invalid'],
+        'success_rate': stats['success_rate']
     })
 
 @login_required
@@ -797,18 +833,23 @@ def shared_credentials(request):
     
     # Get shared credentials (WalletCredentials that are shared)
     from wallets.models import WalletCredential
-    shared_credentials = WalletCredential.objects.filter(
-        is_archived=False
-    ).select_related('credential', 'credential__issuer', 'credential__holder').order_by('-added_at')
-    
-    # Pagination
-    from django.core.paginator import Paginator
-    paginator = Paginator(shared_credentials, 10)  # Show 10 shared credentials per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    query = request.GET.get('q', '').strip()
+    filters = clean_filters(request.GET)
+    shared_credentials, facets = search_credentials(
+        WalletCredential.objects.filter(is_archived=False), query, filters, prefix='credential__'
+    )
+    shared_credentials = shared_credentials.select_related(
+        'credential', 'credential__issuer', 'credential__holder'
+    ).defer('credential__vc_json', 'credential__search_vector')
+    page = paginate_request(request, shared_credentials, ('-added_at', '-id'), per_page=10)
+    total, total_exact = approximate_count(shared_credentials)
     
     return render(request, 'credentials/shared_credentials.html', {
-        'page_obj': page_obj,
-        'shared_credentials': page_obj,
-        'total_shared': shared_credentials.count(),
+        'page': page,
+        'shared_credentials': page,
+        'total_shared': total,
+        'total_exact': total_exact,
+        'query': query,
+        'filters': filters,
+        'facets': facets,
     })
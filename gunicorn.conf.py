@@ -0,0 +1,23 @@
+# gunicorn.conf.py
+# Loaded automatically by gunicorn from the working directory
+import os
+import shutil
+
+
+def on_starting(server):
+    # Samples left by a previous run would be added to the new counters
+    multiproc_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if multiproc_dir:
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def post_fork(server, worker):
+    # Read by settings (loaded after the fork) to size the worker's database pool
+    os.environ['DATABASE_POOL_CONCURRENCY'] = str(server.cfg.threads)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
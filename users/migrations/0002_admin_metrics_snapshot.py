@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdminMetricsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.JSONField(default=dict)),
+                ('refreshed_at', models.DateTimeField()),
+                ('duration_ms', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='institutionprofile',
+            index=models.Index(fields=['is_trusted', '-created_at', '-id'], name='institution_trusted_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:04
+
+import logging
+
+from django.db import DatabaseError, migrations, transaction
+
+logger = logging.getLogger(__name__)
+
+# Trigram indexes for fuzzy holder lookup (credentials/search.py) and admin user search.
+# pg_trgm ships with PostgreSQL's contrib package; where it is not installed, or the
+# migrating role may not create it, the indexes are skipped and credential search uses
+# the full-text index alone.
+TRIGRAM_INDEXES = {
+    'users_user_email_trgm_idx': 'email',
+    'users_user_username_trgm_idx': 'username',
+    'users_user_first_name_trgm_idx': 'first_name',
+    'users_user_last_name_trgm_idx': 'last_name',
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT installed_version FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        row = cursor.fetchone()
+    if row is None:
+        logger.warning("pg_trgm is not available; skipping trigram indexes")
+        return
+    if row[0] is None:
+        try:
+            # Savepoint, so a refused CREATE EXTENSION does not abort the migration's transaction
+            with transaction.atomic(using=connection.alias):
+                schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except DatabaseError as e:
+            logger.warning(f"Could not create pg_trgm ({str(e).strip()}); skipping trigram indexes")
+            return
+    for name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{name}" ON "users_user" USING gin ("{column}" gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_admin_metrics_snapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
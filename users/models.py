@@ -77,4 +77,22 @@ class InstitutionProfile(models.Model):
     
     def __str__(self):
         return self.name
-    
\ No newline at end of file
+    
+    class Meta:
+        indexes = [
+            # Keyset-ordered pending/approved lists on the admin dashboard
+            models.Index(fields=['is_trusted', '-created_at', '-id'], name='institution_trusted_idx'),
+        ]
+
+
+class AdminMetricsSnapshot(models.Model):
+    """
+    Platform statistics for the admin dashboard, recomputed periodically by
+    users.tasks.refresh_admin_snapshot (users/snapshot.py). Holds a single row.
+    """
+    data = models.JSONField(default=dict)
+    refreshed_at = models.DateTimeField()
+    duration_ms = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Admin metrics at {self.refreshed_at}"
@@ -0,0 +1,10 @@
+# users/tasks.py
+from celery import shared_task
+
+from .snapshot import refresh_snapshot
+
+
+@shared_task
+def refresh_admin_snapshot():
+    """Recompute the admin dashboard statistics (users/snapshot.py)"""
+    return refresh_snapshot().duration_ms
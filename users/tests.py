@@ -1,3 +1,148 @@
-from django.test import TestCase
+from datetime import timedelta
+import os
+import runpy
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from psycopg_pool import ConnectionPool
+
+from AuthentiCred import db_pool, db_router
+from AuthentiCred.pagination import approximate_count, keyset_paginate
+from users.models import InstitutionProfile, User
+from users.snapshot import get_snapshot
+
+
+class AdminDashboardTestCase(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        for index in range(5):
+            user = User.objects.create_user(username=f'issuer{index}', password='password', user_type='INSTITUTION')
+            # Two institutions share a timestamp so the id tiebreaker is exercised
+            created_at = now - timedelta(days=min(index, 3))
+            InstitutionProfile.objects.create(user=user, name=f'Institution {index}', created_at=created_at)
+
+    def test_keyset_pages_cover_every_row_once(self):
+        queryset = InstitutionProfile.objects.filter(is_trusted=False)
+        ordering = ('-created_at', '-id')
+        expected = list(queryset.order_by(*ordering))
+
+        seen = []
+        page = keyset_paginate(queryset, ordering, per_page=2)
+        self.assertFalse(page.has_previous())
+        while True:
+            seen.extend(page)
+            if not page.has_next():
+                break
+            page = keyset_paginate(queryset, ordering, per_page=2, after=page.next_cursor)
+        self.assertEqual(seen, expected)
+
+        # Paging back from the last page returns the page before it
+        previous = keyset_paginate(queryset, ordering, per_page=2, before=page.previous_cursor)
+        self.assertEqual(list(previous), expected[2:4])
+        self.assertEqual(list(keyset_paginate(queryset, ordering, per_page=2, after='not-a-cursor')), expected[:2])
+
+    def test_approximate_count_is_exact_below_limit(self):
+        queryset = InstitutionProfile.objects.all()
+        self.assertEqual(approximate_count(queryset, exact_limit=10), (5, True))
+        count, exact = approximate_count(queryset, exact_limit=2)
+        self.assertFalse(exact)
+        self.assertGreater(count, 2)
+        # Estimates of filtered querysets bind the query parameters
+        count, exact = approximate_count(queryset.filter(is_trusted=False, name__startswith='Institution'), exact_limit=2)
+        self.assertFalse(exact)
+        self.assertGreater(count, 2)
+
+    def test_snapshot_created_on_first_read(self):
+        snapshot, stale = get_snapshot()
+        self.assertFalse(stale)
+        self.assertEqual(snapshot.data['pending_institution_count'], 5)
+        self.assertEqual(snapshot.data['total_users'], 5)
+
+        # Later reads return the stored snapshot without recounting
+        with self.assertNumQueries(1):
+            get_snapshot()
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'], DATABASE_REPLICA_MAX_LAG_SECONDS=5)
+class ReplicaRouterTestCase(SimpleTestCase):
+    def setUp(self):
+        self.router = db_router.ReplicaRouter()
+        self.set_lag(0.5)
+        self.addCleanup(db_router.clear_lag_checks)
+
+    def set_lag(self, lag):
+        # A fresh check result, so the router does not connect to the replica
+        db_router._lag_checks['replica_1'] = (time.monotonic(), lag)
+
+    def test_reads_use_healthy_replica_inside_scope(self):
+        self.assertEqual(self.router.db_for_read(User), 'default')
+        with db_router.replica_reads():
+            self.assertEqual(self.router.db_for_read(User), 'replica_1')
+            with db_router.use_primary():
+                self.assertEqual(self.router.db_for_read(User), 'default')
+            self.set_lag(30)
+            self.assertEqual(self.router.db_for_read(User), 'default')
+            self.set_lag(None)
+            self.assertEqual(self.router.db_for_read(User), 'default')
+
+        self.set_lag(0.5)
+        with db_router.replica_reads():
+            self.assertEqual(self.router.db_for_write(User), 'default')
+            # Reads after a write in the same scope see it on the primary
+            self.assertEqual(self.router.db_for_read(User), 'default')
+        with db_router.replica_reads():
+            self.assertEqual(self.router.db_for_read(User), 'replica_1')
+        self.assertFalse(self.router.allow_migrate('replica_1', 'users'))
+
+    def test_middleware_pins_writers_to_primary(self):
+        factory = RequestFactory()
+
+        def read_view(request):
+            return HttpResponse(self.router.db_for_read(User))
+
+        def writing_view(request):
+            self.router.db_for_write(User)
+            return HttpResponse(self.router.db_for_read(User))
+
+        response = db_router.ReplicaRoutingMiddleware(read_view)(factory.get('/'))
+        self.assertEqual(response.content, b'replica_1')
+        self.assertNotIn(db_router.PRIMARY_COOKIE, response.cookies)
+
+        for view, request in ((writing_view, factory.get('/')), (read_view, factory.post('/'))):
+            response = db_router.ReplicaRoutingMiddleware(view)(request)
+            self.assertEqual(response.content, b'default')
+            self.assertIn(db_router.PRIMARY_COOKIE, response.cookies)
+
+        request = factory.get('/')
+        request.COOKIES[db_router.PRIMARY_COOKIE] = '1'
+        self.assertEqual(db_router.ReplicaRoutingMiddleware(read_view)(request).content, b'default')
+
+
+class ReplicaLagTestCase(TestCase):
+    def test_primary_has_no_lag(self):
+        self.assertEqual(db_router.replica_lag('default'), 0.0)
+
+
+class DatabasePoolSizeTestCase(SimpleTestCase):
+    @override_settings(DATABASE_POOL_MAX_SIZE=0, DATABASE_POOL_MIN_SIZE=2, DATABASE_POOL_HEADROOM=1)
+    def test_size_follows_concurrency(self):
+        self.assertEqual(db_pool.pool_max_size(1), 2)
+        self.assertEqual(db_pool.pool_max_size(8), 9)
+        with self.settings(DATABASE_POOL_MAX_SIZE=4):
+            self.assertEqual(db_pool.pool_max_size(8), 4)
+
+    def test_pool_checks_connections(self):
+        with mock.patch.dict(os.environ, {'DATABASE_POOL_MODE': 'pool'}):
+            configured = runpy.run_path(os.path.join(settings.BASE_DIR, 'AuthentiCred', 'settings.py'))
+        settings_dict = {**connections['default'].settings_dict, **configured['DATABASES']['default']}
+        wrapper = connections['default'].__class__(settings_dict, alias='pool_check')
+        try:
+            # The pool is built without opening it, with connections checked on checkout
+            self.assertIs(wrapper.pool._check, ConnectionPool.check_connection)
+        finally:
+            wrapper.close_pool()
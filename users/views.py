@@ -2,20 +2,22 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
+from django.conf import settings
 from django.views.decorators.csrf import ensure_csrf_cookie, csrf_protect
 from django.urls import reverse
 from django.http import JsonResponse
-from django.db.models import Count, Q
+from django.db import transaction
 from .forms import CustomUserCreationForm, CustomAuthenticationForm, EditProfileForm, ChangePasswordForm, DeleteAccountForm, InstitutionSettingsForm, ContactForm
 from .models import User, InstitutionProfile
 from .constants import USER_TYPE_CHOICES
-from credentials.models import Credential, VerificationRecord
-from blockchain.models import DIDRegistration, OnChainTransaction
+from credentials.models import VerificationRecord
+from blockchain.models import DIDRegistration
 from blockchain.tasks import register_did_task, process_did_registration_confirmation
+from blockchain.utils.archive import recent_transactions
 from blockchain.utils.task_runner import execute_task_with_fallback, get_task_status_message
-from django.utils import timezone
-from datetime import timedelta
 from blockchain.utils.crypto import generate_key_pair
+from AuthentiCred.pagination import paginate_request
+from .snapshot import get_snapshot
 from blockchain.services import BlockchainService
 import logging
 
@@ -45,19 +47,22 @@ def register_view(request):
 
                 if user.user_type == 'INSTITUTION':
                     try:
-                        # Create institution profile first
-                        profile = InstitutionProfile.objects.create(user=user)
-                        
-                        # Register DID using fallback mechanism (Celery first, then direct execution)
-                        task_result = execute_task_with_fallback(register_did_task, user.did, user.public_key)
-                        
-                        # Create DID registration record
-                        DIDRegistration.objects.create(
-                            did=user.did,
-                            public_key=user.public_key,
-                            institution=profile,
-                            transaction=None  # Will be updated when task completes
-                        )
+                        # Profile, DID registration row and outbox entries commit together;
+                        # the tasks are only published once the registration row exists
+                        with transaction.atomic():
+                            profile = InstitutionProfile.objects.create(user=user)
+                            DIDRegistration.objects.create(
+                                did=user.did,
+                                public_key=user.public_key,
+                                institution=profile,
+                                transaction=None  # Linked by register_did_task
+                            )
+                            task_result = execute_task_with_fallback(
+                                register_did_task, user.did, user.public_key,
+                                idempotency_key=f"register_did:{user.did}"
+                            )
+                            # Schedule background trust status update
+                            trust_result = execute_task_with_fallback(process_did_registration_confirmation)
                         
                         # Show appropriate message based on execution method
                         status_message = get_task_status_message(task_result)
@@ -66,8 +71,6 @@ def register_view(request):
                         else:
                             messages.warning(request, f"Account created successfully! {status_message}")
                         
-                        # Schedule background trust status update (also with fallback)
-                        trust_result = execute_task_with_fallback(process_did_registration_confirmation)
                         if not trust_result['success']:
                             logger.warning("Trust status update scheduling failed")
                         
@@ -200,9 +203,7 @@ def profile_view(request):
             context['is_trusted'] = user.get_trust_status()
             
             # Get blockchain transactions
-            context['transactions'] = OnChainTransaction.objects.filter(
-                metadata__did=user.did
-            ).order_by('-created_at')[:5]
+            context['transactions'] = recent_transactions(5, did=user.did)
             
         except InstitutionProfile.DoesNotExist:
             logger.warning(f"Institution profile missing for user: {user.id}")
@@ -243,82 +244,31 @@ def dashboard_view(request):
         ]
     
     elif user.is_verifier():
-        # Verifier dashboard with comprehensive statistics
-        from credentials.models import VerificationRecord
-        from django.utils import timezone
-        from datetime import timedelta
+        # Verifier dashboard with comprehensive statistics, counted in one query
+        from credentials.stats import verifier_stats
         
-        # Get verification statistics
-        verifications = VerificationRecord.objects.filter(verifier=user)
-        total_verifications = verifications.count()
-        valid_verifications = verifications.filter(is_valid=True).count()
-        invalid_verifications = verifications.filter(is_valid=False).count()
-        
-        # Calculate success rate
-        success_rate = (valid_verifications / total_verifications * 100) if total_verifications > 0 else 0
+        stats = verifier_stats(user)
         
         # Get recent verifications (last 4)
-        recent_verifications = verifications.select_related('credential', 'credential__issuer', 'credential__holder')[:4]
-        
-        # Get verifications by source
-        internal_verifications = verifications.filter(source='INTERNAL').count()
-        external_verifications = verifications.filter(source='EXTERNAL').count()
-        
-        # Get verifications by time period
-        today = timezone.now().date()
-        week_ago = today - timedelta(days=7)
-        month_ago = today - timedelta(days=30)
-        
-        verifications_today = verifications.filter(verification_date__date=today).count()
-        verifications_this_week = verifications.filter(verification_date__date__gte=week_ago).count()
-        verifications_this_month = verifications.filter(verification_date__date__gte=month_ago).count()
-        
-        # Get verification details for failed verifications
-        failed_verifications = verifications.filter(is_valid=False)
-        common_issues = []
-        if failed_verifications.exists():
-            # Analyze verification details to find common issues
-            for verification in failed_verifications:
-                details = verification.verification_details
-                if details:
-                    if not details.get('signature_valid', True):
-                        common_issues.append('Invalid Signature')
-                    if not details.get('is_anchored', True):
-                        common_issues.append('Not Blockchain Anchored')
-                    if details.get('is_revoked', False):
-                        common_issues.append('Credential Revoked')
-                    if details.get('is_expired', False):
-                        common_issues.append('Credential Expired')
-                    if not details.get('issuer_trusted', True):
-                        common_issues.append('Untrusted Issuer')
-            
-            # Count most common issues
-            from collections import Counter
-            issue_counts = Counter(common_issues)
-            most_common_issues = issue_counts.most_common(3)
-        else:
-            most_common_issues = []
-    
-        # Get verification status breakdown
-        pending_verifications = verifications.filter(is_valid__isnull=True).count()
-        verified_verifications = verifications.filter(is_valid=True).count()
-        rejected_verifications = verifications.filter(is_valid=False).count()
+        recent_verifications = VerificationRecord.objects.filter(verifier=user).select_related(
+            'credential', 'credential__issuer', 'credential__holder'
+        )[:4]
     
         context.update({
-            'total_verifications': total_verifications,
-            'valid_verifications': valid_verifications,
-            'invalid_verifications': invalid_verifications,
-            'success_rate': round(success_rate, 1),
+            'total_verifications': stats['total'],
+            'valid_verifications': stats['valid'],
+            'invalid_verifications': stats['invalid'],
+            'success_rate': stats['success_rate'],
             'recent_verifications': recent_verifications,
-            'internal_verifications': internal_verifications,
-            'external_verifications': external_verifications,
-            'verifications_today': verifications_today,
-            'verifications_this_week': verifications_this_week,
-            'verifications_this_month': verifications_this_month,
-            'most_common_issues': most_common_issues,
-            'pending_verifications': pending_verifications,
-            'verified_verifications': verified_verifications,
-            'rejected_verifications': rejected_verifications,
+            'internal_verifications': stats['internal'],
+            'external_verifications': stats['external'],
+            'verifications_today': stats['today'],
+            'verifications_this_week': stats['this_week'],
+            'verifications_this_month': stats['this_month'],
+            'most_common_issues': stats['most_common_issues'],
+            'pending_verifications': stats['pending'],
+            'verified_verifications': stats['valid'],
+            'rejected_verifications': stats['invalid'],
             'pending_actions': [
                 {'title': 'Verify Credentials', 'url': reverse('verify_credential')},
                 {'title': 'Verification History', 'url': reverse('verification_history')},
@@ -428,37 +378,24 @@ def is_superuser(user):
 def admin_dashboard_view(request):
     """Admin dashboard for superusers to manage institutions and system overview"""
     
-    # Get pending institutions that need approval
-    pending_institutions = InstitutionProfile.objects.filter(is_trusted=False).select_related('user')
-    
-    # Get approved institutions
-    approved_institutions = InstitutionProfile.objects.filter(is_trusted=True).select_related('user')
-    
-    # System statistics
-    total_users = User.objects.count()
-    total_institutions = InstitutionProfile.objects.count()
-    total_credentials = Credential.objects.count()
-    total_verifications = VerificationRecord.objects.count()
-    
-    # Recent activity
-    recent_users = User.objects.filter(date_joined__gte=timezone.now() - timedelta(days=7)).count()
-    recent_credentials = Credential.objects.filter(issued_at__gte=timezone.now() - timedelta(days=7)).count()
-    recent_verifications = VerificationRecord.objects.filter(verification_date__gte=timezone.now() - timedelta(days=7)).count()
+    # System statistics come from the snapshot refreshed by Celery beat (users/snapshot.py)
+    snapshot, snapshot_stale = get_snapshot()
     
-    # User type distribution
-    user_type_stats = User.objects.values('user_type').annotate(count=Count('user_type'))
+    # Pending and approved institutions, newest first, one keyset page each
+    institutions = InstitutionProfile.objects.select_related('user')
+    ordering = ('-created_at', '-id')
+    page_size = settings.ADMIN_DASHBOARD_PAGE_SIZE
+    pending_institutions = paginate_request(request, institutions.filter(is_trusted=False), ordering,
+                                            per_page=page_size, prefix='pending_')
+    approved_institutions = paginate_request(request, institutions.filter(is_trusted=True), ordering,
+                                             per_page=page_size, prefix='approved_')
     
     context = {
+        **snapshot.data,
         'pending_institutions': pending_institutions,
         'approved_institutions': approved_institutions,
-        'total_users': total_users,
-        'total_institutions': total_institutions,
-        'total_credentials': total_credentials,
-        'total_verifications': total_verifications,
-        'recent_users': recent_users,
-        'recent_credentials': recent_credentials,
-        'recent_verifications': recent_verifications,
-        'user_type_stats': user_type_stats,
+        'snapshot_refreshed_at': snapshot.refreshed_at,
+        'snapshot_stale': snapshot_stale,
     }
     
     return render(request, 'users/admin_dashboard.html', context)
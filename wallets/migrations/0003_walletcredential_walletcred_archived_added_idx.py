@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credentials', '0010_keyset_pagination_indexes'),
+        ('wallets', '002_fix_shortkeys'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='walletcredential',
+            index=models.Index(fields=['is_archived', '-added_at', '-id'], name='walletcred_archived_added_idx'),
+        ),
+    ]
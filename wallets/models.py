@@ -25,6 +25,10 @@ class WalletCredential(models.Model):
     class Meta:
         unique_together = ('wallet', 'credential')
         ordering = ['-added_at']
+        indexes = [
+            # Keyset pagination of shared (unarchived) credentials, newest first
+            models.Index(fields=['is_archived', '-added_at', '-id'], name='walletcred_archived_added_idx'),
+        ]
     
     def __str__(self):
         return f"{self.credential.credential_type} in {self.wallet}"
@@ -6,7 +6,7 @@ from django.urls import reverse
 from django.contrib import messages
 from .models import Wallet, WalletCredential
 from credentials.models import Credential
-from blockchain.services import BlockchainService
+from blockchain.services import BlockchainService, attach_chain_status
 from blockchain.utils.vc_proofs import compute_sha256
 import qrcode
 from users.forms import CustomUserCreationForm
@@ -65,7 +65,9 @@ def wallet_home(request):
         request.user.public_key = public_key
         request.user.save()
     # Get all credentials in the wallet
-    credentials = wallet.wallet_credentials.filter(is_archived=False).select_related('credential')
+    credentials = wallet.wallet_credentials.filter(is_archived=False).select_related('credential__issuer')
+    # On-chain status of every listed credential in one batch of reads
+    attach_chain_status([wc.credential for wc in credentials])
     
     # Categorize credentials
     credential_types = {}